@@ -0,0 +1,530 @@
+"""
+ベンチマークスクリプト
+術語抽出・議事録生成の処理時間を計測
+"""
+
+import sys
+import os
+import re
+import random
+import time
+import tempfile
+import argparse
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def _timed(func, *args, **kwargs):
+    """関数を実行して (結果, 秒数) を返す"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def bench_text_cache(pdf_dir: str):
+    """ページテキストキャッシュのベンチマーク（パターン変更後の再抽出）"""
+    from src.term_extractor import TermExtractor
+    from src.text_cache import PageTextCache
+
+    print("=== ページテキストキャッシュ ===")
+    pdf_files = sorted(str(p) for p in Path(pdf_dir).glob("**/*.pdf"))
+    print(f"PDFファイル数: {len(pdf_files)}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        extractor = TermExtractor(PageTextCache(cache_dir))
+
+        _, uncached = _timed(lambda: [extractor.extract_from_pdf(p) for p in pdf_files])
+        print(f"初回（PDF解析 + キャッシュ作成）: {uncached:.2f}秒")
+
+        # パターンを変更して再抽出（正規表現の処理のみ）
+        extractor.term_patterns.append(r'[一-龯]{2,}計画')
+        _, cached = _timed(lambda: [extractor.extract_from_pdf(p) for p in pdf_files])
+        print(f"パターン変更後（キャッシュ利用）: {cached:.2f}秒")
+
+    print(f"高速化: {uncached / max(cached, 1e-9):.1f}倍")
+    print()
+
+def _synthetic_text(terms, length: int, density: float, seed: int = 0) -> str:
+    """術語を指定の割合で含む合成テキストを生成"""
+    rng = random.Random(seed)
+    filler = list('のにおいてはをがするためであることから、。\n本日会議内容説明報告予定今後対応進捗状況確認')
+    parts = []
+    total = 0
+    while total < length:
+        part = rng.choice(terms) if rng.random() < density else rng.choice(filler)
+        parts.append(part)
+        total += len(part)
+    return ''.join(parts)
+
+def bench_pattern_matching(length: int = 1_000_000):
+    """術語パターン照合のベンチマーク（パターンごとのre.findall と一括走査の比較）"""
+    from real_term_extractor import RealTermExtractor
+    from src.pattern_matcher import PatternMatcher
+
+    print("=== 術語パターン照合 ===")
+    patterns = RealTermExtractor().term_patterns
+    pattern_count = sum(len(category_patterns) for category_patterns in patterns.values())
+    matcher = PatternMatcher(patterns, re.IGNORECASE)
+    print(f"パターン数: {pattern_count}（個別走査: {len(matcher._fallback)}）")
+
+    terms = ['鉄筋コンクリート造', 'RC造', '基礎工事', '型枠工事', '品質管理', '施工管理',
+             '建築基準法第20条', '強度試験', 'クレーン', 'SD345']
+    for density in (0.01, 0.03, 0.1):
+        text = _synthetic_text(terms, length, density)
+        per_pattern, old = _timed(lambda: [re.findall(pattern, text, re.IGNORECASE)
+                                           for category_patterns in patterns.values()
+                                           for pattern in category_patterns])
+        single_pass, new = _timed(matcher.findall_per_pattern, text)
+        assert per_pattern == single_pass, "照合結果が一致しません"
+        print(f"術語密度 {density:.0%}: 個別 {old:.3f}秒 / 一括 {new:.3f}秒 ({old / max(new, 1e-9):.1f}倍)")
+    print()
+
+def _synthetic_spec(pages: int, chars_per_page: int = 1500, seed: int = 0) -> str:
+    """建築仕様書風の合成テキスト（1ページ約1500文字）を生成"""
+    rng = random.Random(seed)
+    subjects = ['鉄筋コンクリート構造', '基礎工事', '型枠工法', '外壁仕上', '空調設備', '品質管理計画',
+                '安全管理', '施工図面', '材料試験', '躯体検査', '工程表', '設計基準', '杭基礎施工']
+    phrases = ['は', 'について', 'を実施する', 'に従い', 'の確認を行う', 'とする', 'を提出する']
+    page_texts = []
+    for _ in range(pages):
+        sentences = []
+        total = 0
+        while total < chars_per_page:
+            sentence = ''.join(rng.choice(subjects) + rng.choice(phrases) for _ in range(rng.randint(2, 5))) + '。'
+            if rng.random() < 0.3:
+                sentence += '\n'
+            sentences.append(sentence)
+            total += len(sentence)
+        page_texts.append(''.join(sentences))
+    return '\n'.join(page_texts)
+
+def bench_context_terms():
+    """文脈ベース術語抽出のベンチマーク（処理時間がテキスト量に比例することを確認）"""
+    from real_term_extractor import RealTermExtractor
+
+    print("=== 文脈ベース術語抽出 ===")
+    extractor = RealTermExtractor()
+    per_page = {}
+    for pages in (50, 500):
+        text = _synthetic_spec(pages)
+        terms, seconds = _timed(extractor._extract_context_terms, text)
+        per_page[pages] = seconds / pages
+        print(f"{pages}ページ ({len(text)}文字): {seconds:.3f}秒, 術語 {len(terms)}個")
+    print(f"1ページあたりの時間比（500/50ページ）: {per_page[500] / max(per_page[50], 1e-9):.2f}")
+    print()
+
+def bench_term_mining(pages: int = 7000):
+    """統計的術語抽出のベンチマーク（約1000万文字の合成コーパス）"""
+    import tracemalloc
+    from src.term_miner import TermMiner
+
+    print("=== 統計的術語抽出 ===")
+    page_texts = [_synthetic_spec(1, seed=page) for page in range(pages)]
+    total_chars = sum(len(text) for text in page_texts)
+
+    tracemalloc.start()
+    miner = TermMiner(method="ngram")
+    mined, seconds = _timed(miner.mine, iter(page_texts), 20)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(f"{total_chars}文字 / {miner.num_docs}文書: {seconds:.2f}秒, 候補 {len(miner.vocab)}個, "
+          f"ピークメモリ {peak / 1024 / 1024:.1f}MB")
+    print("上位: " + "、".join(item.term for item in mined[:10]))
+    print()
+
+def bench_term_normalization(base_terms: int = 20000):
+    """術語正規化のベンチマーク（表記ゆれの統合によるベクトル数の削減）"""
+    from src.term_normalizer import group_terms
+
+    print("=== 術語の正規化 ===")
+    rng = random.Random(0)
+    full_width = str.maketrans({chr(c): chr(c + 0xFEE0) for c in range(0x21, 0x7F)})
+    katakana = 'アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモラリルレロ'
+    terms = []
+    for i in range(base_terms):
+        latin = ''.join(rng.choice('ABCDEFGHRSPX') for _ in range(2))
+        kana = ''.join(rng.choice(katakana) for _ in range(3)) + 'ー' + rng.choice(katakana)
+        term = f"{latin}{kana}{i}"
+        variants = [term, term.translate(full_width), term.lower(), term.replace('ー', '－')]
+        terms.extend(rng.sample(variants, rng.randint(1, len(variants))))
+
+    groups, seconds = _timed(group_terms, terms)
+    print(f"表記数 {len(terms)} -> 術語数 {len(groups)} "
+          f"（ベクトル数 {len(groups) / len(terms):.0%}）, 正規化 {seconds:.2f}秒")
+    print()
+
+def bench_pdf_memory(pdf_path: str, max_rss_mb: float = 500):
+    """巨大PDFのページ抽出中のメモリ推移（ページごとにキャッシュを破棄し、上限超過時は開き直す）"""
+    from src.term_extractor import TermExtractor
+    from src.extraction_engine import current_rss_mb
+
+    print("=== 巨大PDFのメモリ使用量 ===")
+    extractor = TermExtractor(max_rss_mb=max_rss_mb)
+    start_rss = current_rss_mb() or 0
+    peak_rss = start_rss
+    start = time.perf_counter()
+    page_count = 0
+    for page_count, _ in enumerate(extractor.iter_page_texts(pdf_path), 1):
+        if page_count % 100 == 0:
+            peak_rss = max(peak_rss, current_rss_mb() or 0)
+            print(f"   {page_count}ページ: {current_rss_mb() or 0:.0f}MB")
+    print(f"{page_count}ページ: {time.perf_counter() - start:.1f}秒, "
+          f"常駐メモリ {start_rss:.0f}MB -> 最大 {peak_rss:.0f}MB（上限 {max_rss_mb:.0f}MB）")
+    print()
+
+def bench_glossary_tables(pdf_path: str):
+    """用語集テーブル取り込みのベンチマーク（文字座標による表検出とテキスト抽出の比較）"""
+    from src.term_extractor import TermExtractor
+
+    print("=== 用語集テーブル取り込み ===")
+    (occurrences, glossary), table_seconds = _timed(
+        TermExtractor(glossary_tables=True).extract_with_glossary, pdf_path)
+    text_occurrences, text_seconds = _timed(TermExtractor().extract_occurrences, pdf_path)
+    pages = {entry["page"] for entry in glossary}
+    print(f"表検出: {table_seconds:.2f}秒, 用語集 {len(pages)}ページ / {len(glossary)}行, 術語 {len(occurrences)}個")
+    print(f"テキスト抽出 + パターン照合: {text_seconds:.2f}秒, 術語 {len(text_occurrences)}個")
+    print()
+
+def _synthetic_transcript(length: int, seed: int = 0) -> str:
+    """会議の文字起こし風の合成テキストを生成"""
+    rng = random.Random(seed)
+    fragments = ['田中さんが', '佐藤部長から', '来週までに', '図面の', '基礎工事の', '品質管理について', '工程を',
+                 '予算の', '安全対策を', '確認します', '対応します', '決定しました', '承認されました',
+                 '課題があります', '要確認です', '至急', 'えーと', 'そうですね', 'では次に', 'ありがとうございます']
+    sentences = []
+    total = 0
+    while total < length:
+        sentence = ''.join(rng.choice(fragments) for _ in range(rng.randint(2, 8))) + rng.choice('。。。！？')
+        sentences.append(sentence)
+        total += len(sentence)
+    return ''.join(sentences)
+
+def bench_minutes(length: int = 500_000):
+    """議事録生成のベンチマーク（長い文字起こしの一括処理）"""
+    from src.minutes_generator import MinutesGenerator, MinutesBuilder
+
+    print("=== 議事録生成 ===")
+    transcript = _synthetic_transcript(length)
+    minutes, seconds = _timed(MinutesGenerator(use_local_llm=False).generate_minutes, transcript)
+    print(f"{len(transcript)}文字: {seconds:.3f}秒, 決定事項 {len(minutes['decisions'])}件, "
+          f"行動項目 {len(minutes['action_items'])}件, 課題 {len(minutes['issues'])}件, "
+          f"参加者 {len(minutes['participants'])}名")
+
+    # 抽出型要約（TextRank）の文数による処理時間
+    from src.text_rank import TextRank
+    generator = MinutesGenerator(use_local_llm=False)
+    sentences = [sentence for sentence, _ in generator._analyze(transcript)["sentences"]]
+    for count in (1000, 5000, len(sentences)):
+        _, seconds = _timed(TextRank().select, sentences[:count])
+        print(f"TextRank要約 {min(count, len(sentences))}文: {seconds:.3f}秒")
+
+    # セグメントを順に追加し、追加のたびに途中経過の議事録を取得
+    builder = MinutesBuilder(MinutesGenerator(use_local_llm=False))
+    segment_length = 60
+    feed_seconds = 0.0
+    snapshot_seconds = []
+    for start in range(0, len(transcript), segment_length):
+        _, seconds = _timed(builder.feed, transcript[start:start + segment_length])
+        feed_seconds += seconds
+        _, seconds = _timed(builder.snapshot)
+        snapshot_seconds.append(seconds)
+    print(f"逐次生成（{len(snapshot_seconds)}セグメント）: 追加 計{feed_seconds:.3f}秒, "
+          f"途中経過 平均{sum(snapshot_seconds) / len(snapshot_seconds) * 1000:.2f}ミリ秒 / "
+          f"最大{max(snapshot_seconds) * 1000:.2f}ミリ秒")
+
+    # 時刻付きセグメントからの生成と、時刻から項目を引く索引
+    from src.timeline import TimelineIndex
+    segments = [{"id": number, "text": transcript[start:start + segment_length],
+                 "start": number * 5.0, "end": number * 5.0 + 4.8}
+                for number, start in enumerate(range(0, len(transcript), segment_length))]
+    minutes, seconds = _timed(MinutesGenerator(use_local_llm=False).generate_minutes_from_segments, segments)
+    timeline, index_seconds = _timed(TimelineIndex.from_minutes, minutes)
+    duration = segments[-1]["end"]
+    rng = random.Random(0)
+    times = [rng.uniform(0, duration) for _ in range(10000)]
+    hits, query_seconds = _timed(lambda: sum(len(timeline.at(t)) for t in times))
+    print(f"セグメントから生成（{len(segments)}セグメント, 録音{duration / 3600:.1f}時間）: {seconds:.3f}秒, "
+          f"時刻索引 {len(timeline)}項目 {index_seconds * 1000:.1f}ミリ秒, "
+          f"時刻から項目 {len(times)}回 {query_seconds * 1000:.1f}ミリ秒（該当 計{hits}件）")
+    print()
+
+def _stub_llm_server(latency: float):
+    """応答に latency 秒かかるOllama互換のスタブサーバー（要求数と接続元ポートを記録）"""
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            self.server.requests += 1
+            self.server.ports.add(self.client_address[1])
+            time.sleep(latency)
+            data = json.dumps({"response": "要約: " + body["prompt"][-30:]}, ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.requests = 0
+    server.ports = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def bench_llm_summary(meeting_minutes: int = 120, latency: float = 0.5):
+    """ローカルLLM要約のベンチマーク（スタブサーバーで区間の並列要約と統合を計測）"""
+    from src.llm_summarizer import LLMSummarizer, split_chunks
+
+    print("=== ローカルLLM要約（map-reduce） ===")
+    # 1分あたり約330文字の発話
+    transcript = _synthetic_transcript(meeting_minutes * 330)
+    server = _stub_llm_server(latency)
+    try:
+        chunks = split_chunks(transcript, 3000)
+        summarizer = LLMSummarizer(base_url=f"http://127.0.0.1:{server.server_port}",
+                                   max_chunk_tokens=3000, concurrency=len(chunks))
+        summary, seconds = _timed(summarizer.summarize, transcript, lambda text: "")
+        requests_made, connections = server.requests, len(server.ports)
+        _, cached_seconds = _timed(summarizer.summarize, transcript, lambda text: "")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"{meeting_minutes}分の会議（{len(transcript)}文字, {len(chunks)}区間, 応答{latency}秒/回）: "
+          f"{seconds:.2f}秒（逐次なら{requests_made * latency:.1f}秒）, 要求 {requests_made}回 / 接続 {connections}本")
+    print(f"再要約（キャッシュ利用）: {cached_seconds:.3f}秒, 要約 {'あり' if summary else 'なし'}")
+    print()
+
+def bench_material_index(pdf_dir: str, queries: int = 300):
+    """会議資料パッセージ索引のベンチマーク（構築・キャッシュからの再構築・一括検索・議事録補正）"""
+    from src.material_index import MaterialIndex
+    from src.minutes_corrector import MaterialCorrector
+    from src.minutes_generator import MinutesGenerator
+
+    print("=== 会議資料パッセージ索引 ===")
+    pdf_files = sorted(str(p) for p in Path(pdf_dir).glob("**/*.pdf"))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        count, built = _timed(MaterialIndex(cache_dir=cache_dir).build, pdf_files)
+        index = MaterialIndex(cache_dir=cache_dir)
+        _, rebuilt = _timed(index.build, pdf_files)
+    print(f"PDF {len(pdf_files)}件, パッセージ {count}件: 構築 {built:.2f}秒, キャッシュから再構築 {rebuilt:.3f}秒")
+
+    transcript = _synthetic_transcript(queries * 40)
+    sentences = [sentence for sentence, _ in MinutesGenerator(use_local_llm=False)._analyze(transcript)["sentences"]]
+    results, seconds = _timed(index.search_batch, sentences, 3)
+    print(f"一括検索 {len(sentences)}文: {seconds:.3f}秒, 該当 {sum(1 for result in results if result)}文")
+
+    generator = MinutesGenerator(use_local_llm=False)
+    generator.corrector = MaterialCorrector(index)
+    _, seconds = _timed(generator.generate_minutes, transcript)
+    print(f"議事録生成（資料との照合込み）: {seconds:.3f}秒")
+    print()
+
+def bench_tagging(items: int = 5000, taxonomy_size: int = 5000):
+    """タグ付けのベンチマーク（議事録項目の一括タグ付け、既定と大規模のタクソノミー）"""
+    from src.tagger import SmartTagger
+
+    print("=== タグ付け ===")
+    transcript = _synthetic_transcript(items * 40)
+    contents = [sentence for sentence in re.split(r'[。！？]', transcript) if sentence][:items]
+    tagger = SmartTagger()
+    _, seconds = _timed(lambda: [tagger.tag_content(content) for content in contents])
+    print(f"{len(contents)}項目（既定のタクソノミー）: {seconds:.3f}秒")
+
+    # キーワード数に依存しないことの確認（合成キーワードを追加したタクソノミー）
+    rng = random.Random(0)
+    chars = "アイウエオカキクケコサシスセソ構造設計施工鉄筋基礎配管電気"
+    large = SmartTagger()
+    for number in range(taxonomy_size // 100):
+        large.category_keywords[f"分類{number}"] = [
+            "".join(rng.choice(chars) for _ in range(rng.randint(3, 6))) for _ in range(100)]
+    _, compile_seconds = _timed(large.tag_content, "")
+    _, seconds = _timed(lambda: [large.tag_content(content) for content in contents])
+    print(f"{len(contents)}項目（キーワード約{taxonomy_size}語追加）: {seconds:.3f}秒, 構築 {compile_seconds:.3f}秒")
+    print()
+
+class _HashingModel:
+    """文字bigramのハッシュによる埋め込み（埋め込みモデルの代わり、分類の処理時間の計測用）"""
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def encode(self, texts, batch_size: int = 64, show_progress_bar: bool = False):
+        import numpy as np
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for first, second in zip(text, text[1:]):
+                vectors[row, (ord(first) * 31 + ord(second)) % self.dimensions] += 1
+        return vectors
+
+def bench_semantic_tagging(items: int = 20000):
+    """埋め込みによるタグ分類のベンチマーク（初回の一括分類と、タクソノミー変更後の再分類）"""
+    from src.tagger import SmartTagger
+    from src.semantic_tagger import SemanticTagger
+
+    print("=== 埋め込みによるタグ分類 ===")
+    transcript = _synthetic_transcript(items * 40)
+    contents = [sentence for sentence in re.split(r'[。！？]', transcript) if sentence][:items]
+    tagger = SmartTagger(semantic=SemanticTagger(_HashingModel()))
+    taxonomy = tagger._taxonomy()
+    _, seconds = _timed(tagger.semantic.classify, contents, taxonomy)
+    print(f"{len(contents)}項目の分類（エンコードを含む）: {seconds:.3f}秒")
+
+    tagger.category_keywords["防水"] = ["防水", "シーリング", "止水"]
+    tagger.refresh_taxonomy()
+    _, seconds = _timed(tagger.semantic.classify, contents, tagger._taxonomy())
+    print(f"タクソノミー変更後の再分類（キャッシュ済みの埋め込み）: {seconds:.3f}秒")
+    print()
+
+def bench_tag_index(meetings: int = 30000):
+    """タグの転置索引のベンチマーク（蓄積した議事録の追加・検索・保存）"""
+    from src.tagger import SmartTagger
+    from src.tag_index import TagIndex
+
+    print("=== タグ索引 ===")
+    rng = random.Random(0)
+    tagger = SmartTagger()
+    categories, stakeholders = list(tagger.category_keywords), list(tagger.stakeholder_keywords)
+    archive = []
+    for number in range(meetings):
+        minutes = {"meeting_info": {"date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"}}
+        for section in ("decisions", "action_items", "issues"):
+            minutes[section] = [{"tags": {
+                "categories": rng.sample(categories, rng.randint(0, 2)),
+                "stakeholders": rng.sample(stakeholders, rng.randint(0, 2)),
+                "priority": rng.choice(["高", "中", "低"]),
+            }} for _ in range(rng.randint(0, 4))]
+        minutes["tag_summary"] = tagger._generate_tag_summary(minutes)
+        archive.append(minutes)
+
+    index = TagIndex()
+    _, seconds = _timed(lambda: [index.add(minutes, f"meeting-{number}") for number, minutes in enumerate(archive)])
+    print(f"{meetings}会議の追加: {seconds:.3f}秒")
+
+    criteria = {"categories": ["構造", "設備"], "stakeholders": [stakeholders[0]], "priority": "高",
+                "date_from": "2024-04-01", "date_to": "2024-09-30"}
+    _, linear_seconds = _timed(tagger.search_by_tags, archive, criteria)
+    index.search(criteria)
+    results, seconds = _timed(index.search, criteria)
+    print(f"検索 {len(results)}件: 索引 {seconds * 1000:.2f}ミリ秒（日付範囲なしの線形走査 {linear_seconds * 1000:.1f}ミリ秒）")
+
+    items, seconds = _timed(index.query, all_of=[("categories", "構造")], none_of=[("priority", "低")], items=True)
+    print(f"項目単位の検索（AND/NOT） {len(items)}件: {seconds * 1000:.2f}ミリ秒")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index.path = Path(tmp_dir) / "tag_index.npz"
+        _, save_seconds = _timed(index.save)
+        _, load_seconds = _timed(TagIndex, str(index.path))
+    print(f"保存 {save_seconds:.3f}秒, 読み込み {load_seconds:.3f}秒")
+    print()
+
+def bench_archive(meetings: int = 1000, segments: int = 300, items: int = 30):
+    """会議アーカイブのベンチマーク（会議の一括書き込みと、会議をまたいだ全文検索）"""
+    from src.archive import MeetingArchive
+
+    print("=== 会議アーカイブ ===")
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp_dir, MeetingArchive(str(Path(tmp_dir) / "archive.db")) as archive:
+        start = time.perf_counter()
+        for number in range(meetings):
+            sentences = [sentence + "。" for sentence in
+                         _synthetic_transcript(segments * 40, seed=number).split("。") if sentence][:segments]
+            transcript_segments = [{"text": sentence, "start": i * 5.0, "end": i * 5.0 + 4.5}
+                                   for i, sentence in enumerate(sentences)]
+            minutes = {
+                "meeting_info": {"title": f"定例会議{number}", "date": f"2024-{number % 12 + 1:02d}-{number % 28 + 1:02d}"},
+                "decisions": [{"content": sentence, "start": i * 5.0, "end": i * 5.0 + 4.5,
+                               "tags": {"categories": [rng.choice(["構造", "設備", "施工管理"])], "priority": "中"}}
+                              for i, sentence in enumerate(sentences[:items])],
+            }
+            archive.add_meeting(f"meeting-{number}", minutes, transcript_segments)
+        seconds = time.perf_counter() - start
+        print(f"{meetings}会議（{segments}セグメント・{items}項目/会議）の書き込み: {seconds:.2f}秒")
+
+        for query in ["基礎工事", "田中さん 確認します", "工程"]:
+            archive.search_segments(query)
+            results, seconds = _timed(archive.search_segments, query, limit=20)
+            print(f"セグメント検索「{query}」 {len(results)}件: {seconds * 1000:.2f}ミリ秒")
+        results, seconds = _timed(archive.search_items, "品質管理", tags=[("categories", "構造")],
+                                  date_from="2024-04-01", date_to="2024-06-30")
+        print(f"項目検索（タグ・日付範囲付き） {len(results)}件: {seconds * 1000:.2f}ミリ秒")
+    print()
+
+def bench_tag_many(meetings: int = 2000, items: int = 30):
+    """一括タグ付けのベンチマーク（アーカイブ全体の再タグ付け、1プロセスとプロセスプール・中断からの再開）"""
+    from src.archive import MeetingArchive
+    from src.tagger import SmartTagger
+
+    print("=== 一括タグ付け ===")
+    tagger = SmartTagger()
+    with tempfile.TemporaryDirectory() as tmp_dir, MeetingArchive(str(Path(tmp_dir) / "archive.db")) as archive:
+        for number in range(meetings):
+            sentences = [sentence + "。" for sentence in
+                         _synthetic_transcript(items * 40, seed=number).split("。") if sentence][:items]
+            minutes = {"meeting_info": {"title": f"定例会議{number}", "date": f"2024-{number % 12 + 1:02d}-{number % 28 + 1:02d}"},
+                       "decisions": [{"content": sentence} for sentence in sentences]}
+            archive.add_meeting(f"meeting-{number}", minutes)
+
+        for workers in sorted({1, os.cpu_count() or 1}):
+            stats = tagger.tag_many(archive.iter_minutes(), archive.update_minutes, workers=workers)
+            print(f"{meetings}会議（{items}項目/会議）の再タグ付け（{workers}プロセス）: {stats['seconds']:.2f}秒 "
+                  f"({stats['meetings_per_second']:.0f}会議/秒, {stats['items_per_second']:.0f}項目/秒)")
+
+        # 半分で中断し、チェックポイントから再開
+        checkpoint = str(Path(tmp_dir) / "tagging.checkpoint")
+
+        def interrupted():
+            for number, meeting in enumerate(archive.iter_minutes()):
+                if number == meetings // 2:
+                    raise KeyboardInterrupt
+                yield meeting
+
+        try:
+            tagger.tag_many(interrupted(), archive.update_minutes, workers=1, checkpoint=checkpoint)
+        except KeyboardInterrupt:
+            pass
+        stats = tagger.tag_many(archive.iter_minutes(), archive.update_minutes, checkpoint=checkpoint)
+        print(f"再開: {stats['skipped']}会議を飛ばし {stats['meetings']}会議をタグ付け: {stats['seconds']:.2f}秒")
+    print()
+
+def main():
+    """ベンチマーク実行"""
+    parser = argparse.ArgumentParser(description="ベンチマーク")
+    parser.add_argument("--pdf-dir", help="PDFディレクトリ（PDFを使うベンチマーク用）")
+    parser.add_argument("--large-pdf", help="ページ数の多いPDF（メモリ使用量のベンチマーク用）")
+    parser.add_argument("--glossary-pdf", help="用語集テーブルのPDF（用語集取り込みのベンチマーク用）")
+    args = parser.parse_args()
+
+    bench_pattern_matching()
+    bench_context_terms()
+    bench_term_mining()
+    bench_term_normalization()
+    bench_minutes()
+    bench_llm_summary()
+    bench_tagging()
+    bench_semantic_tagging()
+    bench_tag_index()
+    bench_archive()
+    bench_tag_many()
+
+    if args.pdf_dir:
+        bench_text_cache(args.pdf_dir)
+        bench_material_index(args.pdf_dir)
+    else:
+        print("--pdf-dir を指定するとPDF関連のベンチマークを実行します")
+
+    if args.large_pdf:
+        bench_pdf_memory(args.large_pdf)
+
+    if args.glossary_pdf:
+        bench_glossary_tables(args.glossary_pdf)
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,27 @@ import gradio as gr
 import logging
 import json
 import os
+from dataclasses import asdict
 from pathlib import Path
 from typing import Optional, Tuple, Dict
 
 # 相対インポートに修正
-from src.term_extractor import TermExtractor
+from src.term_extractor import TermExtractor, extraction_failed
 from src.vector_db import VectorDB
+from src.overlay_db import OverlayVectorDB
+from src.pdf_manifest import PDFManifest
+from src.text_cache import PageTextCache
+from src.term_miner import TermMiner
 from src.transcriber import BuildingTranscriber
 from src.minutes_generator import MinutesGenerator
+from src.llm_summarizer import LLMSummarizer
+from src.material_index import MaterialIndex
+from src.minutes_corrector import MaterialCorrector
 from src.tagger import SmartTagger
+from src.tag_index import TagIndex
+from src.semantic_tagger import SemanticTagger
+from src.archive import MeetingArchive
+from src.timeline import format_timestamp
 
 # ログ設定
 logging.basicConfig(level=logging.INFO)
@@ -24,7 +36,13 @@ logger = logging.getLogger(__name__)
 class MeetingTranscriberApp:
     def __init__(self):
         """アプリケーションを初期化"""
-        self.term_extractor = TermExtractor()
+        # データディレクトリを作成
+        self.data_dir = Path("data")
+        self.data_dir.mkdir(exist_ok=True)
+        
+        # 用語集テーブル（用語・読み・定義の表）は行ごとに読み・定義付きで取り込む
+        self.term_extractor = TermExtractor(PageTextCache(str(self.data_dir / "text_cache")),
+                                            glossary_tables=True)
         
         # ベクターDBを安全に初期化（日本語優先で自動選択）
         try:
@@ -34,12 +52,17 @@ class MeetingTranscriberApp:
             self.vector_db = None
             
         self.transcriber = None
-        self.minutes_generator = MinutesGenerator()
-        self.tagger = SmartTagger()
-        
-        # データディレクトリを作成
-        self.data_dir = Path("data")
-        self.data_dir.mkdir(exist_ok=True)
+        # 直近の転写結果（テキストが編集されていなければ、議事録の項目にセグメントの時刻を付ける）
+        self.last_transcript = ""
+        self.last_segments = []
+        self.meeting_overlay = None
+        # 要約はローカルLLM（Ollama）で区間ごとに並列生成し、区間の要約はキャッシュして再利用
+        self.minutes_generator = MinutesGenerator(
+            summarizer=LLMSummarizer(cache_dir=str(self.data_dir / "llm_cache")))
+        # キーワードのない言い換えは、ベクターDBの埋め込みモデルでタグのセントロイドとの類似度から分類
+        self.tagger = SmartTagger(index=TagIndex(str(self.data_dir / "tag_index.npz")),
+                                  semantic=SemanticTagger(self.vector_db.model) if self.vector_db else None)
+        self.archive = MeetingArchive(str(self.data_dir / "archive.db"))
         
         # 専門術語データベースの状態
         self.term_db_loaded = False
@@ -48,6 +71,9 @@ class MeetingTranscriberApp:
         """
         PDFファイルから専門術語データベースを構築
         
+        アップロードされたPDFは術語PDFライブラリに保存され、
+        マニフェストで変更のあったファイルのみ再解析される。
+        
         Args:
             pdf_files: アップロードされたPDFファイルのリスト
             
@@ -58,48 +84,151 @@ class MeetingTranscriberApp:
             if not pdf_files:
                 return "PDFファイルが選択されていません。"
             
-            # 一時ディレクトリにPDFを保存
-            temp_dir = self.data_dir / "temp_pdfs"
-            temp_dir.mkdir(exist_ok=True)
+            # 術語PDFライブラリにPDFを保存
+            library_dir = self.data_dir / "term_pdfs"
+            library_dir.mkdir(exist_ok=True)
             
-            # PDFファイルを保存
-            pdf_paths = []
+            import shutil
             for pdf_file in pdf_files:
-                pdf_path = temp_dir / Path(pdf_file.name).name
-                # ファイルをコピー
-                import shutil
-                shutil.copy2(pdf_file.name, pdf_path)
-                pdf_paths.append(str(pdf_path))
-            
-            # 専門術語を抽出
-            logger.info("Extracting terms from PDFs...")
-            all_terms = set()
-            for pdf_path in pdf_paths:
-                terms = self.term_extractor.extract_from_pdf(pdf_path)
-                all_terms.update(terms)
+                shutil.copy2(pdf_file.name, library_dir / Path(pdf_file.name).name)
             
+            return self.update_term_database(str(library_dir))
+                
+        except Exception as e:
+            logger.error(f"Error building term database: {e}")
+            return f"エラーが発生しました: {str(e)}"
+    
+    def update_term_database(self, pdf_dir: str) -> str:
+        """
+        PDFディレクトリの差分を専門術語データベースに反映
+        
+        Args:
+            pdf_dir: 術語PDFのディレクトリ
+            
+        Returns:
+            結果メッセージ
+        """
+        try:
+            if not pdf_dir or not Path(pdf_dir).is_dir():
+                return "PDFディレクトリが見つかりません。"
+            
+            # 新規・変更ファイルのみ術語を抽出（出現回数・出現ページ・用語集の行も記録）
+            logger.info("Extracting terms from changed PDFs...")
+            manifest = PDFManifest(str(self.data_dir / "pdf_manifest.json"))
+            delta = manifest.update(
+                pdf_dir,
+                lambda files: (
+                    (path, None if extraction_failed(occurrences) else sorted(occurrences),
+                     occurrences, glossary)
+                    for path, occurrences, glossary
+                    in self.term_extractor.iter_extract_with_glossary(files, workers=None)
+                ),
+                extractor_key=self.term_extractor.pattern_fingerprint()
+            )
+            manifest.save()
+            
+            all_terms = manifest.all_terms()
             logger.info(f"Extracted {len(all_terms)} unique terms")
             
-            # ベクターデータベースを構築
-            if all_terms and self.vector_db:
+            if not all_terms or not self.vector_db:
+                return "専門術語を抽出できませんでした。"
+            
+            # ベクターデータベースに差分を反映（未読み込みの場合は全体を構築）
+            index_dir = self.data_dir / "vector_index"
+            if not self.term_db_loaded and index_dir.exists():
+                self.vector_db.load_index(str(index_dir))
+                self.term_db_loaded = True
+            
+            if self.term_db_loaded:
+                logger.info("Updating vector database...")
+                self.vector_db.remove_terms(sorted(delta.removed_terms))
+                self.vector_db.add_terms(sorted(delta.added_terms))
+            else:
                 logger.info("Building vector database...")
-                self.vector_db.build_index(list(all_terms))
-                
-                # インデックスを保存
-                index_dir = self.data_dir / "vector_index"
+                self.vector_db.build_index(sorted(all_terms))
+            
+            # 出現統計と用語集の読み・定義を反映して、変更があればインデックスを保存
+            changed = delta.parsed_files or delta.deleted_files or not self.term_db_loaded
+            if changed:
+                self.vector_db.set_term_statistics(manifest.term_statistics())
+                self.vector_db.update_metadata(manifest.glossary_metadata())
                 self.vector_db.save_index(str(index_dir))
+            
+            self.term_db_loaded = True
+            
+            return (f"専門術語データベースを更新しました。\n"
+                    f"解析ファイル: {len(delta.parsed_files)} / 変更なし: {delta.unchanged_files} / "
+                    f"削除: {len(delta.deleted_files)}\n"
+                    f"追加術語: {len(delta.added_terms)} / 削除術語: {len(delta.removed_terms)}\n"
+                    f"術語数: {len(self.vector_db.terms)}")
                 
+        except Exception as e:
+            logger.error(f"Error updating term database: {e}")
+            return f"エラーが発生しました: {str(e)}"
+    
+    def mine_corpus_terms(self, pdf_dir: str, top_n: int = 500) -> str:
+        """
+        PDFコーパス全体から統計的に術語を抽出して専門術語データベースに追加
+        
+        パターンに一致しない複合名詞を、C-value / TF-IDFの上位から補う。
+        前回の統計抽出で追加し、今回の上位に残らなかった術語は削除する。
+        
+        Args:
+            pdf_dir: 術語PDFのディレクトリ
+            top_n: 追加する術語数
+            
+        Returns:
+            結果メッセージ
+        """
+        try:
+            if not pdf_dir or not Path(pdf_dir).is_dir():
+                return "PDFディレクトリが見つかりません。"
+            if not self.vector_db:
+                return "ベクターデータベースが初期化されていません。"
+            
+            def iter_pages():
+                for pdf_file in sorted(Path(pdf_dir).glob("**/*.pdf")):
+                    try:
+                        yield from self.term_extractor.iter_page_texts(str(pdf_file))
+                    except Exception as e:
+                        logger.error(f"Error reading {pdf_file}: {e}")
+            
+            logger.info("Mining corpus terms...")
+            mined = TermMiner().mine(iter_pages(), top_n)
+            if not mined:
+                return "統計的に術語を抽出できませんでした。"
+            
+            index_dir = self.data_dir / "vector_index"
+            if not self.term_db_loaded and index_dir.exists():
+                self.vector_db.load_index(str(index_dir))
                 self.term_db_loaded = True
-                
-                # クリーンアップ
-                shutil.rmtree(temp_dir)
-                
-                return f"専門術語データベースを構築しました。\n抽出された術語数: {len(all_terms)}"
-            else:
-                return "専門術語を抽出できませんでした。"
+            
+            # 前回の統計抽出分のうち、今回残らずパターン抽出にもない術語を削除
+            mined_path = self.data_dir / "mined_terms.json"
+            mined_terms = {item.term for item in mined}
+            if mined_path.exists():
+                with open(mined_path, 'r', encoding='utf-8') as f:
+                    previous = {item["term"] for item in json.load(f)}
+                pattern_terms = PDFManifest(str(self.data_dir / "pdf_manifest.json")).all_terms()
+                self.vector_db.remove_terms(sorted(previous - mined_terms - pattern_terms))
+            
+            self.vector_db.add_terms(
+                [item.term for item in mined],
+                {item.term: {"source": "statistical", **asdict(item)} for item in mined}
+            )
+            self.vector_db.save_index(str(index_dir))
+            self.term_db_loaded = True
+            
+            with open(mined_path, 'w', encoding='utf-8') as f:
+                json.dump([asdict(item) for item in mined], f, ensure_ascii=False, indent=2)
+            
+            top_terms = "、".join(item.term for item in mined[:10])
+            return (f"統計的術語抽出が完了しました。\n"
+                    f"抽出術語: {len(mined)} (上位: {top_terms})\n"
+                    f"術語数: {len(self.vector_db.terms)}")
                 
         except Exception as e:
-            logger.error(f"Error building term database: {e}")
+            logger.error(f"Error mining corpus terms: {e}")
             return f"エラーが発生しました: {str(e)}"
     
     def load_existing_database(self) -> str:
@@ -119,6 +248,56 @@ class MeetingTranscriberApp:
             logger.error(f"Error loading database: {e}")
             return f"エラーが発生しました: {str(e)}"
     
+    def load_meeting_materials(self, pdf_files) -> str:
+        """
+        当日の会議資料から術語オーバーレイと議事録補正用のパッセージ索引を構築
+        
+        Args:
+            pdf_files: アップロードされた会議資料PDFのリスト
+            
+        Returns:
+            結果メッセージ
+        """
+        try:
+            if not pdf_files:
+                self.meeting_overlay = None
+                self.minutes_generator.corrector = None
+                return "会議資料をクリアしました。"
+            
+            pdf_paths = [pdf_file.name for pdf_file in pdf_files]
+            messages = []
+            
+            # 議事録の二次補正用のパッセージ索引（資料ごとにキャッシュし、議事録の再生成では索引し直さない）
+            material_index = MaterialIndex(
+                model=self.vector_db.model if self.vector_db else None,
+                cache_dir=str(self.data_dir / "material_index"),
+                text_cache=self.term_extractor.text_cache)
+            passage_count = material_index.build(pdf_paths)
+            self.minutes_generator.corrector = MaterialCorrector(material_index) if passage_count else None
+            messages.append(f"会議資料の索引を作成しました。\nパッセージ数: {passage_count}")
+            
+            if not self.vector_db or not self.term_db_loaded:
+                self.meeting_overlay = None
+                messages.append("専門術語データベースが読み込まれていないため、術語の読み込みは省略しました。")
+                return "\n".join(messages)
+            
+            overlay = OverlayVectorDB(self.vector_db, term_extractor=self.term_extractor)
+            count = overlay.build_from_pdfs(pdf_paths)
+            self.meeting_overlay = overlay if count else None
+            messages.append(f"会議資料の術語を読み込みました。\n術語数: {count}")
+            
+            return "\n".join(messages)
+            
+        except Exception as e:
+            logger.error(f"Error loading meeting materials: {e}")
+            return f"エラーが発生しました: {str(e)}"
+    
+    def _correction_db(self):
+        """転写補正に使う術語DB（会議資料があればオーバーレイ付き）"""
+        if not self.term_db_loaded:
+            return None
+        return self.meeting_overlay or self.vector_db
+    
     def transcribe_meeting(self, audio_file, model_size: str = "base") -> Tuple[str, str]:
         """
         会議音声を転写
@@ -136,8 +315,9 @@ class MeetingTranscriberApp:
             
             # 転写器を初期化（初回のみ）
             if self.transcriber is None:
-                vector_db = self.vector_db if self.term_db_loaded else None
-                self.transcriber = BuildingTranscriber(model_size, vector_db)
+                self.transcriber = BuildingTranscriber(model_size, self._correction_db())
+            else:
+                self.transcriber.vector_db = self._correction_db()
             
             # 転写実行
             logger.info(f"Transcribing audio: {audio_file.name}")
@@ -151,6 +331,8 @@ class MeetingTranscriberApp:
             
             transcript = result.get("text", "")
             duration = result.get("duration", 0)
+            self.last_transcript = transcript
+            self.last_segments = result.get("segments", [])
             
             status = f"転写完了。\n音声時間: {duration:.1f}秒\n文字数: {len(transcript)}"
             
@@ -183,12 +365,24 @@ class MeetingTranscriberApp:
             if meeting_date:
                 meeting_info["date"] = meeting_date
             
-            # 議事録を生成
+            # 議事録を生成（会議資料があれば資料と用語集で二次補正）
             logger.info("Generating minutes...")
-            minutes = self.minutes_generator.generate_minutes(transcript, meeting_info)
+            if self.minutes_generator.corrector is not None:
+                self.minutes_generator.corrector.term_db = self._correction_db()
+            if self.last_segments and transcript == self.last_transcript:
+                # 転写結果のままならセグメントから生成し、各項目に録音上の時刻を付ける
+                minutes = self.minutes_generator.generate_minutes_from_segments(self.last_segments, meeting_info)
+            else:
+                minutes = self.minutes_generator.generate_minutes(transcript, meeting_info)
             
-            # タグ付け
-            tagged_minutes = self.tagger.tag_minutes(minutes)
+            # タグ付け（同じタイトル・日付の会議は索引上で置き換え）
+            meeting_id = " ".join(filter(None, [meeting_date, meeting_title])) or minutes["generated_at"]
+            tagged_minutes = self.tagger.tag_minutes(minutes, meeting_id)
+            self.tagger.index.save()
+            
+            # 会議アーカイブに転写と議事録を保存（会議をまたいだ検索用）
+            segments = self.last_segments if transcript == self.last_transcript else None
+            self.archive.add_meeting(meeting_id, tagged_minutes, segments, transcript)
             
             # JSON形式
             json_output = json.dumps(tagged_minutes, ensure_ascii=False, indent=2)
@@ -230,6 +424,22 @@ class MeetingTranscriberApp:
                 output_lines = [f"'{query}' の検索結果:"]
                 for i, (term, score) in enumerate(results, 1):
                     output_lines.append(f"{i}. {term} (類似度: {score:.3f})")
+                    
+                    # 用語集から取り込んだ読み・定義
+                    info = self.vector_db.get_term_info(term)
+                    if info.get("reading"):
+                        output_lines.append(f"   読み: {info['reading']}")
+                    if info.get("definition"):
+                        output_lines.append(f"   定義: {info['definition']}")
+                    
+                    # 出現場所（最も多く現れるPDFの先頭ページから参照できるように）
+                    locations = info.get("locations", [])
+                    if locations:
+                        path, pages = max(locations, key=lambda location: len(location[1]))
+                        page_list = ", ".join(str(page) for page in pages[:5])
+                        more = " ..." if len(pages) > 5 else ""
+                        output_lines.append(f"   出現: {info['frequency']}回 / {info['doc_freq']}文書 "
+                                            f"- {Path(path).name} p.{page_list}{more}")
                 return "\n".join(output_lines)
             else:
                 return "該当する術語が見つかりませんでした。"
@@ -238,6 +448,42 @@ class MeetingTranscriberApp:
             logger.error(f"Error searching terms: {e}")
             return f"エラーが発生しました: {str(e)}"
     
+    def search_archive(self, query: str, target: str = "議事録項目") -> str:
+        """
+        会議アーカイブを検索
+        
+        Args:
+            query: 検索語（空白区切りのすべてを含む）
+            target: 検索対象（"議事録項目" または "転写"）
+            
+        Returns:
+            検索結果
+        """
+        try:
+            if not query.strip():
+                return "検索クエリを入力してください。"
+            
+            if target == "転写":
+                hits = self.archive.search_segments(query)
+                lines = [f"{hit['meeting']} {self._format_start(hit['start'])}{hit['text']}" for hit in hits]
+            else:
+                hits = self.archive.search_items(query)
+                lines = [f"{hit['meeting']} [{hit['section']}] {self._format_start(hit['start'])}{hit['content']}"
+                         for hit in hits]
+            
+            if not lines:
+                return "該当する会議が見つかりませんでした。"
+            return f"'{query}' の検索結果（{len(lines)}件）:\n" + "\n".join(lines)
+            
+        except Exception as e:
+            logger.error(f"Error searching archive: {e}")
+            return f"エラーが発生しました: {str(e)}"
+    
+    @staticmethod
+    def _format_start(start: Optional[float]) -> str:
+        """検索結果の行頭の時刻（時刻がなければ空）"""
+        return f"[{format_timestamp(start)}] " if start is not None else ""
+    
     def create_interface(self):
         """Gradioインターフェースを作成"""
         
@@ -271,6 +517,14 @@ class MeetingTranscriberApp:
                         build_btn = gr.Button("データベース構築", variant="primary")
                         load_btn = gr.Button("既存DB読み込み")
                     
+                    with gr.Row():
+                        pdf_dir = gr.Textbox(
+                            label="術語PDFフォルダ（変更分のみ再解析）",
+                            placeholder="例: C:\\Documents\\建築資料"
+                        )
+                        update_btn = gr.Button("フォルダから更新")
+                        mine_btn = gr.Button("統計的術語抽出")
+                    
                     db_status = gr.Textbox(
                         label="構築状況",
                         lines=3,
@@ -301,6 +555,20 @@ class MeetingTranscriberApp:
                         file_types=[".wav", ".mp3", ".m4a", ".mp4", ".avi", ".mov"]
                     )
                     
+                    materials_files = gr.File(
+                        label="会議資料PDF（術語補正で優先、議事録の照合に使用）",
+                        file_count="multiple",
+                        file_types=[".pdf"]
+                    )
+                    
+                    materials_btn = gr.Button("会議資料を読み込み")
+                    
+                    materials_status = gr.Textbox(
+                        label="会議資料",
+                        lines=2,
+                        interactive=False
+                    )
+                    
                     model_size = gr.Dropdown(
                         choices=["tiny", "base", "small", "medium", "large"],
                         value="base",
@@ -354,6 +622,28 @@ class MeetingTranscriberApp:
                             lines=15,
                             interactive=False
                         )
+                
+                # タブ4: 会議検索
+                with gr.TabItem("会議検索"):
+                    gr.Markdown("## 過去の会議の検索")
+                    
+                    with gr.Row():
+                        archive_query = gr.Textbox(
+                            label="検索クエリ",
+                            placeholder="例: スランプ試験"
+                        )
+                        archive_target = gr.Radio(
+                            choices=["議事録項目", "転写"],
+                            value="議事録項目",
+                            label="検索対象"
+                        )
+                        archive_btn = gr.Button("検索", variant="primary")
+                    
+                    archive_results = gr.Textbox(
+                        label="検索結果",
+                        lines=15,
+                        interactive=False
+                    )
             
             # イベントハンドラ
             build_btn.click(
@@ -362,6 +652,18 @@ class MeetingTranscriberApp:
                 outputs=[db_status]
             )
             
+            update_btn.click(
+                fn=self.update_term_database,
+                inputs=[pdf_dir],
+                outputs=[db_status]
+            )
+            
+            mine_btn.click(
+                fn=self.mine_corpus_terms,
+                inputs=[pdf_dir],
+                outputs=[db_status]
+            )
+            
             load_btn.click(
                 fn=self.load_existing_database,
                 outputs=[db_status]
@@ -373,6 +675,12 @@ class MeetingTranscriberApp:
                 outputs=[search_results]
             )
             
+            materials_btn.click(
+                fn=self.load_meeting_materials,
+                inputs=[materials_files],
+                outputs=[materials_status]
+            )
+            
             transcribe_btn.click(
                 fn=self.transcribe_meeting,
                 inputs=[audio_file, model_size],
@@ -384,6 +692,12 @@ class MeetingTranscriberApp:
                 inputs=[transcript_input, meeting_title, meeting_date],
                 outputs=[minutes_json, minutes_text]
             )
+            
+            archive_btn.click(
+                fn=self.search_archive,
+                inputs=[archive_query, archive_target],
+                outputs=[archive_results]
+            )
         
         return app
 
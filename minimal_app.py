@@ -8,6 +8,8 @@ import json
 import logging
 from pathlib import Path
 
+from src.taxonomy import default_taxonomy
+
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,11 +19,12 @@ def analyze_japanese_meeting(text: str, title: str = "", date: str = "") -> tupl
     if not text.strip():
         return "", "テキストを入力してください"
     
-    # キーワード定義
-    decision_keywords = ['決定', '承認', '採用', '選定', '確定', '合意', '了承']
-    action_keywords = ['検討', '確認', '調整', '実施', '対応', '準備', '作成', '提出', '報告', '連絡']
-    issue_keywords = ['課題', '問題', '懸念', '検討事項', '要確認', '要検討']
-    building_keywords = ['RC', 'PC', 'SRC', '鉄筋', 'コンクリート', '基礎', '施工', '図面', '構造', '設計', '品質管理', '安全管理']
+    # キーワード定義（タクソノミーファイルの "quick_analysis" 節）
+    keywords = default_taxonomy().section("quick_analysis")
+    decision_keywords = keywords["decision"]
+    action_keywords = keywords["action"]
+    issue_keywords = keywords["issue"]
+    building_keywords = keywords["building"]
     
     sentences = [s.strip() for s in text.split('。') if s.strip()]
     
@@ -3,13 +3,18 @@
 No Demo Data - Real PDF Processing Only
 """
 
+import hashlib
 import json
 import os
 import re
 from pathlib import Path
 from datetime import datetime
-import PyPDF2
 import pickle
+from collections import Counter
+
+from src.extraction_engine import ExtractionEngine
+from src.pdf_manifest import PDFManifest
+from src.text_cache import PageTextCache
 
 class RealTermExtractor:
     def __init__(self):
@@ -17,112 +22,45 @@ class RealTermExtractor:
         self.extracted_terms = {}
         self.term_db_path = "extracted_terms_database.json"
         self.search_index_path = "term_search_index.json"
+        self.manifest_path = "term_manifest.json"
         
-        # 建築専門用語パターン（正規表現）
-        self.term_patterns = {
-            "構造関連": [
-                r'RC[造構法工事施工]*', r'PC[造構法工事施工]*', r'SRC[造構法工事施工]*',
-                r'鉄筋[コンクリート造構法工事]*', r'基礎[工事構造設計施工]*', 
-                r'杭[工事基礎施工打設]*', r'直接基礎', r'布基礎', r'独立基礎', r'べた基礎',
-                r'躯体[工事構造施工]*', r'柱[構造部材設計]*', r'梁[構造部材設計]*', 
-                r'スラブ[構造床版]*', r'壁[構造耐力壁]*', r'階段[構造設計]*',
-                r'耐震[構造設計診断]*', r'制震[構造設計装置]*', r'免震[構造設計装置]*',
-                r'構造[設計計算解析]*', r'荷重[設計計算]*', r'応力[計算解析]*'
-            ],
-            "工事関連": [
-                r'型枠[工事作業施工設置]*', r'配筋[工事作業施工]*', 
-                r'コンクリート[工事打設養生]*', r'仕上[工事作業施工]*',
-                r'防水[工事作業施工材料]*', r'左官[工事作業施工]*',
-                r'塗装[工事作業施工]*', r'内装[工事作業施工]*', r'外装[工事作業施工]*',
-                r'設備[工事配管施工]*', r'電気[工事配線施工]*', r'給排水[工事配管施工]*',
-                r'空調[工事設備施工]*', r'衛生[設備工事]*', r'昇降機[設備工事]*',
-                r'足場[工事安全施工]*', r'養生[作業安全]*', r'解体[工事作業]*'
-            ],
-            "材料関連": [
-                r'コンクリート[強度品質調合Fc\d+]*', r'鉄筋[材料規格D\d+SD\d+]*',
-                r'セメント[種類普通高炉早強]*', r'骨材[粗細川砂利砕石]*',
-                r'添加剤[AE減水高性能]*', r'防水[材料シートアスファルト]*',
-                r'断熱[材料保温グラスウール]*', r'仕上[材料塗装クロス]*',
-                r'建具[材料アルミ木製樹脂]*', r'ガラス[材料複層強化]*',
-                r'タイル[材料仕上]*', r'石材[材料仕上]*', r'金属[材料建材]*'
-            ],
-            "管理関連": [
-                r'品質[管理検査試験]*', r'安全[管理対策教育]*', 
-                r'工程[管理スケジュール計画]*', r'施工[管理監理]*',
-                r'検査[方法試験中間完了]*', r'試験[方法強度品質]*',
-                r'測定[方法計測]*', r'記録[管理保管写真]*', r'報告[書類提出]*',
-                r'監理[業務確認]*', r'監督[業務指導]*', r'検収[業務確認]*'
-            ],
-            "設計関連": [
-                r'構造[設計計算]*', r'意匠[設計デザイン]*', r'設備[設計機械電気]*',
-                r'施工[図面詳細]*', r'仕様[書規定基準]*', r'詳細[図面設計]*',
-                r'断面[図詳細構造]*', r'平面[図設計配置]*', r'立面[図設計外観]*',
-                r'配置[図敷地計画]*', r'矩計[図詳細]*', r'展開[図内装]*'
-            ],
-            "法規関連": [
-                r'建築基準法[第\d+条項款]*', r'確認[申請済証]*', r'完了[検査済証]*',
-                r'検査[済証中間完了]*', r'建築[確認許可]*', r'消防[法令規定]*',
-                r'都市計画[法令規定]*', r'条例[地方自治体]*', r'建設業法',
-                r'労働安全衛生法', r'廃棄物処理法', r'環境[基準法令]*'
-            ],
-            "測定・試験": [
-                r'強度[試験測定N/mm²MPa]*', r'スランプ[試験測定cm]*',
-                r'空気量[測定試験%]*', r'温度[測定管理℃]*', r'湿度[測定管理%]*',
-                r'騒音[測定dB]*', r'振動[測定計測]*', r'厚さ[測定mm]*',
-                r'寸法[測定精度公差]*', r'レベル[測定標高]*', r'通り[測定芯]*'
-            ],
-            "機械・設備": [
-                r'クレーン[重機建設機械]*', r'ポンプ[車コンクリート]*',
-                r'ミキサー[車コンクリート]*', r'バックホウ[重機掘削]*',
-                r'ブルドーザー[重機整地]*', r'ローラー[重機締固]*',
-                r'発電機[設備電源]*', r'コンプレッサー[設備空気]*'
-            ]
-        }
+        # 建築専門用語パターン（パターン表は src/term_patterns.py で共有）
+        # ページテキストキャッシュ（パターン変更時にPDFを再解析しない）
+        self.engine = ExtractionEngine("building_detailed", "pypdf2", PageTextCache("text_cache"))
+        self.text_cache = self.engine.text_cache
+        self.term_patterns = self.engine.pattern_set.patterns
         
         # 専門用語の最小・最大長制限
-        self.min_term_length = 2
-        self.max_term_length = 15
+        self.min_term_length = self.engine.pattern_set.min_length
+        self.max_term_length = self.engine.pattern_set.max_length
+        
+        # 文脈抽出用の建築関連キーワード
+        self.context_keywords = [
+            '工法', '構法', '設計', '施工', '監理', '管理', '検査', '試験',
+            '材料', '部材', '構造', '基礎', '躯体', '仕上', '設備', '機械',
+            '品質', '安全', '工程', '図面', '仕様', '規格', '基準'
+        ]
+        self.context_term_limit = 30
         
     def extract_from_pdf(self, pdf_path):
         """PDFファイルから実際に専門術語を抽出"""
         print(f"📖 PDFファイル解析開始: {os.path.basename(pdf_path)}")
         
         try:
-            # PDFテキスト抽出
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                full_text = ""
-                
-                print(f"📄 総ページ数: {len(pdf_reader.pages)}")
-                
-                for page_num, page in enumerate(pdf_reader.pages, 1):
-                    try:
-                        page_text = page.extract_text()
-                        full_text += page_text + "\n"
-                        print(f"   ページ {page_num}: {len(page_text)}文字抽出")
-                    except Exception as e:
-                        print(f"   ⚠️ ページ {page_num} 読み込みエラー: {e}")
-                        continue
+            # PDFテキスト抽出（キャッシュ済みならPDFは解析しない）
+            # ページは読み込んだ順に照合して破棄し、全文はメモリに保持しない
+            page_texts = self.engine.iter_page_texts(pdf_path)
+            extracted_terms, stats = self._extract_from_pages(page_texts)
             
-            if not full_text.strip():
+            if not stats["has_text"]:
                 print("❌ PDFからテキストを抽出できませんでした")
                 return None
             
-            print(f"📝 総抽出文字数: {len(full_text)}文字")
-            
-            # 専門術語抽出実行
-            extracted_terms = self._extract_terms_by_patterns(full_text)
-            
-            # 追加の術語抽出（文脈ベース）
-            context_terms = self._extract_context_terms(full_text)
-            if context_terms:
-                extracted_terms["文脈抽出"] = context_terms
-            
             # 結果統計
             total_count = sum(len(terms) for terms in extracted_terms.values())
             print(f"✅ 専門術語抽出完了: {total_count}個")
             
-            return extracted_terms, full_text
+            return extracted_terms, stats
             
         except FileNotFoundError:
             print(f"❌ ファイルが見つかりません: {pdf_path}")
@@ -131,70 +69,140 @@ class RealTermExtractor:
             print(f"❌ PDF読み込みエラー: {e}")
             return None
     
-    def _extract_terms_by_patterns(self, text):
-        """パターンマッチングによる専門術語抽出"""
-        extracted = {}
+    def pattern_fingerprint(self):
+        """抽出パターンのハッシュ（変更時にマニフェストの抽出結果を無効化）"""
+        config = json.dumps([self.engine.fingerprint(), self.context_keywords, self.context_term_limit],
+                            ensure_ascii=False)
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+    
+    def extract_from_directory(self, pdf_dir):
+        """フォルダ内のPDFから術語を抽出（前回から変更のあったPDFのみ解析）"""
+        print(f"📁 フォルダ解析開始: {pdf_dir}")
+        
+        manifest = PDFManifest(self.manifest_path)
+        delta = manifest.update(pdf_dir, self._iter_extract_files, self.pattern_fingerprint())
+        manifest.save()
         
-        for category, patterns in self.term_patterns.items():
-            found_terms = set()
+        print(f"   解析: {len(delta.parsed_files)}件 / 失敗: {len(delta.failed_files)}件 / "
+              f"変更なし: {delta.unchanged_files}件 / 削除: {len(delta.deleted_files)}件")
+        print(f"   術語の増減: +{len(delta.added_terms)} / -{len(delta.removed_terms)}")
+        
+        # フォルダ内の全PDFの結果をカテゴリ別に統合
+        merged = {}
+        for path, entry in manifest.files.items():
+            if not Path(path).is_relative_to(pdf_dir):
+                continue
+            for category, terms in entry["terms"].items():
+                merged.setdefault(category, set()).update(terms)
+        
+        return {category: sorted(terms) for category, terms in merged.items()}, delta
+    
+    def _iter_extract_files(self, pdf_files):
+        """マニフェスト更新用: 各PDFのカテゴリ別術語を返す（抽出できなかったPDFは None とし、次回再解析する）"""
+        for pdf_file in pdf_files:
+            result = self.extract_from_pdf(pdf_file)
+            yield pdf_file, result[0] if result else None
+    
+    def _extract_from_pages(self, page_texts, progress_interval=100):
+        """
+        ページテキストを1ページずつ照合し、術語の出現回数と出現ページを集計
+        
+        パターンも文脈抽出の単語も改行をまたがないため、
+        ページごとの照合結果は全文を連結して照合した結果と一致する。
+        
+        Returns:
+            (カテゴリ別術語, 統計情報)
+        """
+        term_counts = {category: Counter() for category in self.term_patterns}
+        term_pages = {}
+        context_counts = Counter()
+        text_length = 0
+        page_count = 0
+        has_text = False
+        
+        for page_num, page_text in enumerate(page_texts, 1):
+            page_count = page_num
+            text_length += len(page_text) + 1
+            has_text = has_text or bool(page_text.strip())
+            
+            for category, page_counts in self.engine.count_terms(page_text).items():
+                term_counts[category].update(page_counts)
+                for term in page_counts:
+                    pages = term_pages.setdefault(term, [])
+                    if not pages or pages[-1] != page_num:
+                        pages.append(page_num)
             
-            for pattern in patterns:
-                # 正規表現マッチング
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                
-                # 長さフィルタリング
-                valid_matches = [
-                    match for match in matches 
-                    if self.min_term_length <= len(match) <= self.max_term_length
-                ]
-                
-                found_terms.update(valid_matches)
+            context_counts.update(self._count_context_words(page_text))
             
-            if found_terms:
-                extracted[category] = sorted(list(found_terms))
-                print(f"   🔹 {category}: {len(found_terms)}個")
+            if page_num % progress_interval == 0:
+                print(f"   ページ {page_num}: 累計{text_length}文字")
         
+        print(f"📝 総ページ数: {page_count} / 総抽出文字数: {text_length}文字")
+        
+        extracted = {}
+        for category, counts in term_counts.items():
+            if counts:
+                extracted[category] = sorted(counts)
+                print(f"   🔹 {category}: {len(counts)}個")
+        
+        # 追加の術語抽出（文脈ベース）
+        context_terms = self._rank_context_terms(context_counts)
+        if context_terms:
+            extracted["文脈抽出"] = context_terms
+        
+        stats = {
+            "text_length": text_length,
+            "page_count": page_count,
+            "has_text": has_text,
+            "term_counts": {term: count for counts in term_counts.values() for term, count in counts.items()},
+            "term_pages": term_pages
+        }
+        return extracted, stats
+    
+    def _extract_terms_by_patterns(self, text):
+        """パターンマッチングによる専門術語抽出"""
+        extracted, _ = self._extract_from_pages([text])
+        extracted.pop("文脈抽出", None)
         return extracted
     
     def _extract_context_terms(self, text):
-        """文脈ベースの追加術語抽出"""
-        # 建築関連キーワード
-        building_keywords = [
-            '工法', '構法', '設計', '施工', '監理', '管理', '検査', '試験',
-            '材料', '部材', '構造', '基礎', '躯体', '仕上', '設備', '機械',
-            '品質', '安全', '工程', '図面', '仕様', '規格', '基準'
-        ]
+        """文脈ベースの追加術語抽出（建築キーワードを含む語を出現回数順に上位まで）"""
+        return self._rank_context_terms(self._count_context_words(text))
+    
+    def _rank_context_terms(self, word_counts):
+        """出現回数の多い順（同数は辞書順）に上位の語を返す"""
+        ranked = sorted(word_counts.items(), key=lambda item: (-item[1], item[0]))
+        return [word for word, _ in ranked[:self.context_term_limit]]
+    
+    def _count_context_words(self, text):
+        """建築キーワードを含む語の出現回数を数える（テキストを一回だけ走査）"""
+        # 単語抽出（ひらがな・カタカナ・漢字・英数字）は全文に対して一度だけ行う。
+        # 語は文区切り（。改行）をまたがないため、キーワードを含む語は必ずキーワードを含む文に属する
+        word_counts = Counter(re.findall(r'[一-龯ァ-ヶー\w]+', text))
+        keyword_pattern = re.compile('|'.join(map(re.escape, self.context_keywords)))
         
-        context_terms = set()
-        
-        # 文を分割して処理
-        sentences = re.split(r'[。\n]', text)
-        
-        for sentence in sentences:
-            # 建築キーワードを含む文から術語を抽出
-            for keyword in building_keywords:
-                if keyword in sentence:
-                    # 単語抽出（ひらがな・カタカナ・漢字・英数字）
-                    words = re.findall(r'[一-龯ァ-ヶー\w]+', sentence)
-                    
-                    for word in words:
-                        # 長さとキーワード条件チェック
-                        if (self.min_term_length <= len(word) <= self.max_term_length and
-                            any(kw in word for kw in building_keywords) and
-                            not word.isdigit()):
-                            context_terms.add(word)
-        
-        return sorted(list(context_terms))[:30]  # 上位30個まで
+        # キーワード判定は異なり語ごとに一度だけ
+        return Counter({
+            word: count for word, count in word_counts.items()
+            if (self.min_term_length <= len(word) <= self.max_term_length and
+                not word.isdigit() and
+                keyword_pattern.search(word))
+        })
     
-    def save_to_database(self, terms_dict, pdf_path, full_text):
+    def save_to_database(self, terms_dict, pdf_path, stats=None):
         """抽出結果をデータベースに保存"""
+        stats = stats or {}
+        term_counts = stats.get("term_counts", {})
+        term_pages = stats.get("term_pages", {})
+        
         # メインデータベース
         db_data = {
             "extraction_info": {
                 "source_file": str(pdf_path),
-                "file_size": os.path.getsize(pdf_path),
+                "file_size": self._source_size(pdf_path),
                 "extracted_at": datetime.now().isoformat(),
-                "text_length": len(full_text)
+                "text_length": stats.get("text_length", 0),
+                "page_count": stats.get("page_count", 0)
             },
             "terms_by_category": terms_dict,
             "statistics": {
@@ -216,12 +224,16 @@ class RealTermExtractor:
         search_index = []
         for category, terms in terms_dict.items():
             for term in terms:
-                search_index.append({
+                entry = {
                     "term": term,
                     "category": category,
                     "length": len(term),
                     "readings": self._generate_readings(term)
-                })
+                }
+                if term in term_counts:
+                    entry["frequency"] = term_counts[term]
+                    entry["pages"] = term_pages.get(term, [])
+                search_index.append(entry)
         
         with open(self.search_index_path, 'w', encoding='utf-8') as f:
             json.dump(search_index, f, ensure_ascii=False, indent=2)
@@ -229,6 +241,13 @@ class RealTermExtractor:
         
         return db_data
     
+    def _source_size(self, path):
+        """ファイルまたはフォルダ内PDFの合計サイズ"""
+        path = Path(path)
+        if path.is_dir():
+            return sum(p.stat().st_size for p in path.glob("**/*.pdf"))
+        return path.stat().st_size
+    
     def _generate_readings(self, term):
         """術語の読み方候補を生成（簡易版）"""
         # 基本的な読み方パターン
@@ -459,7 +478,7 @@ class RealTermExtractor:
                     <div class="stat-label">検索結果</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-number">{len(db_data['extraction_info']['text_length'])}</div>
+                    <div class="stat-number">{db_data['extraction_info']['text_length']}</div>
                     <div class="stat-label">文字数</div>
                 </div>
             </div>
@@ -602,8 +621,9 @@ def main():
     
     # PDFファイルパス入力
     while True:
-        print("📁 PDFファイルのパスを入力してください:")
+        print("📁 PDFファイルまたはフォルダのパスを入力してください:")
         print("   (例: C:\\Documents\\建築仕様書.pdf)")
+        print("   (フォルダの場合は前回から変更のあったPDFのみ解析します)")
         pdf_path = input("PDFファイルパス: ").strip().strip('"')
         
         if not pdf_path:
@@ -614,7 +634,7 @@ def main():
             print(f"❌ ファイルが見つかりません: {pdf_path}")
             continue
             
-        if not pdf_path.lower().endswith('.pdf'):
+        if not os.path.isdir(pdf_path) and not pdf_path.lower().endswith('.pdf'):
             print("❌ PDFファイルを指定してください")
             continue
             
@@ -622,13 +642,17 @@ def main():
     
     # 術語抽出実行
     print(f"\n🚀 術語抽出開始...")
-    result = extractor.extract_from_pdf(pdf_path)
-    
-    if not result:
-        print("❌ 術語抽出に失敗しました")
-        return
-    
-    terms_dict, full_text = result
+    if os.path.isdir(pdf_path):
+        terms_dict, _ = extractor.extract_from_directory(pdf_path)
+        stats = None
+    else:
+        result = extractor.extract_from_pdf(pdf_path)
+        
+        if not result:
+            print("❌ 術語抽出に失敗しました")
+            return
+        
+        terms_dict, stats = result
     
     if not terms_dict:
         print("❌ 専門術語が見つかりませんでした")
@@ -652,7 +676,7 @@ def main():
     
     # データベース保存
     print(f"\n💾 データベース保存中...")
-    db_data = extractor.save_to_database(terms_dict, pdf_path, full_text)
+    db_data = extractor.save_to_database(terms_dict, pdf_path, stats)
     
     # 検索インターフェース作成
     print(f"\n🌐 検索インターフェース作成中...")
@@ -8,6 +8,8 @@ import json
 import logging
 from pathlib import Path
 
+from src.taxonomy import default_taxonomy
+
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,19 +20,21 @@ class SimpleApp:
         self.data_dir = Path("data")
         self.data_dir.mkdir(exist_ok=True)
         
-        # 基本的なキーワード定義
-        self.keywords = {
-            "action": ['検討', '確認', '調整', '実施', '対応', '準備', '作成', '提出', '報告'],
-            "decision": ['決定', '承認', '採用', '選定', '確定', '合意', '了承'],
-            "issue": ['課題', '問題', '懸念', '検討事項', '要確認', '要検討'],
-            "building": ['RC', 'PC', 'SRC', '鉄筋', 'コンクリート', '基礎', '施工', '図面', '構造', '設計']
-        }
+        # 基本的なキーワード定義（タクソノミーファイルの "quick_analysis" 節）
+        self.taxonomy = default_taxonomy()
+    
+    @property
+    def keywords(self) -> dict:
+        """キーワード定義（タクソノミーファイルが変更されれば再起動せずに反映）"""
+        return self.taxonomy.section("quick_analysis")
     
     def analyze_text(self, text: str) -> dict:
         """テキスト解析"""
         if not text.strip():
             return {"error": "テキストを入力してください"}
         
+        keywords = self.keywords
+        
         sentences = [s.strip() for s in text.split('。') if s.strip()]
         
         results = {
@@ -43,7 +47,7 @@ class SimpleApp:
         # 各文を分析
         for sentence in sentences:
             # 決定事項
-            for keyword in self.keywords["decision"]:
+            for keyword in keywords["decision"]:
                 if keyword in sentence:
                     results["decisions"].append({
                         "content": sentence,
@@ -52,7 +56,7 @@ class SimpleApp:
                     break
             
             # 行動項目
-            for keyword in self.keywords["action"]:
+            for keyword in keywords["action"]:
                 if keyword in sentence:
                     results["actions"].append({
                         "content": sentence,
@@ -61,7 +65,7 @@ class SimpleApp:
                     break
             
             # 課題
-            for keyword in self.keywords["issue"]:
+            for keyword in keywords["issue"]:
                 if keyword in sentence:
                     results["issues"].append({
                         "content": sentence,
@@ -70,7 +74,7 @@ class SimpleApp:
                     break
             
             # 建築用語
-            for term in self.keywords["building"]:
+            for term in keywords["building"]:
                 if term in sentence:
                     if term not in results["building_terms"]:
                         results["building_terms"].append(term)
@@ -0,0 +1,464 @@
+"""
+会議アーカイブ
+転写セグメント・議事録項目・タグをSQLiteに保存し、FTS5（trigram）で会議をまたいで全文検索する
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+from .tag_index import DateLike, parse_date
+from .timeline import ITEM_SECTIONS, format_timestamp
+
+logger = logging.getLogger(__name__)
+
+# 全文検索はtrigramトークナイザ（分かち書き不要、3文字未満の語は LIKE で照合）
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    id INTEGER PRIMARY KEY,
+    meeting_key TEXT NOT NULL UNIQUE,
+    title TEXT,
+    date TEXT,
+    generated_at TEXT,
+    minutes TEXT
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    meeting_id INTEGER NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+    number INTEGER NOT NULL,
+    start_time REAL,
+    end_time REAL,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    meeting_id INTEGER NOT NULL REFERENCES meetings(id) ON DELETE CASCADE,
+    section TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    assignee TEXT,
+    deadline TEXT,
+    priority TEXT,
+    start_time REAL,
+    end_time REAL
+);
+CREATE TABLE IF NOT EXISTS item_tags (
+    item_id INTEGER NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    dimension TEXT NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_meeting ON segments(meeting_id);
+CREATE INDEX IF NOT EXISTS items_meeting ON items(meeting_id);
+CREATE INDEX IF NOT EXISTS item_tags_tag ON item_tags(dimension, tag, item_id);
+CREATE INDEX IF NOT EXISTS item_tags_item ON item_tags(item_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id', tokenize='trigram');
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    content, content='items', content_rowid='id', tokenize='trigram');
+
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts(segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts(rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+"""
+
+# 更新・取得のSQL（パラメータ化した固定の文で、接続の文キャッシュで再利用される）
+_DELETE_MEETING = "DELETE FROM meetings WHERE meeting_key = ?"
+_INSERT_MEETING = "INSERT INTO meetings (meeting_key, title, date, generated_at, minutes) VALUES (?, ?, ?, ?, ?)"
+_INSERT_SEGMENT = "INSERT INTO segments (meeting_id, number, start_time, end_time, text) VALUES (?, ?, ?, ?, ?)"
+_INSERT_ITEM = ("INSERT INTO items (meeting_id, section, number, content, assignee, deadline, priority, "
+                "start_time, end_time) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+_INSERT_TAG = "INSERT INTO item_tags (item_id, dimension, tag) VALUES (?, ?, ?)"
+_SELECT_MINUTES = "SELECT minutes FROM meetings WHERE meeting_key = ?"
+_SELECT_MINUTES_AFTER = "SELECT id, meeting_key, minutes FROM meetings WHERE id > ? ORDER BY id LIMIT ?"
+_SELECT_MEETING_ID = "SELECT id FROM meetings WHERE meeting_key = ?"
+_UPDATE_MINUTES = "UPDATE meetings SET minutes = ? WHERE id = ?"
+_SELECT_ITEM_IDS = "SELECT section, number, id FROM items WHERE meeting_id = ?"
+_UPDATE_ITEM_PRIORITY = "UPDATE items SET priority = ? WHERE id = ?"
+_DELETE_ITEM_TAGS = "DELETE FROM item_tags WHERE item_id IN (SELECT id FROM items WHERE meeting_id = ?)"
+_SELECT_UNNORMALIZED_DATES = ("SELECT id, date FROM meetings WHERE date IS NOT NULL "
+                              "AND date NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'")
+_UPDATE_DATE = "UPDATE meetings SET date = ? WHERE id = ?"
+_SELECT_MEETINGS = ("SELECT m.meeting_key, m.title, m.date, m.generated_at, "
+                    "(SELECT COUNT(*) FROM items i WHERE i.meeting_id = m.id) "
+                    "FROM meetings m ORDER BY m.date DESC, m.id DESC LIMIT ?")
+
+# 項目のタグのうち保存する次元（文字列または文字列のリスト）
+_TAG_DIMENSIONS = ("categories", "content_types", "priority", "stakeholders", "technical_terms", "keywords")
+
+# trigramで照合できる最小文字数
+_MIN_MATCH_CHARS = 3
+
+def _iso_date(value: DateLike) -> Optional[str]:
+    """会議日をISO形式（YYYY-MM-DD）に（解釈できなければNone）"""
+    parsed = parse_date(value)
+    return parsed.isoformat() if parsed else None
+
+def _terms(query: str) -> List[str]:
+    """検索語（空白区切り、「"」で囲んだ語は空白を含めて1語）"""
+    return [quoted or plain for quoted, plain in re.findall(r'"([^"]+)"|(\S+)', query)]
+
+class MeetingArchive:
+    def __init__(self, path: str = "data/archive.db"):
+        """
+        会議アーカイブを初期化（データベースがなければ作成）
+
+        転写セグメントと議事録項目の本文はFTS5の外部コンテンツ表（trigram）で索引し、
+        索引はトリガーで本表と同時に更新する。会議の追加は1トランザクションでまとめて書き込む。
+        接続は1つで、Gradioのワーカースレッドなど複数のスレッドからの利用はロックで順に行う。
+
+        Args:
+            path: データベースファイルのパス（":memory:" でメモリのみ）
+        """
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, cached_statements=256, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(_SCHEMA)
+        self._normalize_dates()
+
+    def close(self):
+        """接続を閉じる"""
+        self.conn.close()
+
+    def __enter__(self) -> "MeetingArchive":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_meeting(self, meeting_key: str, minutes: Dict, segments: Optional[Sequence[Dict]] = None,
+                    transcript: Optional[str] = None) -> int:
+        """
+        会議の転写と議事録を保存（同じ会議IDの会議は置き換え）
+
+        Args:
+            meeting_key: 会議ID
+            minutes: タグ付き議事録（SmartTagger.tag_minutes の出力）
+            segments: 転写セグメント（"text", "start", "end"、Whisperの出力）
+            transcript: 転写テキスト（セグメントがない場合に時刻なしの1セグメントとして保存）
+
+        Returns:
+            会議の行ID
+        """
+        meeting_info = minutes.get("meeting_info") or {}
+        if not segments and transcript:
+            segments = [{"text": transcript}]
+
+        with self._lock, self.conn:
+            self.conn.execute(_DELETE_MEETING, (meeting_key,))
+            meeting_id = self.conn.execute(_INSERT_MEETING, (
+                meeting_key, meeting_info.get("title"), _iso_date(meeting_info.get("date")),
+                minutes.get("generated_at"), json.dumps(minutes, ensure_ascii=False))).lastrowid
+
+            self.conn.executemany(_INSERT_SEGMENT, (
+                (meeting_id, number, segment.get("start"), segment.get("end"), segment["text"].strip())
+                for number, segment in enumerate(segments or []) if (segment.get("text") or "").strip()))
+
+            tags: List[Tuple[int, str, str]] = []
+            for section in ITEM_SECTIONS:
+                for number, item in enumerate(minutes.get(section) or []):
+                    item_id = self.conn.execute(_INSERT_ITEM, (
+                        meeting_id, section, number, item.get("content", ""), item.get("assignee"),
+                        item.get("deadline"), (item.get("tags") or {}).get("priority"),
+                        item.get("start"), item.get("end"))).lastrowid
+                    tags.extend((item_id, dimension, tag) for dimension, tag in self._item_tags(item))
+            self.conn.executemany(_INSERT_TAG, tags)
+
+        logger.info(f"Archived meeting {meeting_key}: {len(segments or [])} segments")
+        return meeting_id
+
+    @staticmethod
+    def _item_tags(item: Dict) -> Iterable[Tuple[str, str]]:
+        """項目のタグ（(次元, タグ)、重複を除く）"""
+        tags = item.get("tags") or {}
+        seen = set()
+        for dimension in _TAG_DIMENSIONS:
+            values = tags.get(dimension)
+            for value in [values] if isinstance(values, str) else values or []:
+                if value and (dimension, value) not in seen:
+                    seen.add((dimension, value))
+                    yield dimension, value
+
+    def search_items(self, query: str = "", tags: Sequence[Tuple[str, str]] = (),
+                     sections: Sequence[str] = (), date_from: DateLike = None,
+                     date_to: DateLike = None, limit: int = 20, order: str = "recent") -> List[Dict]:
+        """
+        議事録項目を全文検索
+
+        Args:
+            query: 検索語（空白区切りのすべてを含む、空でタグ・条件のみ）
+            tags: すべてを持つタグ（(次元, タグ) のリスト）
+            sections: 対象の項目名（"decisions" など、空で全項目）
+            date_from: 会議日の下限（「2024/1/15」「2024年1月15日」なども可、解釈できなければ無視）
+            date_to: 会議日の上限
+            limit: 最大件数
+            order: "recent"（保存の新しい順）または "relevance"（BM25の関連度順）
+
+        Returns:
+            "meeting", "title", "date", "section", "number", "content", "assignee", "deadline",
+            "priority", "start", "end" を持つ辞書のリスト
+        """
+        conditions, params = self._match("items_fts", "i", "content", query)
+        for dimension, tag in tags:
+            conditions.append("EXISTS (SELECT 1 FROM item_tags t WHERE t.item_id = i.id "
+                              "AND t.dimension = ? AND t.tag = ?)")
+            params.extend([dimension, tag])
+        if sections:
+            conditions.append(f"i.section IN ({', '.join('?' * len(sections))})")
+            params.extend(sections)
+        self._date_conditions(conditions, params, date_from, date_to)
+
+        rows = self._select(
+            "SELECT m.meeting_key, m.title, m.date, i.section, i.number, i.content, i.assignee, i.deadline, "
+            "i.priority, i.start_time, i.end_time FROM items i JOIN meetings m ON m.id = i.meeting_id",
+            "i", "items_fts", conditions, params, limit, order)
+        keys = ("meeting", "title", "date", "section", "number", "content", "assignee", "deadline",
+                "priority", "start", "end")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def search_segments(self, query: str, date_from: DateLike = None,
+                        date_to: DateLike = None, limit: int = 20, order: str = "recent") -> List[Dict]:
+        """
+        転写セグメントを全文検索
+
+        Args:
+            query: 検索語（空白区切りのすべてを含む）
+            date_from: 会議日の下限
+            date_to: 会議日の上限
+            limit: 最大件数
+            order: "recent"（保存の新しい順）または "relevance"（BM25の関連度順）
+
+        Returns:
+            "meeting", "title", "date", "number", "start", "end", "text" を持つ辞書のリスト
+        """
+        conditions, params = self._match("segments_fts", "s", "text", query)
+        self._date_conditions(conditions, params, date_from, date_to)
+        rows = self._select(
+            "SELECT m.meeting_key, m.title, m.date, s.number, s.start_time, s.end_time, s.text "
+            "FROM segments s JOIN meetings m ON m.id = s.meeting_id",
+            "s", "segments_fts", conditions, params, limit, order)
+        keys = ("meeting", "title", "date", "number", "start", "end", "text")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def iter_minutes(self, batch_size: int = 500) -> Iterator[Tuple[str, str]]:
+        """
+        保存した全会議の議事録（保存順、batch_size 件ずつ読み込み、SmartTagger.tag_many の入力）
+
+        Args:
+            batch_size: 1回の問い合わせで読み込む会議数
+
+        Returns:
+            (会議ID, 議事録のJSON文字列) の反復
+        """
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(_SELECT_MINUTES_AFTER, (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            for _, meeting_key, minutes in rows:
+                yield meeting_key, minutes
+            last_id = rows[-1][0]
+
+    def update_minutes(self, batch: Sequence[Tuple[str, Dict]]) -> int:
+        """
+        再タグ付けした議事録をまとめて書き戻す（1トランザクション、SmartTagger.tag_many の書き込み先）
+
+        議事録のJSONと項目の優先度・タグを置き換える。項目の本文・転写セグメントと全文検索の索引は変えない。
+
+        Args:
+            batch: (会議ID, タグ付き議事録) のリスト
+
+        Returns:
+            更新した会議数（アーカイブにない会議は飛ばす）
+        """
+        updated = 0
+        with self._lock, self.conn:
+            for meeting_key, minutes in batch:
+                row = self.conn.execute(_SELECT_MEETING_ID, (meeting_key,)).fetchone()
+                if row is None:
+                    logger.warning(f"Meeting {meeting_key} is not archived, skipping")
+                    continue
+                meeting_id = row[0]
+                self.conn.execute(_UPDATE_MINUTES, (json.dumps(minutes, ensure_ascii=False), meeting_id))
+                item_ids = {(section, number): item_id for section, number, item_id
+                            in self.conn.execute(_SELECT_ITEM_IDS, (meeting_id,))}
+
+                priorities: List[Tuple[Optional[str], int]] = []
+                tags: List[Tuple[int, str, str]] = []
+                for section in ITEM_SECTIONS:
+                    for number, item in enumerate(minutes.get(section) or []):
+                        item_id = item_ids.get((section, number))
+                        if item_id is None:
+                            continue
+                        priorities.append(((item.get("tags") or {}).get("priority"), item_id))
+                        tags.extend((item_id, dimension, tag) for dimension, tag in self._item_tags(item))
+                self.conn.execute(_DELETE_ITEM_TAGS, (meeting_id,))
+                self.conn.executemany(_UPDATE_ITEM_PRIORITY, priorities)
+                self.conn.executemany(_INSERT_TAG, tags)
+                updated += 1
+        return updated
+
+    def get_minutes(self, meeting_key: str) -> Optional[Dict]:
+        """会議の議事録（保存した辞書、なければNone）"""
+        with self._lock:
+            row = self.conn.execute(_SELECT_MINUTES, (meeting_key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def meetings(self, limit: int = 100) -> List[Dict]:
+        """保存した会議の一覧（会議日の新しい順）"""
+        keys = ("meeting", "title", "date", "generated_at", "items")
+        with self._lock:
+            rows = self.conn.execute(_SELECT_MEETINGS, (limit,)).fetchall()
+        return [dict(zip(keys, row)) for row in rows]
+
+    @staticmethod
+    def _match(fts_table: str, alias: str, column: str, query: str) -> Tuple[List[str], List]:
+        """
+        検索語の条件
+
+        3文字以上の語はFTS5の MATCH（語ごとに引用符で囲んだ完全一致のAND）、
+        3文字未満の語は trigram で索引できないため本文の LIKE で照合する。
+        """
+        conditions: List[str] = []
+        params: List = []
+        long_terms, short_terms = [], []
+        for term in _terms(query):
+            (long_terms if len(term) >= _MIN_MATCH_CHARS else short_terms).append(term)
+        if long_terms:
+            conditions.append(f"{fts_table} MATCH ?")
+            params.append(" AND ".join('"' + term.replace('"', '""') + '"' for term in long_terms))
+        for term in short_terms:
+            conditions.append(f"{alias}.{column} LIKE ? ESCAPE '\\'")
+            params.append("%" + re.sub(r'([%_\\])', r'\\\1', term) + "%")
+        return conditions, params
+
+    @staticmethod
+    def _date_conditions(conditions: List[str], params: List, date_from: DateLike, date_to: DateLike):
+        """会議日の範囲の条件を追加（会議日はISO形式で保存しているため、範囲もISO形式にして比較）"""
+        lower, upper = _iso_date(date_from), _iso_date(date_to)
+        if lower:
+            conditions.append("m.date >= ?")
+            params.append(lower)
+        if upper:
+            conditions.append("m.date <= ?")
+            params.append(upper)
+
+    def _normalize_dates(self):
+        """ISO形式でない会議日（以前の版で保存したもの）をISO形式に直す（解釈できなければNULL）"""
+        with self._lock, self.conn:
+            rows = self.conn.execute(_SELECT_UNNORMALIZED_DATES).fetchall()
+            if rows:
+                self.conn.executemany(_UPDATE_DATE, ((_iso_date(value), meeting_id) for meeting_id, value in rows))
+                logger.info(f"Normalized {len(rows)} meeting dates in {self.path}")
+
+    def _select(self, select: str, alias: str, fts_table: str, conditions: List[str], params: List,
+                limit: int, order: str) -> List[tuple]:
+        """
+        検索を実行（MATCH を使う場合はFTS5表を結合）
+
+        保存の新しい順は行IDの降順のため、FTS5・本表とも行IDの順に走査して上限の件数で打ち切れる。
+        関連度順は一致したすべての行のBM25を計算するため、多くの行に現れる語では遅くなる。
+        """
+        if order not in ("recent", "relevance"):
+            raise ValueError(f"Unknown order: {order}")
+        uses_match = f"{fts_table} MATCH ?" in conditions
+        sql = select
+        if uses_match:
+            sql += f" JOIN {fts_table} ON {fts_table}.rowid = {alias}.id"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if uses_match:
+            order_by = f"{fts_table}.rank" if order == "relevance" else f"{fts_table}.rowid DESC"
+        else:
+            order_by = f"{alias}.id DESC"
+        sql += f" ORDER BY {order_by} LIMIT ?"
+        with self._lock:
+            return self.conn.execute(sql, params + [limit]).fetchall()
+
+def _format_time(start: Optional[float]) -> str:
+    """行頭の時刻（時刻がなければ空）"""
+    return f"[{format_timestamp(start)}] " if start is not None else ""
+
+def main():
+    """コマンドラインから会議アーカイブを検索"""
+    parser = argparse.ArgumentParser(description="会議アーカイブの検索")
+    parser.add_argument("query", nargs="?", default="", help="検索語（空白区切りのすべてを含む）")
+    parser.add_argument("--db", default="data/archive.db", help="アーカイブのデータベース")
+    parser.add_argument("--segments", action="store_true", help="議事録項目ではなく転写セグメントを検索")
+    parser.add_argument("--tag", action="append", default=[], metavar="次元:タグ",
+                        help="項目のタグで絞り込む（例: categories:構造、複数指定でAND）")
+    parser.add_argument("--section", action="append", default=[], choices=ITEM_SECTIONS, help="項目名で絞り込む")
+    parser.add_argument("--from", dest="date_from", help="会議日の下限（例: 2024-01-01）")
+    parser.add_argument("--to", dest="date_to", help="会議日の上限")
+    parser.add_argument("--limit", type=int, default=20, help="最大件数")
+    parser.add_argument("--relevance", action="store_true", help="関連度順（既定は保存の新しい順）")
+    parser.add_argument("--list", action="store_true", help="保存した会議の一覧を表示")
+    parser.add_argument("--retag", action="store_true", help="現在のタクソノミーで全会議を再タグ付け（中断しても再開可能）")
+    parser.add_argument("--workers", type=int, help="再タグ付けのワーカープロセス数（既定はCPU数）")
+    parser.add_argument("--keyword-only", action="store_true",
+                        help="埋め込みモデルを使わずキーワードだけで再タグ付け（埋め込みによるタグは付かない）")
+    args = parser.parse_args()
+    order = "relevance" if args.relevance else "recent"
+
+    with MeetingArchive(args.db) as archive:
+        if args.retag:
+            from .semantic_tagger import SemanticTagger
+            from .tag_index import TagIndex
+            from .tagger import SmartTagger
+
+            # アプリと同じく、ベクターDBの埋め込みモデルがあれば埋め込みによる分類も行う
+            semantic = None
+            if not args.keyword_only:
+                try:
+                    from .vector_db import VectorDB
+                    semantic = SemanticTagger(VectorDB("auto").model)
+                except Exception as e:
+                    print(f"埋め込みモデルを読み込めません（{e}）。"
+                          "キーワードだけで再タグ付けする場合は --keyword-only を指定してください")
+                    return
+
+            data_dir = Path(args.db).parent
+            tagger = SmartTagger(index=TagIndex(str(data_dir / "tag_index.npz")), semantic=semantic)
+            stats = tagger.tag_many(archive.iter_minutes(), archive.update_minutes, workers=args.workers,
+                                    checkpoint=str(data_dir / "retag.checkpoint"))
+            print(f"{stats['meetings']}会議（{stats['items']}項目）を再タグ付け: {stats['seconds']:.1f}秒 "
+                  f"({stats['meetings_per_second']:.1f}会議/秒、{stats['skipped']}会議は再開により省略)")
+            return
+
+        if args.list:
+            for meeting in archive.meetings(args.limit):
+                print(f"{meeting['date'] or '-'}  {meeting['meeting']}  ({meeting['items']}項目)")
+            return
+
+        if args.segments:
+            for hit in archive.search_segments(args.query, args.date_from, args.date_to, args.limit, order):
+                print(f"{hit['meeting']} {_format_time(hit['start'])}{hit['text']}")
+            return
+
+        tags = [tuple(tag.split(":", 1)) for tag in args.tag if ":" in tag]
+        hits = archive.search_items(args.query, tags, args.section, args.date_from, args.date_to, args.limit, order)
+        for hit in hits:
+            assignee = f" (担当: {hit['assignee']})" if hit["assignee"] else ""
+            print(f"{hit['meeting']} [{hit['section']}] {_format_time(hit['start'])}{hit['content']}{assignee}")
+
+if __name__ == "__main__":
+    main()
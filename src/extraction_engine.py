@@ -0,0 +1,312 @@
+"""
+術語抽出エンジン
+PDFバックエンド・パターンセット・ページテキストキャッシュを共通化し、各術語抽出器から利用する
+"""
+
+import functools
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+import logging
+
+from .pattern_matcher import compile_patterns
+from .term_patterns import PatternSet, get_pattern_set
+from .text_cache import PageReader, PageTextCache
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_CLEAN_RE = re.compile(r'^[^\w\u4e00-\u9faf]+|[^\w\u4e00-\u9faf]+$')
+_DIGITS_RE = re.compile(r'^\d+$')
+
+class TermHit(NamedTuple):
+    """術語の1回の出現"""
+    term: str
+    category: str
+    source: str
+    page: int  # 1始まり
+
+def current_rss_mb() -> Optional[float]:
+    """現在のプロセスの常駐メモリ（MB、取得できない環境ではNone）"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+def read_pages_pdfplumber(pdf_path: str, start: int = 0, end: Optional[int] = None,
+                          max_rss_mb: Optional[float] = None, check_interval: int = 20,
+                          render: Optional[Callable[[Any], str]] = None) -> Iterator[str]:
+    """
+    pdfplumberでページテキストを順に抽出
+
+    各ページの解析結果（レイアウトオブジェクト）は抽出後に破棄する。
+    pdfminerの文書オブジェクトキャッシュはページ数に応じて増えるため、
+    max_rss_mb を指定した場合は常駐メモリが上限を超えた時点で文書を開き直し、
+    続きのページから抽出を再開する。文書を閉じても上限を下回らない場合（上限が
+    元の常駐メモリより小さいなど）は、開き直しても効果がないため以降は開き直さない。
+
+    Args:
+        pdf_path: PDFファイルパス
+        start: 開始ページ（0始まり）
+        end: 終了ページ（このページを含まない、Noneで最終ページまで）
+        max_rss_mb: 常駐メモリの上限（MB、Noneで無制限）
+        check_interval: 常駐メモリを確認するページ間隔
+        render: ページオブジェクトから文字列を作る関数（Noneでページテキスト、文字座標を使う解析用）
+
+    Yields:
+        ページテキスト（render の指定時はその結果）
+    """
+    import pdfplumber
+
+    page_index = start
+    while True:
+        pages = None if end is None else list(range(page_index + 1, end + 1))
+        reopen = False
+
+        with pdfplumber.open(pdf_path, pages=pages) as pdf:
+            pdf_pages = pdf.pages
+            if end is None:
+                end = len(pdf_pages)
+                pdf_pages = pdf_pages[page_index:]
+
+            for page in pdf_pages:
+                yield render(page) if render else page.extract_text() or ""
+                page.close()
+                page_index += 1
+
+                if (max_rss_mb and page_index % check_interval == 0 and page_index < end
+                        and (current_rss_mb() or 0) > max_rss_mb):
+                    reopen = True
+                    break
+
+        if not reopen:
+            return
+
+        # 閉じた後も上限を超えている場合は、開き直しても下回らない
+        rss_mb = current_rss_mb() or 0
+        if rss_mb > max_rss_mb:
+            logger.warning(f"RSS stays at {rss_mb:.0f}MB after closing {pdf_path} (limit {max_rss_mb}MB); "
+                           f"reading the remaining pages without reopening")
+            max_rss_mb = None
+        else:
+            logger.info(f"Reopening {pdf_path} at page {page_index + 1} (RSS above {max_rss_mb}MB)")
+
+def read_pages_pypdf2(pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """PyPDF2でページテキストを順に抽出（読み込めないページは空文字）"""
+    import PyPDF2
+
+    with open(pdf_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        logger.info(f"{pdf_path}: {len(reader.pages)} pages")
+
+        for page_num, page in enumerate(reader.pages[start:end], start + 1):
+            try:
+                yield page.extract_text() or ""
+            except Exception as e:
+                logger.warning(f"Failed to read page {page_num} of {pdf_path}: {e}")
+                yield ""
+
+# バックエンド名 -> ページ抽出関数（名前はページテキストキャッシュのキーにもなる）
+PDF_BACKENDS: Dict[str, PageReader] = {
+    "pdfplumber": read_pages_pdfplumber,
+    "pypdf2": read_pages_pypdf2,
+}
+
+class ExtractionEngine:
+    def __init__(self, pattern_set: Union[str, PatternSet] = "building", backend: str = "pdfplumber",
+                 text_cache: Optional[PageTextCache] = None, backend_options: Optional[Dict[str, Any]] = None):
+        """
+        術語抽出エンジンを初期化
+
+        コンパイル済みのマッチャーはパターン定義をキーに共有されるため、
+        エンジン自体は保持せず、プロセスプールにもそのまま渡せる。
+
+        Args:
+            pattern_set: パターンセット名、またはパターンセット
+            backend: PDFバックエンド名（"pdfplumber", "pypdf2"）
+            text_cache: ページテキストキャッシュ（指定時はPDFの再解析を省略）
+            backend_options: バックエンドのページ抽出関数に渡す追加引数（pdfplumberの max_rss_mb など）
+        """
+        if backend not in PDF_BACKENDS:
+            raise ValueError(f"Unknown PDF backend: {backend}")
+
+        self.pattern_set = get_pattern_set(pattern_set) if isinstance(pattern_set, str) else pattern_set
+        self.backend = backend
+        self.text_cache = text_cache
+        self.backend_options = backend_options or {}
+
+    def extract(self, pdf_paths: Iterable[str]) -> Iterator[TermHit]:
+        """
+        PDFファイル群から術語の出現を順に抽出
+
+        読み込めないファイルはログに記録して次のファイルへ進む。
+
+        Args:
+            pdf_paths: PDFファイルパス
+
+        Yields:
+            術語の出現（ファイル順・ページ順）
+        """
+        for pdf_path in pdf_paths:
+            try:
+                yield from self.extract_pages(pdf_path)
+            except Exception as e:
+                logger.error(f"Error extracting from {pdf_path}: {e}")
+
+    def extract_pages(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[TermHit]:
+        """
+        PDFの指定ページ範囲から術語の出現を抽出
+
+        Args:
+            pdf_path: PDFファイルパス
+            start: 開始ページ（0始まり）
+            end: 終了ページ（このページを含まない、Noneで最終ページまで）
+
+        Yields:
+            術語の出現（ページ順）
+        """
+        for page_num, text in enumerate(self.iter_page_texts(pdf_path, start, end), start + 1):
+            yield from self.extract_text(text, pdf_path, page_num)
+
+    def extract_text(self, text: str, source: str = "", page: int = 1) -> Iterator[TermHit]:
+        """
+        テキストから術語の出現を抽出
+
+        Args:
+            text: 対象テキスト
+            source: 出典（ファイルパスなど）
+            page: ページ番号
+
+        Yields:
+            術語の出現（カテゴリ順、同じ術語は出現回数分）
+        """
+        if not text:
+            return
+        for category, counts in self.count_terms(text).items():
+            for term, count in counts.items():
+                hit = TermHit(term, category, source, page)
+                for _ in range(count):
+                    yield hit
+
+    def iter_page_texts(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """
+        PDFのページテキストを順に取得（キャッシュがあればPDFは解析しない）
+
+        Args:
+            pdf_path: PDFファイルパス
+            start: 開始ページ（0始まり）
+            end: 終了ページ（このページを含まない、Noneで最終ページまで）
+
+        Yields:
+            ページテキスト
+        """
+        read_pages = functools.partial(PDF_BACKENDS[self.backend], **self.backend_options)
+        if self.text_cache:
+            yield from self.text_cache.iter_pages(pdf_path, self.backend, read_pages, start, end)
+        else:
+            yield from read_pages(pdf_path, start, end)
+
+    def iter_page_records(self, pdf_path: str, name: str, render: Callable[[Any], str],
+                          start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """
+        pdfplumberのページオブジェクトから作った文字列（文字座標を使う解析の結果など）を順に取得
+
+        ページテキストと同じキャッシュ・メモリ上限付きの読み込みを使い、
+        キャッシュは「バックエンド名+解析の名前」をキーに保存する（キャッシュがあればPDFは解析しない）。
+
+        Args:
+            pdf_path: PDFファイルパス
+            name: 解析の名前（解析の設定を含め、設定が変われば別のキャッシュになるようにする）
+            render: ページオブジェクト -> 文字列（ページ順に呼ばれ、直前のページの結果を引き継いでよい）
+            start: 開始ページ（0始まり）
+            end: 終了ページ（このページを含まない、Noneで最終ページまで）
+
+        Yields:
+            ページごとの render の結果
+        """
+        if self.backend != "pdfplumber":
+            raise ValueError(f"Page records need the pdfplumber backend (configured: {self.backend})")
+        read_pages = functools.partial(read_pages_pdfplumber, render=render, **self.backend_options)
+        if self.text_cache:
+            yield from self.text_cache.iter_pages(pdf_path, f"{self.backend}+{name}", read_pages, start, end)
+        else:
+            yield from read_pages(pdf_path, start, end)
+
+    def count_terms(self, text: str) -> Dict[str, Counter]:
+        """
+        テキスト中の術語の出現回数をカテゴリ別に数える
+
+        全パターンを一回の走査で照合する。同じ箇所が同じカテゴリの複数のパターンに
+        一致した場合に重複して数えないよう、術語ごとにパターン別の一致数の最大値を出現回数とする。
+
+        Args:
+            text: 対象テキスト
+
+        Returns:
+            カテゴリ -> 術語の出現回数
+        """
+        pattern_set = self.pattern_set
+        matcher = compile_patterns(pattern_set.patterns, pattern_set.flags)
+        counts = {category: Counter() for category in pattern_set.patterns}
+
+        for (category, _), matches in zip(matcher.compiled, matcher.findall_per_pattern(text)):
+            pattern_counts = Counter()
+            for match in matches:
+                term = self.clean_term(match) if pattern_set.clean else match
+                if self.is_valid_term(term):
+                    pattern_counts[term] += 1
+            counts[category] |= pattern_counts
+
+        return counts
+
+    @staticmethod
+    def clean_term(term: str) -> str:
+        """前後の空白や記号を除去"""
+        return _CLEAN_RE.sub('', term).strip()
+
+    def is_valid_term(self, term: str) -> bool:
+        """長さ・除外語・数字のみでないことをチェック"""
+        pattern_set = self.pattern_set
+        if len(term) < pattern_set.min_length:
+            return False
+        if pattern_set.max_length is not None and len(term) > pattern_set.max_length:
+            return False
+        if term in pattern_set.exclude_words:
+            return False
+        if _DIGITS_RE.match(term):
+            return False
+        return True
+
+    def fingerprint(self) -> str:
+        """パターンセットとバックエンドのハッシュ（変更時に抽出結果を無効化するため）"""
+        pattern_set = self.pattern_set
+        config = json.dumps([pattern_set.patterns, pattern_set.flags, sorted(pattern_set.exclude_words),
+                             pattern_set.min_length, pattern_set.max_length, pattern_set.clean,
+                             self.backend], ensure_ascii=False)
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def collect(hits: Iterable[TermHit]) -> Dict[str, List[str]]:
+        """
+        術語の出現をカテゴリ別の術語リストにまとめる
+
+        Args:
+            hits: 術語の出現
+
+        Returns:
+            カテゴリ -> ソート済み術語リスト（出現のないカテゴリは含まない）
+        """
+        by_category: Dict[str, set] = {}
+        for hit in hits:
+            by_category.setdefault(hit.category, set()).add(hit.term)
+        return {category: sorted(terms) for category, terms in by_category.items()}
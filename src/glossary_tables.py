@@ -0,0 +1,254 @@
+"""
+用語集テーブル抽出
+「用語 / 読み / 区分 / 定義」形式の表を文字座標から直接読み取り、行ごとに術語として取り込む
+"""
+
+import hashlib
+import json
+import unicodedata
+from bisect import bisect_right
+from dataclasses import asdict, dataclass
+from statistics import median
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import logging
+
+from .extraction_engine import ExtractionEngine, read_pages_pdfplumber
+
+logger = logging.getLogger(__name__)
+
+# 列名 -> 見出しに使われる語（NFKC正規化・空白除去後に前方一致で判定）
+HEADER_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "term": ("用語", "術語", "名称", "項目"),
+    "reading": ("読み", "よみ", "フリガナ", "ふりがな", "読み方"),
+    "category": ("区分", "分類", "カテゴリ", "種別"),
+    "definition": ("定義", "説明", "意味", "解説", "内容"),
+}
+
+# 用語集に固有の見出し（用語列が「用語」「術語」で、読みか定義の列があれば2列でも用語集とみなす）
+GLOSSARY_TERM_KEYWORDS = ("用語", "術語")
+GLOSSARY_DEFINITION_KEYWORDS = ("定義", "説明", "意味", "解説")
+
+# 用語列が一般的な語（名称・項目など）の表を用語集とみなす最小の列数（読みの列も必要）
+MIN_GENERIC_COLUMNS = 3
+
+@dataclass
+class GlossaryEntry:
+    """用語集テーブルの1行"""
+    term: str
+    reading: str = ""
+    category: str = ""
+    definition: str = ""
+    page: int = 0
+
+# 行内のセル: (左端x, 右端x, テキスト)
+Cell = Tuple[float, float, str]
+
+class GlossaryTableExtractor:
+    def __init__(self, min_rows: int = 3, max_term_length: int = 40):
+        """
+        用語集テーブル抽出器を初期化
+
+        表の罫線検出やレイアウト解析は行わず、ページの文字座標だけを使う。
+        文字をy座標で行に、x方向の空白でセルに分け、見出し行の列位置に割り当てる。
+        用語セルが空の行は直前の行の折り返しとして連結する。
+
+        Args:
+            min_rows: 用語集ページとみなす最小行数
+            max_term_length: 用語セルの最大文字数（超える行は用語集の行とみなさない）
+        """
+        self.min_rows = min_rows
+        self.max_term_length = max_term_length
+
+    def iter_pdf_pages(self, pdf_path: str, start: int = 0, end: Optional[int] = None,
+                       engine: Optional[ExtractionEngine] = None
+                       ) -> Iterator[Tuple[int, Optional[List[GlossaryEntry]], str]]:
+        """
+        PDFのページごとに用語集テーブルを検出
+
+        見出し行のないページは、直前のページの列位置で用語集の続きかどうかを判定する。
+
+        Args:
+            pdf_path: PDFファイルパス
+            start: 開始ページ（0始まり）
+            end: 終了ページ（このページを含まない、Noneで最終ページまで）
+            engine: 読み込みに使う術語抽出エンジン（ページのキャッシュ・メモリ上限を共有、
+                Noneでキャッシュせずpdfplumberで読む）
+
+        Yields:
+            (ページ番号, 用語集の行（用語集でなければNone）, 用語集でないページのテキスト)
+        """
+        render = self.page_renderer()
+        if engine is not None:
+            records = engine.iter_page_records(pdf_path, f"glossary-{self.fingerprint()}", render, start, end)
+        else:
+            records = read_pages_pdfplumber(pdf_path, start, end, render=render)
+
+        for page_num, record in enumerate(records, start + 1):
+            entries, text = self.decode_page(record)
+            yield page_num, entries, text
+
+    def page_renderer(self) -> Callable[[Any], str]:
+        """
+        pdfplumberのページを判定結果の文字列（キャッシュに保存するJSON）に変換する関数
+
+        返す関数はページ順に呼び出し、直前のページの列位置を引き継ぐ。
+        """
+        columns = None
+
+        def render(page) -> str:
+            nonlocal columns
+            entries, columns = self.extract_page(page.chars, columns)
+            if entries is None:
+                return json.dumps({"text": page.extract_text() or ""}, ensure_ascii=False)
+            for entry in entries:
+                entry.page = page.page_number
+            return json.dumps({"entries": [asdict(entry) for entry in entries]}, ensure_ascii=False)
+
+        return render
+
+    @staticmethod
+    def decode_page(record: str) -> Tuple[Optional[List[GlossaryEntry]], str]:
+        """判定結果の文字列を (用語集の行（用語集でなければNone）, 用語集でないページのテキスト) に戻す"""
+        data = json.loads(record)
+        if "entries" in data:
+            return [GlossaryEntry(**entry) for entry in data["entries"]], ""
+        return None, data.get("text", "")
+
+    def fingerprint(self) -> str:
+        """見出しの判定・抽出の設定のハッシュ（ページの判定結果のキャッシュのキー）"""
+        config = json.dumps([HEADER_KEYWORDS, GLOSSARY_TERM_KEYWORDS, GLOSSARY_DEFINITION_KEYWORDS,
+                             MIN_GENERIC_COLUMNS, self.min_rows, self.max_term_length], ensure_ascii=False)
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+
+    def extract_page(self, chars: List[Dict],
+                     columns: Optional[List[Tuple[str, float, float]]] = None
+                     ) -> Tuple[Optional[List[GlossaryEntry]], Optional[List[Tuple[str, float, float]]]]:
+        """
+        1ページの文字から用語集テーブルの行を抽出
+
+        Args:
+            chars: pdfplumberの文字オブジェクト（text, x0, x1, top, bottom, size）
+            columns: 直前のページの列位置 [(列名, 左端x, 右端x)]
+
+        Returns:
+            (用語集の行（用語集でなければNone）, 次のページに引き継ぐ列位置)
+        """
+        rows = self._group_rows(chars)
+        header_index = None
+        for index, (_, cells) in enumerate(rows):
+            header = self._match_header(cells)
+            if header:
+                header_index, columns = index, header
+                break
+
+        if columns is None:
+            return None, None
+
+        body = rows[header_index + 1:] if header_index is not None else rows
+        entries = self._read_rows(body, columns)
+        if len(entries) < self.min_rows:
+            # 見出しのないページで続きと判定できなければ列位置は引き継がない
+            return None, columns if header_index is not None else None
+        return entries, columns
+
+    @staticmethod
+    def _group_rows(chars: List[Dict]) -> List[Tuple[float, List[Cell]]]:
+        """文字をy座標で行にまとめ、x方向の空白でセルに分ける"""
+        glyphs = [char for char in chars if char["text"].strip()]
+        if not glyphs:
+            return []
+        glyphs.sort(key=lambda char: (round(char["top"]), char["x0"]))
+
+        lines: List[List[Dict]] = []
+        for char in glyphs:
+            # 同じ行: 上端の差が文字サイズの半分未満
+            if lines and abs(char["top"] - lines[-1][0]["top"]) < char["size"] * 0.5:
+                lines[-1].append(char)
+            else:
+                lines.append([char])
+
+        rows = []
+        for line in lines:
+            line.sort(key=lambda char: char["x0"])
+            cells: List[Cell] = []
+            x0, x1, text = line[0]["x0"], line[0]["x1"], [line[0]["text"]]
+            for char in line[1:]:
+                gap = char["x0"] - x1
+                if gap > char["size"]:
+                    cells.append((x0, x1, "".join(text)))
+                    x0, text = char["x0"], []
+                elif gap > char["size"] * 0.2:
+                    text.append(" ")
+                text.append(char["text"])
+                x1 = char["x1"]
+            cells.append((x0, x1, "".join(text)))
+            rows.append((line[0]["top"], cells))
+        return rows
+
+    @staticmethod
+    def _match_header(cells: List[Cell]) -> Optional[List[Tuple[str, float, float]]]:
+        """
+        見出し行なら列位置 [(列名, 左端x, 右端x)] を返す
+
+        「項目 / 内容」「名称 / 種別 / 内容」のような一般の仕様表・工程表を用語集としないよう、
+        用語列が「用語」「術語」で読みか定義（定義・説明など）の列があるか、
+        読みの列を含む3列以上の見出しのみを用語集の見出しとする。
+        """
+        columns = []
+        labels: Dict[str, str] = {}
+        for x0, x1, text in cells:
+            label = unicodedata.normalize("NFKC", text).replace(" ", "")
+            field = next((name for name, keywords in HEADER_KEYWORDS.items()
+                          if any(label.startswith(keyword) for keyword in keywords)
+                          and len(label) <= len(max(keywords, key=len)) + 2), None)
+            if field is None or field in labels:
+                return None
+            labels[field] = label
+            columns.append((field, x0, x1))
+
+        if "term" not in labels or len(labels) < 2:
+            return None
+        glossary_term = labels["term"].startswith(GLOSSARY_TERM_KEYWORDS)
+        definition = labels.get("definition", "").startswith(GLOSSARY_DEFINITION_KEYWORDS)
+        if glossary_term and ("reading" in labels or definition):
+            return columns
+        if "reading" in labels and len(labels) >= MIN_GENERIC_COLUMNS:
+            return columns
+        return None
+
+    def _read_rows(self, rows: List[Tuple[float, List[Cell]]],
+                   columns: List[Tuple[str, float, float]]) -> List[GlossaryEntry]:
+        """列位置に従ってセルを割り当て、用語集の行を組み立てる"""
+        # 列の境界は隣り合う見出しの間の中点
+        bounds = [(columns[i][2] + columns[i + 1][1]) / 2 for i in range(len(columns) - 1)]
+        names = [name for name, _, _ in columns]
+
+        # 行間が通常の3倍を超えたら表の終わりとみなす（ページ下部の注記・ページ番号など）
+        pitches = [rows[i + 1][0] - rows[i][0] for i in range(len(rows) - 1)]
+        max_pitch = median(pitches) * 3 if pitches else None
+
+        entries: List[GlossaryEntry] = []
+        previous_top = None
+        for top, cells in rows:
+            if previous_top is not None and max_pitch and top - previous_top > max_pitch:
+                break
+            previous_top = top
+
+            values: Dict[str, List[str]] = {}
+            for x0, _, text in cells:
+                values.setdefault(names[bisect_right(bounds, x0)], []).append(text)
+            fields = {name: " ".join(texts).strip() for name, texts in values.items()}
+
+            term = fields.pop("term", "")
+            if term:
+                if len(term) > self.max_term_length or not fields:
+                    continue
+                entries.append(GlossaryEntry(term=term, **fields))
+            elif entries:
+                # 用語セルが空の行は直前の行の折り返し
+                entry = entries[-1]
+                for name, text in fields.items():
+                    current = getattr(entry, name)
+                    setattr(entry, name, current + text if current else text)
+
+        return entries
@@ -0,0 +1,121 @@
+"""
+キーワードオートマトン（Aho-Corasick）
+多数のキーワードを1つのオートマトンにまとめ、テキストを一回走査して全キーワードの出現を位置付きで得る
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+class KeywordMatch(NamedTuple):
+    start: int
+    end: int
+    keyword: str
+    labels: Tuple[Hashable, ...]
+
+class KeywordAutomaton:
+    def __init__(self, entries: Iterable[Tuple[str, Hashable]], ignore_case: bool = True):
+        """
+        キーワードオートマトンを構築
+
+        キーワードのトライに失敗遷移を加え、各状態の出力には失敗遷移先の出力もまとめておく。
+        走査は1文字につき1回の遷移（失敗遷移をたどる回数も全体で文字数以下）のため、
+        キーワード数によらずテキスト長に比例する時間で、重なりや包含を含む全キーワードの出現が得られる。
+
+        Args:
+            entries: (キーワード, ラベル) の組（同じキーワードに複数のラベルを付けられる、空のキーワードは無視）
+            ignore_case: 英字の大文字小文字を区別しない（キーワードとテキストを小文字にして照合）
+        """
+        self.ignore_case = ignore_case
+        keyword_labels: Dict[str, List[Hashable]] = {}
+        for keyword, label in entries:
+            if not keyword:
+                continue
+            if ignore_case:
+                keyword = keyword.lower()
+            labels = keyword_labels.setdefault(keyword, [])
+            if label not in labels:
+                labels.append(label)
+        self.keywords: List[str] = list(keyword_labels)
+        self.labels: List[Tuple[Hashable, ...]] = [tuple(keyword_labels[keyword]) for keyword in self.keywords]
+
+        # トライ（状態 -> 文字 -> 次の状態）と、その状態で終わるキーワード
+        goto: List[Dict[str, int]] = [{}]
+        ends: List[List[int]] = [[]]
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    ends.append([])
+                state = next_state
+            ends[state].append(keyword_id)
+
+        # 失敗遷移（最長の真の接尾辞に当たる状態）と出力を幅優先で求める
+        fail = [0] * len(goto)
+        output: List[Tuple[int, ...]] = [()] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] = tuple(ends[state]) + output[fail[state]]
+            for char, next_state in goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                queue.append(next_state)
+
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def _prepare(self, text: str) -> str:
+        """照合用のテキスト（大文字小文字を区別しない場合は小文字に変換）"""
+        return text.lower() if self.ignore_case else text
+
+    def iter_matches(self, text: str) -> Iterator[KeywordMatch]:
+        """
+        全キーワードの出現を終了位置の順に取得
+
+        大文字小文字を区別しない場合、位置は小文字に変換したテキストでの位置
+        （小文字にすると文字数が変わる一部の文字を除き、元のテキストと同じ）。
+
+        Args:
+            text: 対象テキスト
+
+        Yields:
+            キーワードの出現（同じ終了位置では長いキーワードが先）
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        keywords, labels = self.keywords, self.labels
+        state = 0
+        for position, char in enumerate(self._prepare(text), 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword_id in output[state]:
+                keyword = keywords[keyword_id]
+                yield KeywordMatch(position - len(keyword), position, keyword, labels[keyword_id])
+
+    def keyword_ids_in(self, text: str) -> Set[int]:
+        """テキストに含まれるキーワードの番号の集合（self.keywords の添字）"""
+        goto, fail, output = self._goto, self._fail, self._output
+        states = set()
+        state = 0
+        for char in self._prepare(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                states.add(state)
+        return {keyword_id for state in states for keyword_id in output[state]}
+
+    def labels_in(self, text: str) -> Set[Hashable]:
+        """テキストに含まれるキーワードのラベルの集合"""
+        labels = self.labels
+        return {label for keyword_id in self.keyword_ids_in(text) for label in labels[keyword_id]}
@@ -0,0 +1,72 @@
+"""
+複数キーワード一括検索
+キーワード群を1つの正規表現にまとめ、テキストを一回走査して重なりを含む全出現を得る
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]):
+        """
+        キーワードマッチャーを初期化
+
+        先読み（?=...）の選択パターンで各位置から始まる最長のキーワードを見つけ、
+        その接頭辞になっているキーワードも同じ位置の出現とする。
+        これで他のキーワードに含まれるキーワード（「検討」と「要検討」など）も漏れなく検出できる。
+
+        Args:
+            keywords: キーワード（空文字・重複は無視）
+        """
+        self.keywords = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        alternatives = sorted(self.keywords, key=len, reverse=True)
+        self._finder: Optional[re.Pattern] = None
+        if alternatives:
+            self._finder = re.compile('(?=(' + '|'.join(map(re.escape, alternatives)) + '))')
+
+        # キーワード -> 同じ位置から始まる（接頭辞である）キーワード
+        self._prefixes = {
+            keyword: [other for other in self.keywords if keyword.startswith(other)]
+            for keyword in self.keywords
+        }
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        全キーワードの出現を位置順に取得
+
+        Args:
+            text: 対象テキスト
+
+        Yields:
+            (出現位置, キーワード)
+        """
+        if self._finder is None:
+            return
+        prefixes = self._prefixes
+        for match in self._finder.finditer(text):
+            start = match.start()
+            for keyword in prefixes[match.group(1)]:
+                yield start, keyword
+
+    def keywords_in(self, text: str) -> Set[str]:
+        """テキストに含まれるキーワードの集合"""
+        if self._finder is None:
+            return set()
+        found = set()
+        for longest in set(self._finder.findall(text)):
+            found.update(self._prefixes[longest])
+        return found
+
+@lru_cache(maxsize=32)
+def compile_keywords(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """
+    キーワードからマッチャーを取得（同じキーワード群なら再構築しない）
+
+    Args:
+        keywords: キーワードのタプル
+
+    Returns:
+        キーワードマッチャー
+    """
+    return KeywordMatcher(keywords)
@@ -0,0 +1,317 @@
+"""
+ローカルLLM要約
+Ollama / OpenAI互換のHTTPエンドポイントで、長い文字起こしを区間ごとに並列要約してから統合する
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+# 全文が1区間に収まる場合
+SUMMARY_PROMPT = (
+    "以下は建築関連の会議の文字起こしです。決定事項・行動項目・課題を中心に、"
+    "会議の要約を日本語で簡潔に作成してください。\n\n{text}"
+)
+
+# 区間ごとの要約（map）
+MAP_PROMPT = (
+    "以下は建築関連の会議の文字起こしの一部です。この区間で話された決定事項・行動項目・課題を"
+    "日本語の箇条書きで簡潔にまとめてください。\n\n{text}"
+)
+
+# 区間ごとの要約の統合（reduce）
+REDUCE_PROMPT = (
+    "以下は建築関連の会議の文字起こしを区間ごとに要約したものです。重複をまとめ、"
+    "決定事項・行動項目・課題を中心に会議全体の要約を日本語で簡潔に作成してください。\n\n{text}"
+)
+
+# 文（区切り文字・改行を含む）
+_SENTENCE = re.compile(r'[^。！？\n]*[。！？\n]+|[^。！？\n]+')
+
+def estimate_tokens(text: str) -> int:
+    """トークン数の概算（日本語などの非ASCII文字は1文字1トークン、ASCII文字は4文字1トークン）"""
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return len(text) - ascii_chars + (ascii_chars + 3) // 4
+
+def split_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    テキストを文の区切りでトークン数の上限以内の区間に分割
+
+    1文で上限を超える場合は文字数で分割する（1文字は1トークン以下のため上限を超えない）。
+
+    Args:
+        text: 対象テキスト
+        max_tokens: 1区間のトークン数の上限
+
+    Returns:
+        区間のリスト（空白のみの区間は含まない）
+    """
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush():
+        chunk = "".join(current).strip()
+        if chunk:
+            chunks.append(chunk)
+        current.clear()
+
+    for sentence in _SENTENCE.findall(text):
+        tokens = estimate_tokens(sentence)
+        if current and current_tokens + tokens > max_tokens:
+            flush()
+            current_tokens = 0
+        if tokens > max_tokens:
+            for start in range(0, len(sentence), max_tokens):
+                current.append(sentence[start:start + max_tokens])
+                flush()
+            continue
+        current.append(sentence)
+        current_tokens += tokens
+
+    flush()
+    return chunks
+
+class LLMSummarizer:
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3",
+                 api: str = "ollama", max_chunk_tokens: int = 3000, concurrency: int = 4,
+                 timeout: float = 120.0, cache_dir: Optional[str] = None, api_key: Optional[str] = None,
+                 retry_interval: float = 300.0):
+        """
+        ローカルLLM要約器を初期化
+
+        長い文字起こしはトークン数の上限で区間に分け、区間ごとの要約を並列に要求してから
+        1つの要約に統合する（map-reduce）。区間の要約は同時接続数までスレッドで並列に要求し、
+        HTTP接続はセッションで再利用する。要約結果はプロンプトのハッシュをキーにキャッシュするため、
+        同じ区間を含む文字起こしを再要約しても、その区間はLLMに要求しない。
+        LLMに接続できなかった場合は retry_interval 秒の間は要求せずに None を返し、
+        一括処理で議事録ごとにサーバーへの接続と警告を繰り返さない。
+
+        Args:
+            base_url: エンドポイントのURL（Ollama: http://localhost:11434、OpenAI互換: /v1 の手前まで）
+            model: モデル名
+            api: "ollama"（/api/generate）または "openai"（/v1/chat/completions）
+            max_chunk_tokens: 1区間（1回の要求）のトークン数の上限
+            concurrency: 同時に要求する区間数
+            timeout: 1回の要求の応答待ち時間（秒）
+            cache_dir: 要約結果のキャッシュディレクトリ（Noneでメモリのみ）
+            api_key: OpenAI互換APIのキー
+            retry_interval: 利用できなかったLLMに再び要求するまでの秒数
+        """
+        if api not in ("ollama", "openai"):
+            raise ValueError(f"Unknown LLM API: {api}")
+
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api = api
+        self.max_chunk_tokens = max_chunk_tokens
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.api_key = api_key
+        self.retry_interval = retry_interval
+
+        # 利用できないと判定した時刻（time.monotonic、Noneで利用可能とみなす）
+        self._unavailable_since: Optional[float] = None
+        self._cache: Dict[str, str] = {}
+        self._session = None
+
+    def summarize(self, transcript: str, fallback: Callable[[str], str]) -> Optional[str]:
+        """
+        文字起こしを要約
+
+        要約に失敗した区間は fallback（ルールベースの要約など）で置き換えて統合する。
+
+        Args:
+            transcript: 文字起こし
+            fallback: 区間テキストから要約を作る関数（LLMが失敗した区間に使用）
+
+        Returns:
+            要約（LLMを利用できない場合、または統合に失敗した場合はNone）
+        """
+        if requests is None:
+            if self._unavailable_since is None:
+                logger.warning("requests is not installed; local LLM summarization is unavailable")
+                self._unavailable_since = time.monotonic()
+            return None
+        if self._unavailable_since is not None:
+            if time.monotonic() - self._unavailable_since < self.retry_interval:
+                logger.debug(f"Skipping local LLM at {self.base_url} (unavailable)")
+                return None
+
+        chunks = split_chunks(transcript, self.max_chunk_tokens)
+        if not chunks:
+            return None
+        self._get_session()
+
+        if len(chunks) == 1:
+            summaries = [self._complete(SUMMARY_PROMPT.format(text=chunks[0]))]
+        else:
+            summaries = self._complete_many([MAP_PROMPT.format(text=chunk) for chunk in chunks])
+
+        failed = sum(1 for summary in summaries if summary is None)
+        if failed == len(chunks):
+            # 警告は利用できなくなった時だけ（再試行でも失敗した場合は記録しない）
+            if self._unavailable_since is None:
+                logger.warning(f"Local LLM at {self.base_url} is unavailable; "
+                               f"retrying after {self.retry_interval:.0f}s")
+            self._unavailable_since = time.monotonic()
+            return None
+        if self._unavailable_since is not None:
+            logger.info(f"Local LLM at {self.base_url} is available again")
+            self._unavailable_since = None
+        if len(chunks) == 1:
+            return summaries[0]
+        if failed:
+            logger.warning(f"LLM summarization failed for {failed}/{len(chunks)} chunks; using rule-based summaries")
+        summaries = [summary if summary is not None else fallback(chunk)
+                     for summary, chunk in zip(summaries, chunks)]
+
+        return self._reduce(summaries)
+
+    def _reduce(self, summaries: List[str]) -> Optional[str]:
+        """区間の要約を統合（上限に収まらない間は、収まる組ごとに並列に統合を繰り返す）"""
+        while True:
+            groups = self._group(summaries)
+            if len(groups) == 1:
+                return self._complete(REDUCE_PROMPT.format(text=self._join(groups[0])))
+
+            reduced = self._complete_many([REDUCE_PROMPT.format(text=self._join(group)) for group in groups])
+            if any(summary is None for summary in reduced):
+                return None
+            summaries = reduced
+
+    def _group(self, summaries: List[str]) -> List[List[str]]:
+        """要約をトークン数の上限以内の組に分ける（組の数が必ず減るよう、1組は2件以上）"""
+        groups: List[List[str]] = []
+        tokens = 0
+        for summary in summaries:
+            summary_tokens = estimate_tokens(summary)
+            if groups and (len(groups[-1]) < 2 or tokens + summary_tokens <= self.max_chunk_tokens):
+                groups[-1].append(summary)
+                tokens += summary_tokens
+            else:
+                groups.append([summary])
+                tokens = summary_tokens
+        return groups
+
+    @staticmethod
+    def _join(summaries: List[str]) -> str:
+        """要約を番号付きで連結"""
+        return "\n\n".join(f"[{i}]\n{summary}" for i, summary in enumerate(summaries, 1))
+
+    def _complete_many(self, prompts: List[str]) -> List[Optional[str]]:
+        """複数のプロンプトを同時接続数まで並列に要求（結果はプロンプトの順）"""
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(prompts)))) as pool:
+            return list(pool.map(self._complete, prompts))
+
+    def _complete(self, prompt: str) -> Optional[str]:
+        """
+        プロンプトの応答を取得（キャッシュがあれば要求しない）
+
+        Args:
+            prompt: プロンプト
+
+        Returns:
+            応答テキスト（失敗時はNone）
+        """
+        key = hashlib.sha256(json.dumps([self.api, self.model, prompt], ensure_ascii=False).encode('utf-8')).hexdigest()
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._read_cache(key)
+        if cached is not None:
+            self._cache[key] = cached
+            return cached
+
+        try:
+            text = self._request(prompt)
+        except requests.ConnectionError as e:
+            # サーバー未起動など（全区間で失敗した場合は summarize でまとめて記録）
+            logger.debug(f"Local LLM connection failed: {e}")
+            return None
+        except (requests.RequestException, KeyError, IndexError, TypeError, ValueError) as e:
+            logger.warning(f"Local LLM request failed: {e}")
+            return None
+
+        if not text:
+            return None
+        self._cache[key] = text
+        self._write_cache(key, text)
+        return text
+
+    def _request(self, prompt: str) -> str:
+        """LLMに1回要求して応答テキストを返す"""
+        session = self._get_session()
+        timeout = (min(self.timeout, 5.0), self.timeout)
+
+        if self.api == "ollama":
+            response = session.post(f"{self.base_url}/api/generate", timeout=timeout, json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False,
+                "options": {"temperature": 0},
+            })
+            response.raise_for_status()
+            return response.json()["response"].strip()
+
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        response = session.post(f"{self.base_url}/v1/chat/completions", timeout=timeout, headers=headers, json={
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0,
+        })
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+
+    def _get_session(self):
+        """HTTPセッション（同時接続数分の接続をプールして再利用）"""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def _cache_path(self, key: str) -> Path:
+        """キャッシュファイルのパス"""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read_cache(self, key: str) -> Optional[str]:
+        """ディスクキャッシュから応答を読み込む"""
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_cache(self, key: str, text: str):
+        """応答をディスクキャッシュに保存"""
+        if self.cache_dir is None:
+            return
+        cache_path = self._cache_path(key)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"model": self.model, "text": text}, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache {cache_path}: {e}")
@@ -0,0 +1,291 @@
+"""
+会議資料パッセージ索引
+会議資料PDFを短いパッセージに分け、BM25（文字bigram）とベクトル類似度で複数の文をまとめて検索する
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .extraction_engine import ExtractionEngine
+from .pdf_manifest import file_sha256
+from .text_cache import PageTextCache
+from .text_rank import char_ngram_counts
+
+logger = logging.getLogger(__name__)
+
+# 文（区切り文字・改行を含む）
+_SENTENCE = re.compile(r'[^。！？\n]*[。！？\n]+|[^。！？\n]+')
+
+# 埋め込みモデルの識別に使う文（モデルが変わるとキャッシュのキーも変わる）
+_FINGERPRINT_TEXT = "鉄筋コンクリート造の基礎工事"
+
+class Passage(NamedTuple):
+    text: str
+    source: str  # PDFファイルパス
+    page: int    # ページ番号（1始まり）
+
+def split_passages(text: str, max_chars: int = 200) -> List[str]:
+    """
+    ページテキストを文の区切りで max_chars 文字以内のパッセージに分割
+
+    前のパッセージの最後の文を次のパッセージの先頭にも含め、パッセージの境界をまたぐ記述も検索できるようにする。
+    1文で上限を超える場合は文字数で分割する。
+
+    Args:
+        text: ページテキスト
+        max_chars: 1パッセージの文字数の上限
+
+    Returns:
+        パッセージのリスト（空白のみのパッセージは含まない）
+    """
+    passages = []
+    current: List[str] = []
+    length = 0
+
+    for sentence in _SENTENCE.findall(text):
+        if not sentence.strip():
+            continue
+        for start in range(0, len(sentence), max_chars):
+            piece = sentence[start:start + max_chars]
+            if current and length + len(piece) > max_chars:
+                passages.append("".join(current).strip())
+                last = current[-1]
+                current, length = ([last], len(last)) if len(last) + len(piece) <= max_chars else ([], 0)
+            current.append(piece)
+            length += len(piece)
+
+    if current:
+        passages.append("".join(current).strip())
+    return [passage for passage in passages if passage]
+
+class MaterialIndex:
+    def __init__(self, model=None, cache_dir: Optional[str] = "data/material_index",
+                 text_cache: Optional[PageTextCache] = None, backend: str = "pdfplumber",
+                 passage_chars: int = 200, ngram_range: Tuple[int, int] = (2, 2),
+                 k1: float = 1.5, b: float = 0.75, vector_weight: float = 0.5, batch_size: int = 64):
+        """
+        会議資料パッセージ索引を初期化
+
+        パッセージとその埋め込みはPDFの内容のハッシュをキーにファイルごとにキャッシュするため、
+        同じ資料で索引を作り直しても、PDFの解析と埋め込みの計算は行わない。
+        BM25の重みはパッセージから毎回計算する（疎行列の演算のみで、数千パッセージでも数十ミリ秒）。
+        検索は全クエリのn-gram行列と重み行列の積1回と、クエリの埋め込みの一括計算で行う。
+
+        Args:
+            model: 埋め込みモデル（SentenceTransformer、VectorDBと共有。NoneでBM25のみ）
+            cache_dir: パッセージ・埋め込みのキャッシュディレクトリ（Noneでメモリのみ）
+            text_cache: ページテキストキャッシュ（指定時はPDFの再解析を省略）
+            backend: PDFバックエンド名
+            passage_chars: 1パッセージの文字数の上限
+            ngram_range: BM25に使う文字n-gramの最小・最大文字数
+            k1: BM25の語頻度の飽和パラメータ
+            b: BM25の文書長の正規化パラメータ
+            vector_weight: スコアにおけるベクトル類似度の重み（0でBM25のみ）
+            batch_size: 埋め込みを一度に計算する文数
+        """
+        self.model = model
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.engine = ExtractionEngine(backend=backend, text_cache=text_cache)
+        self.passage_chars = passage_chars
+        self.ngram_range = ngram_range
+        self.k1 = k1
+        self.b = b
+        self.vector_weight = vector_weight if model is not None else 0.0
+        self.batch_size = batch_size
+
+        self.passages: List[Passage] = []
+        self._embeddings: Optional[np.ndarray] = None
+        self._vocabulary = np.zeros(0, dtype=np.int64)
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._weights_t = None
+        self._config_key: Optional[str] = None
+
+        # ファイルごとのパッセージ・埋め込み（キャッシュキー -> (テキスト, ページ番号, 埋め込み)）
+        self._files: Dict[str, Tuple[List[str], List[int], Optional[np.ndarray]]] = {}
+        # 検索結果（(クエリ, k) -> 結果）。索引を作り直すと破棄
+        self._results: Dict[Tuple[str, int], List[Tuple[Passage, float]]] = {}
+
+    def build(self, pdf_paths: Iterable[str]) -> int:
+        """
+        会議資料PDFから索引を構築（既存の索引は置き換え）
+
+        読み込めないファイルはログに記録して次のファイルへ進む。
+
+        Args:
+            pdf_paths: PDFファイルパス
+
+        Returns:
+            パッセージ数
+        """
+        passages: List[Passage] = []
+        embeddings: List[np.ndarray] = []
+        for pdf_path in pdf_paths:
+            pdf_path = str(pdf_path)
+            try:
+                texts, pages, vectors = self._load_file(pdf_path)
+            except Exception as e:
+                logger.error(f"Error indexing {pdf_path}: {e}")
+                continue
+            passages.extend(Passage(text, pdf_path, page) for text, page in zip(texts, pages))
+            if vectors is not None and len(vectors):
+                embeddings.append(vectors)
+
+        self.passages = passages
+        self._embeddings = np.vstack(embeddings) if self.vector_weight and embeddings else None
+        self._build_bm25()
+        self._results.clear()
+
+        logger.info(f"Indexed {len(passages)} passages from meeting materials")
+        return len(passages)
+
+    def search_batch(self, queries: Sequence[str], k: int = 3,
+                     min_score: float = 0.0) -> List[List[Tuple[Passage, float]]]:
+        """
+        複数のクエリの上位パッセージをまとめて検索
+
+        スコアはBM25をクエリのn-gramのIDFの合計で割った値（クエリのn-gramが資料に現れる割合の目安、最大1）と、
+        埋め込みのコサイン類似度の重み付き和。
+
+        Args:
+            queries: クエリ（議事録の文など）
+            k: クエリごとのパッセージ数
+            min_score: これ以下のスコアのパッセージは除外
+
+        Returns:
+            クエリごとの (パッセージ, スコア) のリスト（スコアの降順）
+        """
+        if not self.passages or k <= 0:
+            return [[] for _ in queries]
+
+        pending = list(dict.fromkeys(query for query in queries if (query, k) not in self._results))
+        if pending:
+            for query, result in zip(pending, self._search(pending, k)):
+                self._results[(query, k)] = result
+
+        return [[(passage, score) for passage, score in self._results[(query, k)] if score > min_score]
+                for query in queries]
+
+    def _search(self, queries: List[str], k: int) -> List[List[Tuple[Passage, float]]]:
+        """キャッシュにないクエリを一括検索"""
+        query_counts, _ = char_ngram_counts(queries, self.ngram_range, self._vocabulary)
+        scores = (query_counts @ self._weights_t).toarray()
+        bound = query_counts @ self._idf
+        bound[bound == 0] = 1
+        scores = np.minimum(scores / bound[:, None], 1.0)
+
+        if self._embeddings is not None:
+            similarity = self._encode(queries) @ self._embeddings.T
+            scores = (1 - self.vector_weight) * scores + self.vector_weight * np.maximum(similarity, 0)
+
+        k = min(k, len(self.passages))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            order = candidates[np.argsort(-row[candidates], kind="stable")]
+            results.append([(self.passages[i], float(row[i])) for i in order])
+        return results
+
+    def _build_bm25(self):
+        """パッセージのBM25の重み行列（n-gram x パッセージ）を計算"""
+        counts, self._vocabulary = char_ngram_counts([passage.text for passage in self.passages], self.ngram_range)
+        num_passages = counts.shape[0]
+        if num_passages == 0:
+            self._idf = np.zeros(0, dtype=np.float32)
+            self._weights_t = counts.T.tocsr()
+            return
+
+        doc_len = np.asarray(counts.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() or 1.0
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        self._idf = np.log(1 + (num_passages - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+        tf = counts.data
+        length_norm = np.repeat(1 - self.b + self.b * doc_len / avg_len, np.diff(counts.indptr))
+        counts.data = (self._idf[counts.indices] * tf * (self.k1 + 1)
+                       / (tf + self.k1 * length_norm)).astype(np.float32)
+        self._weights_t = counts.T.tocsr()
+
+    def _load_file(self, pdf_path: str) -> Tuple[List[str], List[int], Optional[np.ndarray]]:
+        """
+        PDFのパッセージと埋め込みを取得（キャッシュがなければ抽出して保存）
+
+        Args:
+            pdf_path: PDFファイルパス
+
+        Returns:
+            (パッセージのテキスト, ページ番号, 埋め込み（モデルがなければNone）)
+        """
+        key = f"{file_sha256(pdf_path)}.{self._get_config_key()}"
+        cached = self._files.get(key) or self._read_cache(key)
+        if cached is None:
+            texts, pages = [], []
+            for page, text in enumerate(self.engine.iter_page_texts(pdf_path), 1):
+                for passage in split_passages(text or "", self.passage_chars):
+                    texts.append(passage)
+                    pages.append(page)
+            vectors = self._encode(texts) if self.vector_weight and texts else None
+            cached = (texts, pages, vectors)
+            self._write_cache(key, *cached)
+        self._files[key] = cached
+        return cached
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """テキストの埋め込み（L2正規化）"""
+        vectors = np.asarray(self.model.encode(list(texts), batch_size=self.batch_size,
+                                               show_progress_bar=False), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def _get_config_key(self) -> str:
+        """パッセージ分割・埋め込みモデルの設定のハッシュ（キャッシュのキーの一部）"""
+        if self._config_key is None:
+            model_key = ""
+            if self.vector_weight:
+                probe = np.round(self._encode([_FINGERPRINT_TEXT]), 4)
+                model_key = hashlib.sha256(probe.tobytes()).hexdigest()
+            config = json.dumps([self.passage_chars, self.engine.backend, model_key])
+            self._config_key = hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+        return self._config_key
+
+    def _cache_path(self, key: str) -> Path:
+        """キャッシュファイルのパス"""
+        return self.cache_dir / key[:2] / f"{key}.npz"
+
+    def _read_cache(self, key: str) -> Optional[Tuple[List[str], List[int], Optional[np.ndarray]]]:
+        """パッセージ・埋め込みをディスクキャッシュから読み込む"""
+        if self.cache_dir is None:
+            return None
+        try:
+            with np.load(self._cache_path(key), allow_pickle=False) as data:
+                texts = data["texts"].tolist()
+                pages = data["pages"].tolist()
+                vectors = data["embeddings"] if self.vector_weight else None
+        except (OSError, ValueError, KeyError):
+            return None
+        if vectors is not None and len(vectors) != len(texts):
+            return None
+        return texts, pages, vectors
+
+    def _write_cache(self, key: str, texts: List[str], pages: List[int], vectors: Optional[np.ndarray]):
+        """パッセージ・埋め込みをディスクキャッシュに保存"""
+        if self.cache_dir is None:
+            return
+        cache_path = self._cache_path(key)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(
+                    f, texts=np.array(texts, dtype=str), pages=np.array(pages, dtype=np.int32),
+                    embeddings=vectors if vectors is not None else np.zeros((0, 0), dtype=np.float32))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to write material index cache {cache_path}: {e}")
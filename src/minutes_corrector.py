@@ -0,0 +1,208 @@
+"""
+会議資料による議事録の二次補正
+決定事項・行動項目・課題の文ごとに関連する資料のパッセージを検索し、術語・数値・人名を資料と照合する
+"""
+
+import copy
+import difflib
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+from .material_index import MaterialIndex, Passage
+from .minutes_generator import PARTICIPANT_SUFFIXES, _WORD, _iter_names
+from .term_normalizer import canonical_key
+
+logger = logging.getLogger(__name__)
+
+# 補正の対象とする議事録の項目
+SECTIONS = ("decisions", "action_items", "issues")
+
+# 術語・数値の候補（漢字・カタカナ・英数字の連続、小数点を含む）
+_TERM_CHARS = '0-9A-Za-z０-９Ａ-Ｚａ-ｚ一-龯々〆ヵヶァ-ヴーｦ-ﾟ'
+_TERM = re.compile(f'[{_TERM_CHARS}]+(?:[.．][0-9０-９][{_TERM_CHARS}]*)*')
+_NUMBER = re.compile(r'[0-9０-９]+(?:[.．][0-9０-９]+)?')
+
+# 人名の末尾（漢字・カタカナの連続）と、資料中の「人名 + 敬称・肩書き」の敬称・肩書き
+_NAME_TAIL = re.compile(r'[一-龯々ァ-ヶー]+$')
+_TITLES = '|'.join(map(re.escape, PARTICIPANT_SUFFIXES + ['様', '氏']))
+
+class MaterialCorrector:
+    def __init__(self, index: MaterialIndex, term_db=None, top_k: int = 3,
+                 min_score: float = 0.2, similarity: float = 0.85):
+        """
+        議事録補正器を初期化
+
+        項目の文ごとに上位のパッセージを一括検索し、パッセージ中の術語と照合する。
+        - 正規化キーが同じで表記だけ異なる術語は資料の表記に直す（全角/半角、長音記号など）
+        - 資料にない術語が用語集に登録されていれば代表表記に直す
+        - 数字を除いた形が資料の術語と同じで、数値だけ異なるものは要確認として記録する（文は直さない）
+        - 資料の術語と表記の近い長い術語は要確認として記録する（「東側」と「西側」、「第二」と「第三」のように
+          方角・数字だけ違う別の術語もあるため、文は直さない）
+        - 資料に現れない人名で、資料に1文字違いの人名があるものは要確認として記録する
+
+        Args:
+            index: 会議資料パッセージ索引
+            term_db: 用語集（VectorDB、または会議資料のオーバーレイ付きの OverlayVectorDB、Noneで使用しない）
+            top_k: 1文あたりに照合するパッセージ数
+            min_score: 照合に使うパッセージの最小スコア
+            similarity: 要確認とする表記の近い術語の類似度（difflibの比率）
+        """
+        self.index = index
+        self.term_db = term_db
+        self.top_k = top_k
+        self.min_score = min_score
+        self.similarity = similarity
+
+    def correct_minutes(self, minutes: Dict) -> Dict:
+        """
+        議事録の決定事項・行動項目・課題を会議資料と照合して補正
+
+        補正した項目には "corrections"（直した箇所）、"checks"（要確認の箇所）、
+        "references"（照合した資料のページ）を追加する。
+
+        Args:
+            minutes: 議事録データ
+
+        Returns:
+            補正した議事録データ（元の議事録は変更しない）
+        """
+        corrected = copy.deepcopy(minutes)
+        items = [item for section in SECTIONS for item in corrected.get(section) or []]
+        if not items:
+            return corrected
+
+        results = self.index.search_batch([item["content"] for item in items], self.top_k, self.min_score)
+        corrections = 0
+        for item, passages in zip(items, results):
+            if passages:
+                self._correct_item(item, passages)
+                corrections += len(item.get("corrections", []))
+
+        logger.info(f"Corrected {corrections} terms in {len(items)} minutes items using meeting materials")
+        return corrected
+
+    def _correct_item(self, item: Dict, passages: List[Tuple[Passage, float]]):
+        """項目の文を上位のパッセージと照合して補正（項目を直接更新）"""
+        content, corrections, checks = self.reconcile(item["content"], [passage for passage, _ in passages])
+        assignee = _NAME_TAIL.search(item.get("assignee") or "")
+        if assignee:
+            checks.extend(self._check_names([assignee.group(0)], [passage for passage, _ in passages]))
+
+        item["content"] = content
+        if corrections:
+            item["corrections"] = corrections
+        if checks:
+            item["checks"] = checks
+        item["references"] = [
+            {"source": Path(passage.source).name, "page": passage.page, "score": round(score, 3)}
+            for passage, score in passages
+        ]
+
+    def reconcile(self, sentence: str, passages: List[Passage]) -> Tuple[str, List[Dict], List[Dict]]:
+        """
+        文の術語・数値・人名をパッセージと照合
+
+        Args:
+            sentence: 議事録の文
+            passages: 照合するパッセージ（関連度の高い順、表記が競合する場合は先のものを採用）
+
+        Returns:
+            (補正した文, 直した箇所のリスト, 要確認の箇所のリスト)
+        """
+        # 資料中の術語（表記 -> 最初に現れたパッセージ）と正規化キーの対応
+        vocabulary: Dict[str, Passage] = {}
+        for passage in passages:
+            for term in _TERM.findall(passage.text):
+                vocabulary.setdefault(term, passage)
+        by_key: Dict[str, str] = {}
+        for term in vocabulary:
+            by_key.setdefault(canonical_key(term), term)
+
+        corrections: List[Dict] = []
+        checks: List[Dict] = []
+
+        def replace(match: re.Match) -> str:
+            term = match.group(0)
+            if term in vocabulary or len(term) < 2:
+                return term
+            key = canonical_key(term)
+
+            target, kind = by_key.get(key), "notation"
+            if target is None and self.term_db is not None:
+                target, kind = self.term_db.lookup(term), "glossary"
+            if target is None and _NUMBER.search(term):
+                self._check_number(term, key, by_key, vocabulary, checks)
+                return term
+            if target is None:
+                closest = self._closest_term(term, vocabulary)
+                if closest is not None:
+                    checks.append(self._record("term", term, closest, vocabulary[closest]))
+                return term
+
+            if target == term:
+                return term
+            corrections.append(self._record(kind, term, target, vocabulary.get(target)))
+            return target
+
+        corrected = _TERM.sub(replace, sentence)
+
+        names = [_NAME_TAIL.search(name) for suffix in PARTICIPANT_SUFFIXES
+                 for name in _iter_names(suffix, _WORD.findall(sentence))]
+        checks.extend(self._check_names([name.group(0) for name in names if name], passages))
+        return corrected, corrections, checks
+
+    def _check_number(self, term: str, key: str, by_key: Dict[str, str],
+                      vocabulary: Dict[str, Passage], checks: List[Dict]):
+        """数字以外が資料の術語と同じで数値だけ異なる場合に要確認として記録（「SD345」と「SD295」など）"""
+        skeleton = _NUMBER.sub('#', key)
+        # 数値と単位だけ（「40mm」「第3回」など）では無関係の数値と照合してしまうため、数値の前に2文字以上ある場合のみ
+        if skeleton.index('#') < 2:
+            return
+        for other_key, other in by_key.items():
+            if other_key != key and _NUMBER.sub('#', other_key) == skeleton:
+                checks.append(self._record("number", term, other, vocabulary[other]))
+                return
+
+    def _closest_term(self, term: str, vocabulary: Dict[str, Passage]) -> Optional[str]:
+        """
+        資料中で表記の近い術語（長音の脱落・1文字の誤りなど、要確認として記録する候補）
+
+        短い術語や、一方が他方を含む術語（「コンクリート」と「コンクリート打設」など、区切り方の違い）は対象外。
+        """
+        if len(term) < 4 or self.term_db is not None and self.term_db.lookup(term):
+            return None
+        candidates = [
+            other for other in vocabulary
+            if abs(len(other) - len(term)) <= 1 and not _NUMBER.search(other)
+            and term not in other and other not in term
+        ]
+        matches = difflib.get_close_matches(term, candidates, n=1, cutoff=self.similarity)
+        return matches[0] if matches else None
+
+    def _check_names(self, names: List[str], passages: List[Passage]) -> List[Dict]:
+        """資料に現れない人名で、資料に敬称・肩書き付きの1文字違いの人名があるものを要確認として記録"""
+        checks = []
+        seen: Set[str] = set()
+        for name in names:
+            if name in seen or len(name) < 2 or any(name in passage.text for passage in passages):
+                continue
+            seen.add(name)
+            pattern = re.compile(f'(?=([一-龯々ァ-ヶー]{{{len(name)}}})(?:{_TITLES}))')
+            for passage in passages:
+                candidate = next((found for found in pattern.findall(passage.text)
+                                  if sum(a != b for a, b in zip(found, name)) == 1), None)
+                if candidate:
+                    checks.append(self._record("name", name, candidate, passage))
+                    break
+        return checks
+
+    @staticmethod
+    def _record(kind: str, original: str, material: str, passage: Optional[Passage]) -> Dict:
+        """補正・要確認の記録"""
+        record = {"type": kind, "original": original, "material": material}
+        if passage is not None:
+            record["source"] = Path(passage.source).name
+            record["page"] = passage.page
+        return record
@@ -5,37 +5,92 @@
 
 import re
 import json
-from typing import List, Dict, Any, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterator, List, Dict, Any, Optional, Set, Tuple, Union
 from datetime import datetime
 import logging
 
+from .keyword_matcher import KeywordMatcher, compile_keywords
+from .llm_summarizer import LLMSummarizer
+from .text_rank import TextRank
+from .taxonomy import TaxonomyFile, default_taxonomy
+from .timeline import ITEM_SECTIONS, SegmentSpans, format_timestamp
+
 logger = logging.getLogger(__name__)
 
+# 文の区切り
+_SENTENCE_END = re.compile(r'[。！？]')
+
+# 単語（\w の連続）
+_WORD = re.compile(r'\w+')
+
+# 「名前 + 敬称・肩書き」の接尾辞（参加者・担当者の推定用、いずれも \w の文字のみ）
+PARTICIPANT_SUFFIXES = ['さん', '部長', '課長', '主任', '係長']
+ASSIGNEE_SUFFIXES = ['さんが', '部長が', 'で']
+
+@lru_cache(maxsize=None)
+def _name_pattern(suffix: str) -> re.Pattern:
+    """接尾辞の直前の名前を取り出すパターン（例: (\w+)さん）"""
+    return re.compile(r'(\w+)' + re.escape(suffix))
+
+def _iter_names(suffix: str, words: List[str]) -> Iterator[str]:
+    """
+    単語中の「名前 + 接尾辞」から名前を順に取得
+    
+    (\w+) の後に \w の接尾辞が続くパターンは単語をまたいで一致しないため、
+    接尾辞を含む単語だけを照合すれば、テキスト全体を照合した場合と同じ結果になる。
+    長い単語の中を何度も後戻りしながら照合し直すことがなくなる。
+    
+    Args:
+        suffix: 接尾辞
+        words: テキストを単語に分けたもの（出現順）
+        
+    Yields:
+        名前（re.findall と同じ順序）
+    """
+    pattern = _name_pattern(suffix)
+    for word in words:
+        if suffix in word:
+            yield from pattern.findall(word)
+
 class MinutesGenerator:
-    def __init__(self, use_local_llm: bool = True):
+    def __init__(self, use_local_llm: bool = True, summarizer: Optional[LLMSummarizer] = None,
+                 taxonomy: Optional[TaxonomyFile] = None):
         """
         議事録生成器を初期化
         
+        キーワードはタクソノミーファイルから読み込み、ファイルが変更されると次の議事録生成で読み直す。
+        
         Args:
-            use_local_llm: ローカルLLMを使用するか
+            use_local_llm: ローカルLLMを使用するか（利用できない場合はルールベースの要約）
+            summarizer: ローカルLLM要約器（省略時はOllamaの既定設定）
+            taxonomy: タクソノミーファイル（Noneで既定の src/taxonomy.json）
         """
         self.use_local_llm = use_local_llm
-        
-        # 行動項目を示すキーワード
-        self.action_keywords = [
-            '検討', '確認', '調整', '実施', '対応', '準備', '作成',
-            '提出', '報告', '連絡', '相談', '決定', '承認', '修正'
-        ]
-        
-        # 決定事項を示すキーワード  
-        self.decision_keywords = [
-            '決定', '承認', '採用', '選定', '確定', '合意', '了承'
-        ]
-        
-        # 課題を示すキーワード
-        self.issue_keywords = [
-            '課題', '問題', '懸念', '検討事項', '要確認', '要検討', '要調整'
-        ]
+        self.summarizer = summarizer or (LLMSummarizer() if use_local_llm else None)
+        self.text_rank = TextRank()
+        # 会議資料による二次補正（MaterialCorrector、Noneなら補正しない）
+        self.corrector = None
+        
+        # 行動項目・決定事項・課題・優先度・主要トピックのキーワード（タクソノミーファイルの "minutes" 節）
+        self.taxonomy = taxonomy or default_taxonomy()
+        self._taxonomy_version = ""
+        self._sync_taxonomy()
+    
+    def _sync_taxonomy(self):
+        """タクソノミーファイルが変更されていればキーワードを読み直す（属性の変更は破棄）"""
+        version = self.taxonomy.version
+        if version == self._taxonomy_version:
+            return
+        minutes_section = self.taxonomy.section("minutes")
+        self.action_keywords = list(minutes_section.get("action", []))
+        self.decision_keywords = list(minutes_section.get("decision", []))
+        self.issue_keywords = list(minutes_section.get("issue", []))
+        self.high_priority_words = list(minutes_section.get("high_priority", []))
+        self.medium_priority_words = list(minutes_section.get("medium_priority", []))
+        self.topic_keywords = list(minutes_section.get("topics", []))
+        self._taxonomy_version = version
     
     def generate_minutes(self, transcript: str, meeting_info: Dict = None) -> Dict:
         """
@@ -48,77 +103,283 @@ class MinutesGenerator:
         Returns:
             構造化された議事録
         """
+        return self._build_minutes(transcript, meeting_info)
+    
+    def generate_minutes_from_segments(self, segments: List[Dict], meeting_info: Dict = None) -> Dict:
+        """
+        文字起こしのセグメント（Whisperの出力など）から議事録を生成
+        
+        セグメントのテキストを連結した文字起こしから generate_minutes と同じ議事録を作り、
+        決定事項・行動項目・課題には元の文を含むセグメントの時刻とIDを付ける。
+        
+        Args:
+            segments: "text", "start", "end"（秒）と任意の "id" を持つセグメントのリスト（時刻順）
+            meeting_info: 会議情報（日時、参加者など）
+            
+        Returns:
+            構造化された議事録（項目に "start", "end", "segment_ids" を追加）
+        """
+        spans = SegmentSpans()
+        texts = []
+        offset = 0
+        for number, segment in enumerate(segments):
+            text = segment.get("text", "")
+            spans.add(offset, segment, number)
+            texts.append(text)
+            offset += len(text)
+        return self._build_minutes("".join(texts), meeting_info, spans)
+    
+    def _build_minutes(self, transcript: str, meeting_info: Optional[Dict],
+                       spans: Optional[SegmentSpans] = None) -> Dict:
+        """議事録を生成（spans があれば項目にセグメントの時刻を付ける）"""
         logger.info("Generating meeting minutes...")
+        self._sync_taxonomy()
+        
+        # 文の分割とキーワード判定は全項目分を一回の走査で行う
+        analysis = self._analyze(transcript, spans)
         
         # 基本的な議事録構造を作成
         minutes = {
             "meeting_info": meeting_info or {},
-            "summary": self._generate_summary(transcript),
-            "decisions": self._extract_decisions(transcript),
-            "action_items": self._extract_action_items(transcript),
-            "issues": self._extract_issues(transcript),
+            "summary": self._generate_summary(transcript, analysis),
+            "decisions": analysis["decisions"],
+            "action_items": analysis["action_items"],
+            "issues": analysis["issues"],
             "participants": self._extract_participants(transcript),
-            "key_topics": self._extract_key_topics(transcript),
+            "key_topics": analysis["key_topics"],
             "generated_at": datetime.now().isoformat()
         }
         
+        # 決定事項・行動項目・課題の術語・数値・人名を会議資料と照合
+        if self.corrector is not None:
+            minutes = self.corrector.correct_minutes(minutes)
+        
         return minutes
     
-    def _generate_summary(self, transcript: str) -> str:
+    def _analyze(self, transcript: str, spans: Optional[SegmentSpans] = None) -> Dict[str, list]:
+        """
+        転写テキストを文に分け、決定事項・行動項目・課題・トピック・優先度をまとめて判定
+        
+        文は一度だけ分割し、各文を全キーワードをまとめたマッチャーで一回走査して
+        含まれるキーワードの集合を求める。キーワードは文区切りも空白も含まないため、
+        キーワードごとに部分文字列として検索した場合と同じ判定になる。
+        
+        Args:
+            transcript: 転写テキスト
+            spans: 文字位置からセグメントを引く対応表（指定時は項目にセグメントの時刻を付ける）
+            
+        Returns:
+            "sentences"（要約の対象とする (文, 決定・行動キーワード数) のリスト）, "decisions", "action_items",
+            "issues", "key_topics"
+        """
+        matcher = self._keyword_matcher()
+        topic_keywords = set(self.topic_keywords)
+        analysis = self._new_analysis()
+        first_positions = {}
+        
+        offset = 0
+        for sentence in _SENTENCE_END.split(transcript):
+            sentence_offset = offset
+            offset += len(sentence) + 1
+            counts = [len(analysis[section]) for section in ITEM_SECTIONS] if spans else None
+            present = self._analyze_sentence(sentence, matcher, analysis)
+            if spans:
+                self._attach_span(analysis, counts, spans, sentence_offset, sentence)
+            
+            # トピックの最初の出現位置（文の先頭からの位置 + 文の位置）
+            for keyword in present & topic_keywords:
+                if keyword not in first_positions:
+                    first_positions[keyword] = sentence_offset + sentence.find(keyword)
+        
+        # トピックはテキスト中の最初の出現位置の前後を文脈とする
+        key_topics = []
+        for keyword in self.topic_keywords:
+            if keyword in first_positions:
+                context = self._extract_context(transcript, keyword, index=first_positions[keyword])
+                if context:
+                    key_topics.append({
+                        "keyword": keyword,
+                        "context": context
+                    })
+        
+        analysis["key_topics"] = key_topics
+        return analysis
+    
+    def _keyword_matcher(self) -> KeywordMatcher:
+        """全キーワード（決定・行動・課題・優先度・トピック）をまとめたマッチャー"""
+        return compile_keywords(tuple(
+            self.decision_keywords + self.action_keywords + self.issue_keywords +
+            self.high_priority_words + self.medium_priority_words + self.topic_keywords
+        ))
+    
+    @staticmethod
+    def _new_analysis() -> Dict[str, list]:
+        """文ごとの判定結果の入れ物"""
+        return {
+            "sentences": [],
+            "decisions": [],
+            "action_items": [],
+            "issues": []
+        }
+    
+    def _analyze_sentence(self, sentence: str, matcher: KeywordMatcher, analysis: Dict[str, list]) -> Set[str]:
+        """
+        1文を判定し、要約の対象の文・決定事項・行動項目・課題を analysis に追加
+        
+        Args:
+            sentence: 文（区切り文字を除いたもの、前後の空白は判定時に除去）
+            matcher: _keyword_matcher のマッチャー
+            analysis: _new_analysis の入れ物
+            
+        Returns:
+            文に含まれるキーワードの集合
+        """
+        present = matcher.keywords_in(sentence)
+        sentence = sentence.strip()
+        
+        # 要約の対象とする文（短すぎる文は除外）と、含まれる決定・行動キーワードの数
+        if len(sentence) > 10:
+            score = (sum(1 for keyword in self.decision_keywords if keyword in present) +
+                     sum(1 for keyword in self.action_keywords if keyword in present)) if present else 0
+            analysis["sentences"].append((sentence, score))
+        
+        if not present or len(sentence) <= 5:
+            return present
+        
+        keyword = self._first_keyword(self.decision_keywords, present)
+        if keyword:
+            analysis["decisions"].append({
+                "content": sentence,
+                "keyword": keyword,
+                "type": "decision"
+            })
+        
+        keyword = self._first_keyword(self.action_keywords, present)
+        if keyword:
+            analysis["action_items"].append({
+                "content": sentence,
+                "keyword": keyword,
+                "assignee": self._extract_assignee(sentence),
+                "type": "action_item",
+                "status": "pending"
+            })
+        
+        keyword = self._first_keyword(self.issue_keywords, present)
+        if keyword:
+            analysis["issues"].append({
+                "content": sentence,
+                "keyword": keyword,
+                "type": "issue",
+                "priority": self._priority_of(present)
+            })
+        
+        return present
+    
+    @staticmethod
+    def _attach_span(analysis: Dict[str, list], counts: List[int], spans: SegmentSpans,
+                     start: int, sentence: str) -> None:
+        """
+        文から追加された項目に、文を含むセグメントの時刻とIDを付ける
+        
+        Args:
+            analysis: _new_analysis の入れ物
+            counts: 文を判定する前の ITEM_SECTIONS の各項目数
+            spans: 文字位置からセグメントを引く対応表
+            start: 文の開始文字位置
+            sentence: 文（区切り文字を除いたもの）
+        """
+        new_items = [item for section, count in zip(ITEM_SECTIONS, counts) for item in analysis[section][count:]]
+        if not new_items:
+            return
+        begin = start + len(sentence) - len(sentence.lstrip())
+        span = spans.span(begin, start + len(sentence.rstrip()))
+        for item in new_items:
+            item.update(start=span["start"], end=span["end"], segment_ids=list(span["segment_ids"]))
+    
+    @staticmethod
+    def _first_keyword(keywords: List[str], present: Set[str]) -> Optional[str]:
+        """キーワードリストの順で、文に含まれる最初のキーワード"""
+        for keyword in keywords:
+            if keyword in present:
+                return keyword
+        return None
+    
+    def _generate_summary(self, transcript: str, analysis: Optional[Dict] = None) -> str:
         """
         会議の要約を生成
         
         Args:
             transcript: 転写テキスト
+            analysis: _analyze の結果（省略時は再計算）
             
         Returns:
             要約テキスト
         """
         if self.use_local_llm:
-            return self._local_summarize(transcript)
+            return self._local_summarize(transcript, analysis)
         else:
-            return self._rule_based_summary(transcript)
+            return self._rule_based_summary(transcript, analysis)
     
-    def _local_summarize(self, transcript: str) -> str:
+    def _local_summarize(self, transcript: str, analysis: Optional[Dict] = None) -> str:
         """
-        ローカルLLMを使用した要約（実装予定）
+        ローカルLLMを使用した要約
+        
+        長い文字起こしは区間ごとに並列に要約してから統合する。LLMが失敗した区間は
+        その区間のルールベースの要約で補い、LLMを利用できない場合は全体をルールベースで要約する。
+        
+        Args:
+            transcript: 転写テキスト
+            analysis: _analyze の結果（ルールベースの要約に使用）
+            
+        Returns:
+            要約テキスト
         """
-        # TODO: OllamaなどのローカルLLMとの連携実装
-        return self._rule_based_summary(transcript)
+        summary = self.summarizer.summarize(transcript, self._rule_based_summary) if self.summarizer else None
+        if summary:
+            return summary
+        
+        logger.info("Local LLM unavailable; using rule-based summary")
+        return self._rule_based_summary(transcript, analysis)
     
-    def _rule_based_summary(self, transcript: str) -> str:
+    def _rule_based_summary(self, transcript: str, analysis: Optional[Dict] = None) -> str:
         """
-        ルールベースの簡易要約
+        ルールベースの抽出型要約（TextRank）
+        
+        文の類似度グラフで中心的な文を選ぶ。決定・行動キーワードを含む文ほど
+        選ばれやすいよう、キーワード数をPageRankのテレポート確率の重みにする。
         
         Args:
             transcript: 転写テキスト
+            analysis: _analyze の結果（省略時は再計算）
             
         Returns:
-            要約
+            要約（選んだ文を出現順に連結）
         """
-        # 文を分割
-        sentences = re.split(r'[。！？]', transcript)
+        analysis = analysis or self._analyze(transcript)
+        sentences = analysis["sentences"]
         
-        # 重要そうな文を抽出
-        important_sentences = []
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if len(sentence) > 10:  # 短すぎる文は除外
-                # 重要キーワードを含む文を優先
-                score = 0
-                for keyword in self.decision_keywords + self.action_keywords:
-                    if keyword in sentence:
-                        score += 1
-                
-                if score > 0:
-                    important_sentences.append((sentence, score))
-        
-        # スコア順にソートして上位を選択
-        important_sentences.sort(key=lambda x: x[1], reverse=True)
-        top_sentences = [s[0] for s in important_sentences[:5]]
+        selected = self.text_rank.select([sentence for sentence, _ in sentences], top_n=5,
+                                         weights=[1 + score for _, score in sentences])
+        top_sentences = [sentences[i][0] for i in selected]
         
         return '。'.join(top_sentences) + '。'
     
+    @staticmethod
+    def _top_summary_sentences(sentences: List[Tuple[str, int]], limit: int = 5) -> List[Tuple[str, int]]:
+        """
+        決定・行動キーワードの多い文を選択（同点は出現順、キーワードを含まない文は除外）
+        
+        Args:
+            sentences: (文, キーワード数) のリスト（出現順）
+            limit: 選択する文の数
+            
+        Returns:
+            選択した (文, キーワード数) のリスト
+        """
+        # スコア順にソートして上位を選択
+        important_sentences = sorted((item for item in sentences if item[1] > 0), key=lambda x: x[1], reverse=True)
+        return important_sentences[:limit]
+    
     def _extract_decisions(self, transcript: str) -> List[Dict]:
         """
         決定事項を抽出
@@ -129,22 +390,7 @@ class MinutesGenerator:
         Returns:
             決定事項のリスト
         """
-        decisions = []
-        sentences = re.split(r'[。！？]', transcript)
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            for keyword in self.decision_keywords:
-                if keyword in sentence and len(sentence) > 5:
-                    decision = {
-                        "content": sentence,
-                        "keyword": keyword,
-                        "type": "decision"
-                    }
-                    decisions.append(decision)
-                    break
-        
-        return decisions
+        return self._analyze(transcript)["decisions"]
     
     def _extract_action_items(self, transcript: str) -> List[Dict]:
         """
@@ -156,27 +402,7 @@ class MinutesGenerator:
         Returns:
             行動項目のリスト
         """
-        action_items = []
-        sentences = re.split(r'[。！？]', transcript)
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            for keyword in self.action_keywords:
-                if keyword in sentence and len(sentence) > 5:
-                    # 担当者を抽出（簡易版）
-                    assignee = self._extract_assignee(sentence)
-                    
-                    action_item = {
-                        "content": sentence,
-                        "keyword": keyword,
-                        "assignee": assignee,
-                        "type": "action_item",
-                        "status": "pending"
-                    }
-                    action_items.append(action_item)
-                    break
-        
-        return action_items
+        return self._analyze(transcript)["action_items"]
     
     def _extract_issues(self, transcript: str) -> List[Dict]:
         """
@@ -188,23 +414,7 @@ class MinutesGenerator:
         Returns:
             課題のリスト
         """
-        issues = []
-        sentences = re.split(r'[。！？]', transcript)
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            for keyword in self.issue_keywords:
-                if keyword in sentence and len(sentence) > 5:
-                    issue = {
-                        "content": sentence,
-                        "keyword": keyword,
-                        "type": "issue",
-                        "priority": self._assess_priority(sentence)
-                    }
-                    issues.append(issue)
-                    break
-        
-        return issues
+        return self._analyze(transcript)["issues"]
     
     def _extract_participants(self, transcript: str) -> List[str]:
         """
@@ -217,18 +427,11 @@ class MinutesGenerator:
             参加者のリスト
         """
         # 敬語や肩書きのパターンから参加者を推測
-        participant_patterns = [
-            r'(\w+)さん',
-            r'(\w+)部長',
-            r'(\w+)課長',
-            r'(\w+)主任',
-            r'(\w+)係長'
-        ]
+        words = _WORD.findall(transcript)
         
         participants = set()
-        for pattern in participant_patterns:
-            matches = re.findall(pattern, transcript)
-            participants.update(matches)
+        for suffix in PARTICIPANT_SUFFIXES:
+            participants.update(_iter_names(suffix, words))
         
         return list(participants)
     
@@ -242,24 +445,7 @@ class MinutesGenerator:
         Returns:
             トピックのリスト
         """
-        # 建築関連の主要トピックキーワード
-        topic_keywords = [
-            '工事', '設計', '施工', '材料', '品質', '安全', '工程',
-            '予算', '契約', '検査', '図面', '仕様', '基準'
-        ]
-        
-        topics = []
-        for keyword in topic_keywords:
-            if keyword in transcript:
-                # キーワード周辺の文脈を抽出
-                context = self._extract_context(transcript, keyword)
-                if context:
-                    topics.append({
-                        "keyword": keyword,
-                        "context": context
-                    })
-        
-        return topics
+        return self._analyze(transcript)["key_topics"]
     
     def _extract_assignee(self, sentence: str) -> Optional[str]:
         """
@@ -272,16 +458,11 @@ class MinutesGenerator:
             担当者名
         """
         # 簡易的な担当者抽出
-        assignee_patterns = [
-            r'(\w+)さんが',
-            r'(\w+)部長が',
-            r'(\w+)で'
-        ]
+        words = _WORD.findall(sentence)
         
-        for pattern in assignee_patterns:
-            match = re.search(pattern, sentence)
-            if match:
-                return match.group(1)
+        for suffix in ASSIGNEE_SUFFIXES:
+            for name in _iter_names(suffix, words):
+                return name
         
         return None
     
@@ -295,20 +476,23 @@ class MinutesGenerator:
         Returns:
             優先度 (high/medium/low)
         """
-        high_priority_words = ['緊急', '至急', '重要', '必須']
-        medium_priority_words = ['要確認', '要検討', '課題']
-        
-        for word in high_priority_words:
-            if word in sentence:
+        return self._priority_of({word for word in self.high_priority_words + self.medium_priority_words
+                                  if word in sentence})
+    
+    def _priority_of(self, present: Set[str]) -> str:
+        """文に含まれるキーワードの集合から優先度 (high/medium/low) を判定"""
+        for word in self.high_priority_words:
+            if word in present:
                 return 'high'
         
-        for word in medium_priority_words:
-            if word in sentence:
+        for word in self.medium_priority_words:
+            if word in present:
                 return 'medium'
         
         return 'low'
     
-    def _extract_context(self, transcript: str, keyword: str, window: int = 50) -> str:
+    def _extract_context(self, transcript: str, keyword: str, window: int = 50,
+                         index: Optional[int] = None) -> str:
         """
         キーワード周辺の文脈を抽出
         
@@ -316,11 +500,13 @@ class MinutesGenerator:
             transcript: 全文
             keyword: キーワード
             window: 前後の文字数
+            index: キーワードの出現位置（省略時は最初の出現位置を検索）
             
         Returns:
             文脈
         """
-        index = transcript.find(keyword)
+        if index is None:
+            index = transcript.find(keyword)
         if index == -1:
             return ""
         
@@ -380,7 +566,8 @@ class MinutesGenerator:
         if minutes.get("decisions"):
             lines.append("【決定事項】")
             for i, decision in enumerate(minutes["decisions"], 1):
-                lines.append(f"  {i}. {decision['content']}")
+                lines.append(f"  {i}. {self._format_time(decision)}{decision['content']}")
+                lines.extend(self._format_checks(decision))
             lines.append("")
         
         # 行動項目
@@ -388,7 +575,8 @@ class MinutesGenerator:
             lines.append("【行動項目】")
             for i, item in enumerate(minutes["action_items"], 1):
                 assignee = f" ({item['assignee']})" if item.get('assignee') else ""
-                lines.append(f"  {i}. {item['content']}{assignee}")
+                lines.append(f"  {i}. {self._format_time(item)}{item['content']}{assignee}")
+                lines.extend(self._format_checks(item))
             lines.append("")
         
         # 課題
@@ -396,12 +584,189 @@ class MinutesGenerator:
             lines.append("【課題・検討事項】")
             for i, issue in enumerate(minutes["issues"], 1):
                 priority = f" [{issue['priority']}]" if issue.get('priority') else ""
-                lines.append(f"  {i}. {issue['content']}{priority}")
+                lines.append(f"  {i}. {self._format_time(issue)}{issue['content']}{priority}")
+                lines.extend(self._format_checks(issue))
             lines.append("")
         
         lines.append(f"生成日時: {minutes.get('generated_at', '')}")
         
         return '\n'.join(lines)
+    
+    @staticmethod
+    def _format_time(item: Dict) -> str:
+        """項目の録音上の開始時刻（例: 「[00:12:34] 」、時刻がなければ空）"""
+        return f"[{format_timestamp(item['start'])}] " if item.get("start") is not None else ""
+    
+    @staticmethod
+    def _format_checks(item: Dict) -> List[str]:
+        """会議資料との照合で要確認となった箇所の行（出典のページ付き）"""
+        lines = []
+        for check in item.get("checks", []):
+            source = f"（{check['source']} p.{check['page']}）" if check.get("source") else ""
+            lines.append(f"     ※要確認: {check['original']} → 資料では {check['material']}{source}")
+        return lines
+
+class MinutesBuilder:
+    def __init__(self, generator: Optional[MinutesGenerator] = None, meeting_info: Dict = None):
+        """
+        逐次議事録ビルダーを初期化
+        
+        文字起こしのセグメントを受け取るたびに、区切りまで届いた文だけを判定して結果を蓄積する。
+        最後の区切り以降の未完の文は snapshot 時にだけ判定するため、
+        snapshot は前回からの追加分に比例する時間で、その時点までの全文を
+        generate_minutes に渡した場合と同じ議事録を返す。ただし途中経過の要約は、
+        決定・行動キーワードの多い文を選ぶ簡易要約とする（全文を見直す要約は final=True で作成）。
+        時刻付きのセグメントを受け取った場合は、generate_minutes_from_segments と同じく項目に時刻を付ける。
+        
+        Args:
+            generator: キーワード定義と判定に使う議事録生成器（省略時は既定の設定）
+            meeting_info: 会議情報（日時、参加者など）
+        """
+        self.generator = generator or MinutesGenerator()
+        self.meeting_info = meeting_info or {}
+        # キーワードは会議の途中で変えない（ファイルの変更は次のビルダーから反映）
+        self.generator._sync_taxonomy()
+        
+        # 受け取ったテキスト（トピックの文脈の切り出し用）
+        self._chunks: List[str] = []
+        self._chunk_starts: List[int] = []
+        self._length = 0
+        
+        # 文字位置からセグメントの時刻を引く対応表（セグメントIDの既定値は受け取った順の番号）
+        self._spans = SegmentSpans()
+        self._segment_count = 0
+        
+        # 確定した文の判定結果
+        self._analysis = self.generator._new_analysis()
+        self._summary_top: List[Tuple[str, int]] = []
+        self._participants: Set[str] = set()
+        self._first_positions: Dict[str, int] = {}
+        self._contexts: Dict[str, str] = {}
+        
+        # 未完の文とその開始位置
+        self._pending = ""
+        self._pending_start = 0
+    
+    def feed(self, segment: Union[str, Dict]) -> None:
+        """
+        文字起こしのセグメントを追加
+        
+        Args:
+            segment: セグメントのテキスト、または "text" を持つセグメント（Whisperの出力など）
+        """
+        text = segment.get("text", "") if isinstance(segment, dict) else segment
+        if isinstance(segment, dict):
+            self._spans.add(self._length, segment, self._segment_count)
+        self._segment_count += 1
+        if not text:
+            return
+        
+        self._chunks.append(text)
+        self._chunk_starts.append(self._length)
+        self._length += len(text)
+        
+        sentences = _SENTENCE_END.split(self._pending + text)
+        self._pending = sentences.pop()
+        if not sentences:
+            return
+        
+        matcher = self.generator._keyword_matcher()
+        for sentence in sentences:
+            self._add_sentence(sentence, self._pending_start, matcher, self._analysis, self._participants,
+                               self._first_positions)
+            self._pending_start += len(sentence) + 1
+        
+        # 簡易要約の候補は上位だけを残す（安定ソートなので上位同士を比べれば全体の上位と一致する）
+        sentences = self._analysis["sentences"]
+        if sentences:
+            self._summary_top = self.generator._top_summary_sentences(self._summary_top + sentences)
+            sentences.clear()
+    
+    @property
+    def transcript(self) -> str:
+        """これまでに受け取ったテキスト"""
+        return "".join(self._chunks)
+    
+    def snapshot(self, final: bool = False) -> Dict:
+        """
+        現時点の議事録を取得（未完の文も1文として含める）
+        
+        Args:
+            final: 要約を全文から作成する（TextRankまたはローカルLLM、文字起こし完了時に使用）
+        
+        Returns:
+            generate_minutes と同じ構造の議事録
+        """
+        generator = self.generator
+        analysis = generator._new_analysis()
+        participants = set(self._participants)
+        first_positions = dict(self._first_positions)
+        if self._pending:
+            self._add_sentence(self._pending, self._pending_start, generator._keyword_matcher(), analysis,
+                               participants, first_positions)
+        
+        if final:
+            summary = generator._generate_summary(self.transcript)
+        else:
+            summary_top = generator._top_summary_sentences(self._summary_top + analysis["sentences"])
+            summary = '。'.join(sentence for sentence, _ in summary_top) + '。'
+        
+        return {
+            "meeting_info": self.meeting_info,
+            "summary": summary,
+            "decisions": self._analysis["decisions"] + analysis["decisions"],
+            "action_items": self._analysis["action_items"] + analysis["action_items"],
+            "issues": self._analysis["issues"] + analysis["issues"],
+            "participants": list(participants),
+            "key_topics": self._key_topics(first_positions),
+            "generated_at": datetime.now().isoformat()
+        }
+    
+    def _add_sentence(self, sentence: str, start: int, matcher: KeywordMatcher, analysis: Dict[str, list],
+                      participants: Set[str], first_positions: Dict[str, int]) -> None:
+        """1文を判定して結果を追加（start は文の開始位置）"""
+        generator = self.generator
+        counts = [len(analysis[section]) for section in ITEM_SECTIONS] if self._spans else None
+        present = generator._analyze_sentence(sentence, matcher, analysis)
+        if self._spans:
+            generator._attach_span(analysis, counts, self._spans, start, sentence)
+        for keyword in generator.topic_keywords:
+            if keyword in present and keyword not in first_positions:
+                first_positions[keyword] = start + sentence.find(keyword)
+        
+        # 名前と敬称は文区切りをまたがないため、文ごとに抽出した和集合が全文からの抽出と一致する
+        participants.update(generator._extract_participants(sentence))
+    
+    def _key_topics(self, first_positions: Dict[str, int]) -> List[Dict]:
+        """トピックと文脈（後続のテキストが文脈の幅に届いたものは確定してキャッシュ）"""
+        window = 50
+        key_topics = []
+        for keyword in self.generator.topic_keywords:
+            if keyword not in first_positions:
+                continue
+            context = self._contexts.get(keyword)
+            if context is None:
+                index = first_positions[keyword]
+                end = index + len(keyword) + window
+                context = self._slice(max(0, index - window), min(self._length, end)).strip()
+                if end <= self._length and keyword in self._first_positions:
+                    self._contexts[keyword] = context
+            if context:
+                key_topics.append({
+                    "keyword": keyword,
+                    "context": context
+                })
+        return key_topics
+    
+    def _slice(self, start: int, end: int) -> str:
+        """受け取ったテキストの [start, end) を取得"""
+        index = max(bisect_right(self._chunk_starts, start) - 1, 0)
+        parts = []
+        while index < len(self._chunks) and self._chunk_starts[index] < end:
+            chunk_start = self._chunk_starts[index]
+            parts.append(self._chunks[index][max(start - chunk_start, 0):end - chunk_start])
+            index += 1
+        return "".join(parts)
 
 def main():
     """テスト実行"""
@@ -0,0 +1,152 @@
+"""
+会議資料オーバーレイ
+当日の会議資料から作る小規模インデックスを全体の術語DBに重ねて検索する
+"""
+
+from typing import List, Dict, Tuple, Iterable, Optional
+import logging
+
+from .vector_db import VectorDB
+from .term_extractor import TermExtractor
+
+logger = logging.getLogger(__name__)
+
+class OverlayVectorDB:
+    def __init__(self, base_db: VectorDB, boost: float = 0.1,
+                 term_extractor: Optional[TermExtractor] = None):
+        """
+        オーバーレイ付きベクターDBを初期化
+
+        ベースDBのインデックスは複製も再構築もせず参照のみ行う。
+        オーバーレイはベースDBのモデルを共有するため、モデルの再読み込みは発生しない。
+
+        Args:
+            base_db: 全体の専門術語ベクターDB
+            boost: オーバーレイ側の術語に加算するスコア
+            term_extractor: 会議資料からの術語抽出器
+        """
+        self.base_db = base_db
+        self.boost = boost
+        self.term_extractor = term_extractor or TermExtractor()
+        self.overlay_db = VectorDB(model=base_db.model)
+
+    @property
+    def terms(self) -> List[str]:
+        """ベースとオーバーレイを合わせた術語リスト"""
+        overlay_terms = [t for t in self.overlay_db.terms if self.base_db.lookup(t) is None]
+        return self.base_db.terms + overlay_terms
+
+    def build_from_pdfs(self, pdf_paths: Iterable[str]) -> int:
+        """
+        会議資料PDFからオーバーレイを構築
+
+        Args:
+            pdf_paths: 会議資料PDFのパス
+
+        Returns:
+            オーバーレイの術語数
+        """
+        terms = set()
+        metadata = {}
+        for pdf_path in pdf_paths:
+            for term in self.term_extractor.extract_from_pdf(str(pdf_path)):
+                terms.add(term)
+                metadata.setdefault(term, {"sources": []})["sources"].append(str(pdf_path))
+
+        return self.build_from_terms(sorted(terms), metadata)
+
+    def build_from_terms(self, terms: List[str], metadata: Dict[str, Dict] = None) -> int:
+        """
+        術語リストからオーバーレイを構築
+
+        Args:
+            terms: 会議資料の術語
+            metadata: 各術語の追加情報
+
+        Returns:
+            オーバーレイの術語数
+        """
+        if not terms:
+            self.clear()
+            return 0
+
+        self.overlay_db.build_index(list(terms), metadata)
+        logger.info(f"Overlay built with {len(terms)} meeting terms (boost={self.boost})")
+        return len(terms)
+
+    def clear(self):
+        """オーバーレイを破棄（ベースDBのみで検索する状態に戻す）"""
+        self.overlay_db.index = None
+        self.overlay_db.terms = []
+        self.overlay_db.term_metadata = {}
+        self.overlay_db.aliases = {}
+        self.overlay_db._rebuild_lookup()
+
+    def search(self, query: str, k: int = 5, threshold: float = 0.7) -> List[Tuple[str, float]]:
+        """
+        ベースとオーバーレイを同時に検索し、スコアをマージ
+
+        Args:
+            query: 検索クエリ
+            k: 返す結果数
+            threshold: 類似度の閾値（ブースト前のスコアに適用）
+
+        Returns:
+            (術語, スコア) のタプルのリスト
+        """
+        base_results, overlay_results = self._search_both(query, k, threshold)
+        merged = self._merge(dict(base_results), dict(overlay_results))
+        return self.base_db.rank(merged, k)
+
+    def fuzzy_search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        ファジー検索（VectorDB.fuzzy_searchと同じ規則でベースとオーバーレイを検索）
+
+        Args:
+            query: 検索クエリ
+            k: 返す結果数
+
+        Returns:
+            (術語, スコア) のタプルのリスト
+        """
+        base_results, overlay_results = self._search_both(query, k, 0.7)
+        merged = self._merge(
+            self.base_db.merge_fuzzy_scores(query, base_results),
+            self.overlay_db.merge_fuzzy_scores(query, overlay_results)
+        )
+        return self.base_db.rank(merged, k)
+
+    def lookup(self, term: str) -> Optional[str]:
+        """
+        表記ゆれを含む術語から代表表記を取得（オーバーレイ側の表記を優先し、なければベースDB）
+
+        Args:
+            term: 術語（「ＲＣ造」「rc造」など）
+
+        Returns:
+            代表表記（どちらにも登録されていない場合はNone）
+        """
+        return self.overlay_db.lookup(term) or self.base_db.lookup(term)
+
+    def get_term_info(self, term: str) -> Dict:
+        """術語の詳細情報を取得（オーバーレイ側の情報を優先）"""
+        info = dict(self.base_db.get_term_info(term))
+        info.update(self.overlay_db.get_term_info(term))
+        return info
+
+    def _search_both(self, query: str, k: int, threshold: float):
+        """クエリを一度だけベクトル化して両インデックスを検索"""
+        if self.base_db.index is None and self.overlay_db.index is None:
+            logger.error("Index not built yet")
+            return [], []
+
+        query_vector = self.base_db.encode_query(query)
+        return (self.base_db.search_vector(query_vector, k, threshold),
+                self.overlay_db.search_vector(query_vector, k, threshold))
+
+    def _merge(self, base_scores: Dict[str, float], overlay_scores: Dict[str, float]) -> Dict[str, float]:
+        """オーバーレイ側のスコアにブーストを加算してマージ"""
+        merged = dict(base_scores)
+        for term, score in overlay_scores.items():
+            merged[term] = max(merged.get(term, 0), score + self.boost)
+        return merged
@@ -0,0 +1,271 @@
+"""
+複数パターン一括マッチャー
+カテゴリ別の術語パターンを一度コンパイルし、テキストを一回走査して全パターンの一致を得る
+"""
+
+import re
+from functools import lru_cache
+from itertools import product
+from typing import Dict, List, Tuple, Union
+
+# 正規表現でリテラルとして扱えない文字
+_METACHARS = set('.^$*+?{}[]()|\\')
+
+def _literal_prefix(pattern: str) -> str:
+    """
+    パターンの先頭にある必須リテラル文字列を取得
+
+    「RC[造構法]*」なら「RC」、「鉄[骨筋]」なら「鉄」を返す。
+    先頭がリテラルでない、またはトップレベルの選択（|）を含むパターンは空文字を返す。
+    """
+    if '|' in pattern:
+        return ''
+
+    prefix = []
+    for char in pattern:
+        if char in _METACHARS:
+            break
+        prefix.append(char)
+
+    # 直後の量指定子が最後の文字を任意にする場合はその文字を除く
+    rest = pattern[len(prefix):]
+    if rest[:1] in ('*', '?', '{'):
+        prefix = prefix[:-1]
+
+    return ''.join(prefix)
+
+# IGNORECASE時に1つのリテラルから展開する表記の上限
+_MAX_CASE_VARIANTS = 64
+
+# IGNORECASE指定時にASCII英字と同一視される非ASCII文字（re.IGNORECASEの挙動に合わせる）
+_EXTRA_CASES = {'i': '\u0130\u0131', 'k': '\u212a', 's': '\u017f'}
+_FOLD_TABLE = str.maketrans({extra: base for base, extras in _EXTRA_CASES.items() for extra in extras})
+
+# 一括走査をやめてパターンごとに走査する、先頭リテラルの出現率（1文字あたり）。
+# 出現位置ごとの照合が増えると一括走査の方が遅くなる（術語抽出のパターンで1000文字あたり約60件が分岐点）
+_MAX_LITERAL_HIT_RATE = 0.05
+
+# 出現率を見積もるために先頭から走査する文字数
+_HIT_RATE_SAMPLE_CHARS = 20000
+
+class PatternMatcher:
+    def __init__(self, patterns: Dict[str, List[str]], flags: int = 0):
+        """
+        パターンマッチャーを初期化
+
+        先頭リテラルを持つパターンは、全リテラルを1つの選択パターンにまとめて
+        テキストを一回走査し、リテラルが現れた位置でのみ各パターンを照合する。
+        各パターンごとのre.findallと同じ結果（重ならない最左一致）になる。
+        リテラルの出現が多い（術語が密な）テキストでは、パターンごとのre.findallで走査する。
+
+        Args:
+            patterns: カテゴリ -> 正規表現パターンのリスト
+            flags: 正規表現フラグ（re.IGNORECASEなど）
+        """
+        self.flags = flags
+        self.ignorecase = bool(flags & re.IGNORECASE)
+        self.categories = list(patterns.keys())
+        self.compiled: List[Tuple[str, re.Pattern]] = [
+            (category, re.compile(pattern, flags))
+            for category, category_patterns in patterns.items()
+            for pattern in category_patterns
+        ]
+
+        # 先頭リテラル（大文字小文字を畳み込んだ形）ごとのパターン番号
+        prefixes: Dict[str, List[int]] = {}
+        self._fallback: List[int] = []
+        for index, (_, compiled) in enumerate(self.compiled):
+            prefix = _literal_prefix(compiled.pattern)
+            if prefix and self._case_variants(prefix):
+                prefixes.setdefault(self._fold(prefix), []).append(index)
+            else:
+                self._fallback.append(index)
+
+        # 長いリテラルを先に並べ、各位置で最長のリテラルが一致するようにする
+        self._literals = sorted(prefixes, key=len, reverse=True)
+        self._buckets: List[List[int]] = []
+        self._followups: List[List[Tuple[int, List[Tuple[int, bool]]]]] = []
+        for literal in self._literals:
+            # このリテラルの位置で照合するパターン（接頭辞となるリテラルのパターンを含む）
+            self._buckets.append(sorted(
+                index for other, indices in prefixes.items()
+                if literal.startswith(other) for index in indices
+            ))
+            self._followups.append(self._literal_followups(literal))
+
+        # 走査はIGNORECASEなしの単純なリテラルの選択で行う（先頭文字による高速検索が効く）。
+        # 大文字小文字の違いは表記ごとの選択肢に展開し、一致した表記からリテラルを引く。
+        self._scanner = None
+        self._literal_checks = []
+        self._variant_index: Dict[str, int] = {}
+        if self._literals:
+            scan_flags = flags & ~re.IGNORECASE
+            for literal_index, literal in enumerate(self._literals):
+                variants = self._case_variants(literal)
+                self._literal_checks.append(
+                    re.compile('|'.join(re.escape(variant) for variant in variants), scan_flags))
+                for variant in variants:
+                    self._variant_index[variant] = literal_index
+            alternatives = sorted(self._variant_index, key=len, reverse=True)
+            self._scanner = re.compile('|'.join(re.escape(variant) for variant in alternatives), scan_flags)
+
+    def _fold(self, text: str) -> str:
+        return text.translate(_FOLD_TABLE).lower() if self.ignorecase else text
+
+    def _case_variants(self, literal: str) -> List[str]:
+        """
+        リテラルがIGNORECASEで一致しうる全表記
+
+        大文字小文字を持つ非ASCII文字を含む場合や表記が多すぎる場合は空リストを返す
+        （そのパターンは個別に走査する）。
+        """
+        if not self.ignorecase:
+            return [literal]
+
+        options = []
+        for char in literal:
+            if char.lower() == char.upper():
+                options.append(char)
+            elif char.isascii() or char in _FOLD_TABLE:
+                base = self._fold(char)
+                options.append(base + base.upper() + _EXTRA_CASES.get(base, ''))
+            else:
+                return []
+
+        count = 1
+        for option in options:
+            count *= len(option)
+        if count > _MAX_CASE_VARIANTS:
+            return []
+
+        return [''.join(chars) for chars in product(*options)]
+
+    def _literal_followups(self, literal: str) -> List[Tuple[int, List[Tuple[int, bool]]]]:
+        """
+        リテラルの一致範囲の途中から始まる他のリテラル
+
+        走査は一致したリテラルの末尾から再開されるため、範囲内で始まるリテラルはここで補う。
+
+        Returns:
+            (オフセット, [(リテラル番号, テキストでの確認が必要か)]) のリスト
+        """
+        followups = []
+        for offset in range(1, len(literal)):
+            rest = literal[offset:]
+            candidates = []
+            for other_index, other in enumerate(self._literals):
+                if rest.startswith(other):
+                    candidates.append((other_index, False))
+                elif other.startswith(rest):
+                    candidates.append((other_index, True))
+            if candidates:
+                followups.append((offset, candidates))
+        return followups
+
+    def findall_per_pattern(self, text: str) -> List[List[str]]:
+        """
+        全パターンの一致を一回の走査で取得
+
+        Args:
+            text: 対象テキスト
+
+        Returns:
+            パターンごとの一致リスト（各パターンのre.findallと同じ内容）
+        """
+        if self._is_dense(text):
+            return [compiled.findall(text) for _, compiled in self.compiled]
+
+        results: List[List[str]] = [[] for _ in self.compiled]
+
+        if self._scanner is not None:
+            last_end = [0] * len(self.compiled)
+            compiled = [pattern for _, pattern in self.compiled]
+            buckets = self._buckets
+            followups = self._followups
+            literal_checks = self._literal_checks
+            variant_index = self._variant_index
+
+            match_value = self._match_value
+
+            def match_at(literal_index, pos):
+                for index in buckets[literal_index]:
+                    if pos < last_end[index]:
+                        continue
+                    match = compiled[index].match(text, pos)
+                    if match:
+                        last_end[index] = match.end()
+                        results[index].append(match_value(match))
+
+            for hit in self._scanner.finditer(text):
+                literal_index = variant_index[hit.group()]
+                pos = hit.start()
+                match_at(literal_index, pos)
+
+                for offset, candidates in followups[literal_index]:
+                    for other_index, needs_check in candidates:
+                        if not needs_check or literal_checks[other_index].match(text, pos + offset):
+                            match_at(other_index, pos + offset)
+                            break
+
+        # 先頭リテラルを持たないパターンは個別に走査する
+        for index in self._fallback:
+            results[index] = self.compiled[index][1].findall(text)
+
+        return results
+
+    def _is_dense(self, text: str) -> bool:
+        """テキスト先頭の先頭リテラルの出現率が、一括走査の方が遅くなる水準を超えるか"""
+        if self._scanner is None:
+            return False
+        sample = min(len(text), _HIT_RATE_SAMPLE_CHARS)
+        if not sample:
+            return False
+        hits = sum(1 for _ in self._scanner.finditer(text, 0, sample))
+        return hits > sample * _MAX_LITERAL_HIT_RATE
+
+    def findall(self, text: str) -> Dict[str, List[str]]:
+        """
+        カテゴリ別の一致を一回の走査で取得
+
+        Args:
+            text: 対象テキスト
+
+        Returns:
+            カテゴリ -> 一致した文字列のリスト（パターン順）
+        """
+        by_category = {category: [] for category in self.categories}
+        for (category, _), matches in zip(self.compiled, self.findall_per_pattern(text)):
+            by_category[category].extend(matches)
+        return by_category
+
+    @staticmethod
+    def _match_value(match: re.Match):
+        """re.findallと同じ形式の値（グループ数に応じて全体・グループ・タプル）"""
+        groups = match.re.groups
+        if groups == 0:
+            return match.group(0)
+        if groups == 1:
+            return match.group(1)
+        return match.groups(default='')
+
+@lru_cache(maxsize=32)
+def _compile_cached(key: Tuple[Tuple[str, Tuple[str, ...]], ...], flags: int) -> PatternMatcher:
+    return PatternMatcher({category: list(patterns) for category, patterns in key}, flags)
+
+def compile_patterns(patterns: Union[Dict[str, List[str]], List[str]], flags: int = 0) -> PatternMatcher:
+    """
+    パターン定義からマッチャーを取得（同じ定義なら再コンパイルしない）
+
+    パターンが書き換えられた場合は別のキーとなるため自動的に再コンパイルされる。
+
+    Args:
+        patterns: カテゴリ -> パターンのリスト、またはパターンのリスト（カテゴリ名は空文字）
+        flags: 正規表現フラグ
+
+    Returns:
+        パターンマッチャー
+    """
+    if not isinstance(patterns, dict):
+        patterns = {'': patterns}
+    key = tuple((category, tuple(category_patterns)) for category, category_patterns in patterns.items())
+    return _compile_cached(key, flags)
@@ -0,0 +1,236 @@
+"""
+PDFマニフェスト
+取り込み済みPDFと抽出術語を記録し、差分のみを再解析する
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple, Union
+from collections import Counter
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 抽出結果は術語リスト、またはカテゴリ別の術語リスト
+ExtractedTerms = Union[Iterable[str], Dict[str, List[str]]]
+
+# 抽出関数の戻り値は (パス, 術語) または (パス, 術語, 術語 -> [出現回数, 出現ページ][, 用語集の行])
+# （抽出に失敗したファイルは術語を None とし、記録せずに次回の走査で再解析する）
+ExtractedFile = Union[Tuple[str, ExtractedTerms], Tuple[str, ExtractedTerms, Dict[str, List]],
+                      Tuple[str, ExtractedTerms, Dict[str, List], List[Dict]]]
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """ファイル内容のSHA-256ハッシュを計算"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def flatten_terms(terms) -> Set[str]:
+    """術語リストまたはカテゴリ別術語を術語の集合に変換"""
+    if isinstance(terms, dict):
+        return {term for category_terms in terms.values() for term in category_terms}
+    return set(terms)
+
+@dataclass
+class ManifestDelta:
+    """マニフェスト更新による術語DBへの差分"""
+    added_terms: Set[str] = field(default_factory=set)
+    removed_terms: Set[str] = field(default_factory=set)
+    parsed_files: List[str] = field(default_factory=list)
+    deleted_files: List[str] = field(default_factory=list)
+    failed_files: List[str] = field(default_factory=list)
+    unchanged_files: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added_terms or self.removed_terms)
+
+class PDFManifest:
+    def __init__(self, manifest_path: str):
+        """
+        PDFマニフェストを初期化
+
+        Args:
+            manifest_path: マニフェストJSONファイルのパス
+        """
+        self.manifest_path = Path(manifest_path)
+        self.files: Dict[str, Dict] = {}
+        self._scanned_hashes: Dict[str, str] = {}
+
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f).get("files", {})
+            logger.info(f"Manifest loaded: {len(self.files)} files")
+
+    def scan(self, pdf_dir: str, extractor_key: str = "") -> Tuple[List[str], List[str], int]:
+        """
+        ディレクトリを走査して再解析が必要なPDFを判定
+
+        サイズと更新時刻が一致するファイルはハッシュ計算も省略する。
+        一致しない場合でも内容のハッシュが同じなら記録だけを更新する。
+        抽出器のキー（パターンのハッシュなど）が変わったファイルは再解析対象となる。
+
+        Args:
+            pdf_dir: PDFディレクトリ
+            extractor_key: 抽出設定を識別するキー
+
+        Returns:
+            (解析が必要なファイル, 削除されたファイル, 変更なしのファイル数)
+        """
+        pdf_dir = Path(pdf_dir)
+        to_parse = []
+        unchanged = 0
+        present = set()
+
+        for pdf_file in sorted(pdf_dir.glob("**/*.pdf")):
+            path = str(pdf_file)
+            present.add(path)
+            stat = pdf_file.stat()
+            entry = self.files.get(path)
+            if entry and entry.get("extractor", "") != extractor_key:
+                to_parse.append(path)
+                continue
+
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                unchanged += 1
+                continue
+
+            sha256 = file_sha256(path)
+            if entry and entry["sha256"] == sha256:
+                entry["size"], entry["mtime"] = stat.st_size, stat.st_mtime
+                unchanged += 1
+                continue
+
+            self._scanned_hashes[path] = sha256
+            to_parse.append(path)
+
+        deleted = [path for path in self.files
+                   if path not in present and Path(path).is_relative_to(pdf_dir)]
+
+        return to_parse, deleted, unchanged
+
+    def update(self, pdf_dir: str,
+               extract_files: Callable[[List[str]], Iterator[ExtractedFile]],
+               extractor_key: str = "") -> ManifestDelta:
+        """
+        ディレクトリの変更分だけを解析してマニフェストを更新
+
+        Args:
+            pdf_dir: PDFディレクトリ
+            extract_files: ファイルリストを受け取り (パス, 術語[, 出現情報[, 用語集の行]]) を返す抽出関数
+                （抽出に失敗したファイルは術語を None とする）
+            extractor_key: 抽出設定を識別するキー
+
+        Returns:
+            術語DBに反映すべき差分
+        """
+        to_parse, deleted, unchanged = self.scan(pdf_dir, extractor_key)
+        delta = ManifestDelta(deleted_files=deleted, unchanged_files=unchanged)
+
+        if not to_parse and not deleted:
+            logger.info(f"No PDF changes in {pdf_dir} ({unchanged} files unchanged)")
+            return delta
+
+        # 術語ごとの出現ファイル数（参照カウント）
+        before = Counter()
+        for entry in self.files.values():
+            before.update(flatten_terms(entry["terms"]))
+        after = before.copy()
+
+        old_terms = set()
+        for path in deleted + [path for path in to_parse if path in self.files]:
+            terms = flatten_terms(self.files.pop(path)["terms"])
+            after.subtract(terms)
+            old_terms |= terms
+
+        new_terms = set()
+        for path, terms, *details in extract_files(to_parse):
+            if terms is None:
+                # 失敗したファイルは記録しない（以前の記録も削除済みのため、次回の走査で再解析される）
+                delta.failed_files.append(path)
+                continue
+            stat = os.stat(path)
+            if isinstance(terms, dict):
+                terms = {category: sorted(set(category_terms)) for category, category_terms in terms.items()}
+            else:
+                terms = sorted(set(terms))
+            self.files[path] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "sha256": self._scanned_hashes.pop(path, None) or file_sha256(path),
+                "extractor": extractor_key,
+                "terms": terms
+            }
+            if details:
+                self.files[path]["occurrences"] = details[0]
+            if len(details) > 1 and details[1]:
+                self.files[path]["glossary"] = details[1]
+            flat = flatten_terms(terms)
+            after.update(flat)
+            new_terms |= flat
+            delta.parsed_files.append(path)
+
+        delta.added_terms = {term for term in new_terms if before[term] == 0}
+        delta.removed_terms = {term for term in old_terms if after[term] <= 0}
+
+        logger.info(f"Manifest updated: {len(delta.parsed_files)} parsed, {len(delta.failed_files)} failed, "
+                    f"{len(deleted)} deleted, {unchanged} unchanged, +{len(delta.added_terms)}/-{len(delta.removed_terms)} terms")
+        return delta
+
+    def all_terms(self) -> Set[str]:
+        """マニフェストに記録された全術語"""
+        terms = set()
+        for entry in self.files.values():
+            terms |= flatten_terms(entry["terms"])
+        return terms
+
+    def term_statistics(self) -> Dict[str, List]:
+        """
+        出現情報を記録したファイルから術語ごとの統計を集計
+
+        Returns:
+            術語 -> [コーパス頻度, 文書頻度, [[PDFパス, [出現ページ]], ...]]
+        """
+        stats = {}
+        for path in sorted(self.files):
+            for term, (count, pages) in self.files[path].get("occurrences", {}).items():
+                stat = stats.setdefault(term, [0, 0, []])
+                stat[0] += count
+                stat[1] += 1
+                stat[2].append([path, pages])
+        return stats
+
+    def glossary_metadata(self) -> Dict[str, Dict]:
+        """
+        用語集テーブルから取り込んだ術語の読み・区分・定義
+
+        同じ術語が複数の用語集にある場合は、パス順で最初の用語集の内容を使う。
+
+        Returns:
+            術語 -> {"reading", "category", "definition", "glossary": [PDFパス, ページ]}
+        """
+        metadata = {}
+        for path in sorted(self.files):
+            for entry in self.files[path].get("glossary", []):
+                if entry["term"] in metadata:
+                    continue
+                metadata[entry["term"]] = {
+                    "reading": entry["reading"],
+                    "category": entry["category"],
+                    "definition": entry["definition"],
+                    "glossary": [path, entry["page"]]
+                }
+        return metadata
+
+    def save(self):
+        """マニフェストをファイルに保存"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(self.manifest_path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"files": self.files}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
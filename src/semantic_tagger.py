@@ -0,0 +1,149 @@
+"""
+埋め込みによるタグ分類
+タグごとのシード語句の埋め込みの重心（セントロイド）と項目の埋め込みの内積で、キーワードのない言い換えにもタグを付ける
+"""
+
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 埋め込みで分類するタグの次元（優先度はキーワードの方が確実なため対象外）
+SEMANTIC_DIMENSIONS = ("categories", "content_types", "stakeholders")
+
+# タクソノミー: ((次元, ((タグ, シード語句), ...)), ...)（SmartTagger のタクソノミーと同じ形）
+Taxonomy = Tuple[Tuple[str, Tuple[Tuple[str, Tuple[str, ...]], ...]], ...]
+
+class SemanticTagger:
+    def __init__(self, model, thresholds: Optional[Dict[str, float]] = None,
+                 max_tags: Optional[Dict[str, int]] = None, batch_size: int = 64,
+                 max_cached: int = 50000):
+        """
+        埋め込みによるタグ分類器を初期化
+
+        タグごとにタグ名とシード語句（SmartTagger のキーワード）の埋め込みの平均を正規化したセントロイドを求め、
+        項目の埋め込みをまとめてエンコードして、セントロイドの行列との積1回で全タグの類似度を得る。
+        項目・シード語句の埋め込みはテキストごとにキャッシュするため、
+        タクソノミーを変えても新しいシード語句をエンコードするだけで、再分類は行列積のみ。
+
+        Args:
+            model: 埋め込みモデル（SentenceTransformer、VectorDBと共有）
+            thresholds: 次元ごとのタグを付けるコサイン類似度の下限
+            max_tags: 次元ごとの1項目に付けるタグの最大数
+            batch_size: 埋め込みを一度に計算する文数
+            max_cached: キャッシュする埋め込みの最大数（古いものから破棄）
+        """
+        self.model = model
+        self.thresholds = {"categories": 0.5, "content_types": 0.5, "stakeholders": 0.55}
+        self.thresholds.update(thresholds or {})
+        self.max_tags = {"categories": 2, "content_types": 1, "stakeholders": 2}
+        self.max_tags.update(max_tags or {})
+        self.batch_size = batch_size
+        self.max_cached = max_cached
+
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # 直近のタクソノミーのセントロイド（タクソノミー -> (ラベル, セントロイド行列)）
+        self._centroids: Dict[Hashable, Tuple[List[Tuple[str, str]], np.ndarray]] = {}
+
+    def config(self) -> Dict[str, object]:
+        """分類結果を左右する設定（モデルの種類・名前、しきい値、最大タグ数、一括タグ付けのチェックポイント用）"""
+        model = self.model
+        # SentenceTransformer はトークナイザーに読み込んだモデルの名前・パスを持つ
+        name = getattr(model, "model_name", None) or getattr(getattr(model, "tokenizer", None), "name_or_path", None)
+        return {
+            "model": f"{type(model).__module__}.{type(model).__qualname__}",
+            "model_name": name if isinstance(name, str) else None,
+            "thresholds": self.thresholds,
+            "max_tags": self.max_tags,
+        }
+
+    def classify(self, contents: Sequence[str], taxonomy: Taxonomy) -> List[Dict[str, List[str]]]:
+        """
+        項目をまとめてタグに分類
+
+        Args:
+            contents: 項目のテキスト
+            taxonomy: タクソノミー（SEMANTIC_DIMENSIONS 以外の次元は無視）
+
+        Returns:
+            項目ごとの 次元 -> タグのリスト（類似度の降順、しきい値以上で最大 max_tags 件）
+        """
+        results: List[Dict[str, List[str]]] = [{} for _ in contents]
+        labels, centroids = self._centroid_matrix(taxonomy)
+        if not contents or not labels:
+            return results
+
+        scores = self.encode(contents) @ centroids.T
+        for dimension in SEMANTIC_DIMENSIONS:
+            columns = [i for i, (label_dimension, _) in enumerate(labels) if label_dimension == dimension]
+            if not columns:
+                continue
+            dimension_scores = scores[:, columns]
+            limit = min(self.max_tags.get(dimension, 1), len(columns))
+            top = np.argsort(-dimension_scores, axis=1, kind="stable")[:, :limit]
+            threshold = self.thresholds.get(dimension, 0.5)
+            for row, candidates in enumerate(top):
+                tags = [labels[columns[i]][1] for i in candidates if dimension_scores[row, i] >= threshold]
+                if tags:
+                    results[row][dimension] = tags
+        return results
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        テキストの埋め込み（L2正規化、キャッシュにないテキストだけをまとめてエンコード）
+
+        Args:
+            texts: テキスト
+
+        Returns:
+            埋め込みの行列（テキスト数 x 次元数）
+        """
+        cache = self._vectors
+        pending = [text for text in dict.fromkeys(texts) if text not in cache]
+        if pending:
+            vectors = np.asarray(self.model.encode(pending, batch_size=self.batch_size,
+                                                   show_progress_bar=False), dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            for text, vector in zip(pending, vectors / norms):
+                cache[text] = vector
+            logger.debug(f"Encoded {len(pending)} texts for semantic tagging")
+
+        matrix = np.stack([cache[text] for text in texts])
+        for text in texts:
+            cache.move_to_end(text)
+        while len(cache) > self.max_cached:
+            cache.popitem(last=False)
+        return matrix
+
+    def _centroid_matrix(self, taxonomy: Taxonomy) -> Tuple[List[Tuple[str, str]], np.ndarray]:
+        """タクソノミーのラベル (次元, タグ) とセントロイドの行列（直近のタクソノミーのみ保持）"""
+        cached = self._centroids.get(taxonomy)
+        if cached is not None:
+            return cached
+
+        labels: List[Tuple[str, str]] = []
+        phrase_lists: List[List[str]] = []
+        for dimension, tags in taxonomy:
+            if dimension not in SEMANTIC_DIMENSIONS:
+                continue
+            for tag, seeds in tags:
+                labels.append((dimension, tag))
+                phrase_lists.append(list(dict.fromkeys([tag, *seeds])))
+
+        if labels:
+            vectors = self.encode([phrase for phrases in phrase_lists for phrase in phrases])
+            bounds = np.cumsum([0] + [len(phrases) for phrases in phrase_lists])
+            centroids = np.add.reduceat(vectors, bounds[:-1], axis=0)
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            centroids = centroids / norms
+        else:
+            centroids = np.zeros((0, 0), dtype=np.float32)
+
+        self._centroids = {taxonomy: (labels, centroids)}
+        logger.info(f"Computed {len(labels)} tag centroids for semantic tagging")
+        return labels, centroids
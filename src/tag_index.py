@@ -0,0 +1,408 @@
+"""
+タグの転置索引
+タグから会議・議事録項目の番号の昇順の配列（ポスティングリスト）を引き、AND/OR/NOTと日付範囲で検索する
+"""
+
+import os
+import re
+from array import array
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+import logging
+
+import numpy as np
+
+from .timeline import ITEM_SECTIONS
+
+logger = logging.getLogger(__name__)
+
+# 索引に使う項目タグの次元（"keywords" は自由な語のため対象外）
+TAG_DIMENSIONS = ("categories", "content_types", "priority", "stakeholders", "technical_terms")
+
+# 年月日（「2024-01-15」「2024/1/15」「2024年1月15日」、ISO形式の日時など）
+_DATE = re.compile(r'(\d{4})\s*[-/.年]\s*(\d{1,2})\s*[-/.月]\s*(\d{1,2})')
+
+Tag = Tuple[str, str]
+DateLike = Union[str, date, None]
+
+def parse_date(value: DateLike) -> Optional[date]:
+    """
+    日付を解釈
+
+    Args:
+        value: 日付の文字列（年月日を含むもの）、または date / datetime
+
+    Returns:
+        日付（解釈できない場合はNone）
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    match = _DATE.search(value or "")
+    if not match:
+        return None
+    try:
+        return date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+def _to_bitmap(ids: np.ndarray) -> int:
+    """番号の配列をビットマップ（番号のビットが立った整数）に変換"""
+    if not len(ids):
+        return 0
+    mask = np.zeros(int(ids.max()) + 1, dtype=bool)
+    mask[ids] = True
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+def _from_bitmap(bitmap: int) -> np.ndarray:
+    """ビットマップから番号の配列（昇順）"""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    return np.flatnonzero(np.unpackbits(np.frombuffer(data, dtype=np.uint8), bitorder="little"))
+
+class TagIndex:
+    def __init__(self, path: Optional[str] = None, compact_ratio: float = 0.2):
+        """
+        タグの転置索引を初期化
+
+        ポスティングリストは会議・項目の番号の昇順の配列で、新しい議事録は末尾に番号を追加するだけで索引に反映する。
+        検索時はタグごとの配列をビットマップ（整数）に変換してキャッシュし、AND/OR/NOT をビット演算で行う。
+        同じ会議IDの議事録を追加し直した場合は、古い会議を無効にして新しい番号で追加し、
+        無効な会議の割合が compact_ratio を超えたら保存時に詰めて番号を振り直す。
+
+        Args:
+            path: 索引ファイル（.npz、存在すれば読み込む。Noneでメモリのみ）
+            compact_ratio: 保存時に compact する無効な会議の割合
+        """
+        self.path = Path(path) if path else None
+        self.compact_ratio = compact_ratio
+
+        # 会議（番号 -> 会議ID・会議日の序数（不明は0）・最初の項目の番号）
+        self.keys: List[str] = []
+        self._doc_ids: Dict[str, int] = {}
+        self._dates = array('i')
+        self._first_items = array('I')
+        self._live = 0
+
+        # 項目（番号 -> 会議の番号・項目名の番号・項目内の番号）
+        self._item_docs = array('I')
+        self._item_sections = array('B')
+        self._item_numbers = array('I')
+        self._live_items = 0
+
+        # タグ -> 番号の配列（会議単位・項目単位）と、検索に使ったタグのビットマップ
+        self._postings: Dict[Tag, array] = {}
+        self._item_postings: Dict[Tag, array] = {}
+        self._bitmaps: Dict[Tuple[bool, Tag], int] = {}
+        self._dirty = False
+
+        if self.path and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        """有効な会議の数"""
+        return len(self._doc_ids)
+
+    def add(self, minutes: Dict, meeting_id: str) -> int:
+        """
+        タグ付き議事録を索引に追加
+
+        会議単位のタグは項目のタグの和集合と、主要カテゴリ（"main_categories"、tag_summary の main_categories）。
+
+        Args:
+            minutes: タグ付き議事録（SmartTagger.tag_minutes の出力）
+            meeting_id: 会議ID（同じIDの会議は置き換え）
+
+        Returns:
+            会議の番号（compact で振り直される）
+        """
+        previous = self._doc_ids.get(meeting_id)
+        if previous is not None:
+            self._remove(previous)
+
+        doc = len(self.keys)
+        self.keys.append(meeting_id)
+        self._doc_ids[meeting_id] = doc
+        meeting_date = self._meeting_date(minutes)
+        self._dates.append(meeting_date.toordinal() if meeting_date else 0)
+        self._first_items.append(len(self._item_docs))
+        self._live |= 1 << doc
+
+        meeting_tags: Set[Tag] = set()
+        for section_number, section in enumerate(ITEM_SECTIONS):
+            for number, item in enumerate(minutes.get(section) or []):
+                item_id = len(self._item_docs)
+                self._item_docs.append(doc)
+                self._item_sections.append(section_number)
+                self._item_numbers.append(number)
+                self._live_items |= 1 << item_id
+
+                tags = self.item_tags(item)
+                meeting_tags.update(tags)
+                for tag in tags:
+                    self._add_posting(True, tag, item_id)
+
+        meeting_tags.update(("main_categories", category) for category in self._main_categories(minutes))
+        for tag in meeting_tags:
+            self._add_posting(False, tag, doc)
+
+        self._dirty = True
+        return doc
+
+    @staticmethod
+    def item_tags(item: Dict) -> Set[Tag]:
+        """項目のタグ（(次元, 値) の集合）"""
+        tags = item.get("tags") or {}
+        result = set()
+        for dimension in TAG_DIMENSIONS:
+            values = tags.get(dimension)
+            if isinstance(values, str):
+                values = [values]
+            result.update((dimension, value) for value in values or [] if value)
+        return result
+
+    def query(self, all_of: Iterable[Tag] = (), any_of: Sequence[Iterable[Tag]] = (),
+              none_of: Iterable[Tag] = (), priority: Optional[str] = None,
+              date_from: DateLike = None, date_to: DateLike = None,
+              items: bool = False) -> List:
+        """
+        タグで会議・項目を検索
+
+        Args:
+            all_of: すべてを持つタグ（AND）
+            any_of: タグの組のリスト（各組のいずれかを持つ、組同士はAND）
+            none_of: いずれも持たないタグ（NOT）
+            priority: 優先度（("priority", 優先度) を all_of に加えるのと同じ）
+            date_from: 会議日の下限（この日を含む、会議日が不明の会議は除外）
+            date_to: 会議日の上限（この日を含む）
+            items: 項目単位で検索する
+
+        Returns:
+            会議IDのリスト、または (会議ID, 項目名, 項目内の番号) のリスト（追加順）
+        """
+        result = self._live_items if items else self._live
+        all_of = list(all_of) + ([("priority", priority)] if priority else [])
+        for tag in all_of:
+            result &= self._bitmap(items, tag)
+
+        for group in any_of:
+            union = 0
+            for tag in group:
+                union |= self._bitmap(items, tag)
+            result &= union
+
+        for tag in none_of:
+            result &= ~self._bitmap(items, tag)
+
+        if result and (date_from or date_to):
+            result &= self._date_bitmap(date_from, date_to, items)
+
+        ids = _from_bitmap(result)
+        if not items:
+            return [self.keys[doc] for doc in ids]
+        return [(self.keys[self._item_docs[i]], ITEM_SECTIONS[self._item_sections[i]], self._item_numbers[i])
+                for i in ids]
+
+    def search(self, criteria: Dict) -> List[str]:
+        """
+        SmartTagger.search_by_tags と同じ条件で会議を検索
+
+        Args:
+            criteria: "categories"（主要カテゴリのいずれか）, "stakeholders"（いずれか）, "priority",
+                      "date_from", "date_to"
+
+        Returns:
+            会議IDのリスト（追加順）
+        """
+        groups = []
+        if criteria.get("categories"):
+            groups.append([("main_categories", category) for category in criteria["categories"]])
+        if criteria.get("stakeholders"):
+            groups.append([("stakeholders", stakeholder) for stakeholder in criteria["stakeholders"]])
+        return self.query(any_of=groups, priority=criteria.get("priority"),
+                          date_from=criteria.get("date_from"), date_to=criteria.get("date_to"))
+
+    def tags(self, dimension: Optional[str] = None) -> Dict[Tag, int]:
+        """
+        会議単位のタグと、そのタグを持つ有効な会議の数
+
+        Args:
+            dimension: 次元（Noneで全次元）
+
+        Returns:
+            タグ -> 会議数
+        """
+        return {
+            tag: bin(self._bitmap(False, tag) & self._live).count("1")
+            for tag in self._postings if dimension is None or tag[0] == dimension
+        }
+
+    def compact(self) -> int:
+        """
+        置き換えで無効になった会議・項目を除き、有効な会議・項目の番号を追加順に振り直す
+
+        Returns:
+            除いた会議の数
+        """
+        docs = np.array(sorted(self._doc_ids.values()), dtype=np.int64)
+        removed = len(self.keys) - len(docs)
+        if removed == 0:
+            return 0
+
+        # 旧番号 -> 新番号（無効は-1）
+        live = np.zeros(len(self.keys), dtype=bool)
+        live[docs] = True
+        doc_map = np.full(len(self.keys), -1, dtype=np.int64)
+        doc_map[docs] = np.arange(len(docs))
+        item_docs = np.frombuffer(self._item_docs, dtype=np.uint32)
+        items = np.flatnonzero(live[item_docs])
+        item_map = np.full(len(item_docs), -1, dtype=np.int64)
+        item_map[items] = np.arange(len(items))
+
+        self.keys = [self.keys[doc] for doc in docs]
+        self._doc_ids = {key: doc for doc, key in enumerate(self.keys)}
+        self._dates = array('i', np.frombuffer(self._dates, dtype=np.int32)[docs].tobytes())
+        new_item_docs = doc_map[item_docs[items]].astype(np.uint32)
+        # 項目は会議の順に並ぶため、会議の最初の項目は会議の番号の挿入位置
+        first_items = np.searchsorted(new_item_docs, np.arange(len(docs))).astype(np.uint32)
+        self._first_items = array('I', first_items.tobytes())
+        self._item_docs = array('I', new_item_docs.tobytes())
+        self._item_sections = array('B', np.frombuffer(self._item_sections, dtype=np.uint8)[items].tobytes())
+        self._item_numbers = array('I', np.frombuffer(self._item_numbers, dtype=np.uint32)[items].tobytes())
+        self._live = (1 << len(docs)) - 1
+        self._live_items = (1 << len(items)) - 1
+
+        for postings, number_map in ((self._postings, doc_map), (self._item_postings, item_map)):
+            for tag in list(postings):
+                ids = number_map[np.frombuffer(postings[tag], dtype=np.uint32)]
+                ids = ids[ids >= 0]
+                if len(ids):
+                    postings[tag] = array('I', ids.astype(np.uint32).tobytes())
+                else:
+                    del postings[tag]
+
+        self._bitmaps.clear()
+        self._dirty = True
+        logger.info(f"Compacted tag index: removed {removed} replaced meetings")
+        return removed
+
+    def _add_posting(self, items: bool, tag: Tag, number: int):
+        """ポスティングリストの末尾に番号を追加（ビットマップがあれば更新）"""
+        postings = self._item_postings if items else self._postings
+        ids = postings.get(tag)
+        if ids is None:
+            ids = postings[tag] = array('I')
+        ids.append(number)
+        bitmap = self._bitmaps.get((items, tag))
+        if bitmap is not None:
+            self._bitmaps[(items, tag)] = bitmap | (1 << number)
+
+    def _bitmap(self, items: bool, tag: Tag) -> int:
+        """タグのビットマップ（初回にポスティングリストから作成）"""
+        bitmap = self._bitmaps.get((items, tag))
+        if bitmap is None:
+            ids = (self._item_postings if items else self._postings).get(tag)
+            bitmap = _to_bitmap(np.frombuffer(ids, dtype=np.uint32)) if ids else 0
+            self._bitmaps[(items, tag)] = bitmap
+        return bitmap
+
+    def _date_bitmap(self, date_from: DateLike, date_to: DateLike, items: bool) -> int:
+        """会議日が範囲内の会議・項目のビットマップ"""
+        dates = np.frombuffer(self._dates, dtype=np.int32)
+        if items:
+            dates = dates[np.frombuffer(self._item_docs, dtype=np.uint32)]
+        mask = dates > 0
+        lower, upper = parse_date(date_from), parse_date(date_to)
+        if lower:
+            mask &= dates >= lower.toordinal()
+        if upper:
+            mask &= dates <= upper.toordinal()
+        return _to_bitmap(np.flatnonzero(mask))
+
+    def _remove(self, doc: int):
+        """会議とその項目を無効にする（ポスティングリストには残し、検索結果から除く）"""
+        self._live &= ~(1 << doc)
+        first = self._first_items[doc]
+        end = self._first_items[doc + 1] if doc + 1 < len(self._first_items) else len(self._item_docs)
+        self._live_items &= ~(((1 << (end - first)) - 1) << first)
+        del self._doc_ids[self.keys[doc]]
+
+    @staticmethod
+    def _meeting_date(minutes: Dict) -> Optional[date]:
+        """会議日（会議情報の日付、なければ生成日時）"""
+        meeting_info = minutes.get("meeting_info") or {}
+        return parse_date(meeting_info.get("date")) or parse_date(minutes.get("generated_at"))
+
+    @staticmethod
+    def _main_categories(minutes: Dict) -> List[str]:
+        """主要カテゴリ（tag_summary がなければ項目のカテゴリの上位3件）"""
+        summary = minutes.get("tag_summary")
+        if summary is not None:
+            return summary.get("main_categories", [])
+        counts = Counter(category for section in ITEM_SECTIONS for item in minutes.get(section) or []
+                         for category in (item.get("tags") or {}).get("categories", []))
+        return [category for category, _ in counts.most_common(3)]
+
+    def save(self):
+        """索引をファイルに保存（変更がなければ何もしない、無効な会議が多ければ先に compact）"""
+        if self.path is None or not self._dirty:
+            return
+        if len(self.keys) - len(self._doc_ids) > len(self.keys) * self.compact_ratio:
+            self.compact()
+        live = np.zeros(len(self.keys), dtype=bool)
+        live[list(self._doc_ids.values())] = True
+        arrays = {
+            "keys": np.array(self.keys, dtype=str),
+            "dates": np.frombuffer(self._dates, dtype=np.int32),
+            "first_items": np.frombuffer(self._first_items, dtype=np.uint32),
+            "live": live,
+            "item_docs": np.frombuffer(self._item_docs, dtype=np.uint32),
+            "item_sections": np.frombuffer(self._item_sections, dtype=np.uint8),
+            "item_numbers": np.frombuffer(self._item_numbers, dtype=np.uint32),
+        }
+        for prefix, postings in (("meeting", self._postings), ("item", self._item_postings)):
+            tags = list(postings)
+            lengths = np.array([len(postings[tag]) for tag in tags], dtype=np.int64)
+            arrays[f"{prefix}_tags"] = np.array([f"{dimension}\t{value}" for dimension, value in tags], dtype=str)
+            arrays[f"{prefix}_offsets"] = np.concatenate(([0], np.cumsum(lengths)))
+            arrays[f"{prefix}_ids"] = np.concatenate(
+                [np.frombuffer(postings[tag], dtype=np.uint32) for tag in tags]) if tags else np.zeros(0, np.uint32)
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to write tag index {self.path}: {e}")
+            return
+        self._dirty = False
+        logger.info(f"Saved tag index: {len(self)} meetings, {len(self._item_docs)} items")
+
+    def load(self):
+        """索引をファイルから読み込む"""
+        with np.load(self.path, allow_pickle=False) as data:
+            self.keys = data["keys"].tolist()
+            live = data["live"]
+            self._doc_ids = {key: doc for doc, key in enumerate(self.keys) if live[doc]}
+            self._dates = array('i', data["dates"].astype(np.int32).tobytes())
+            self._first_items = array('I', data["first_items"].astype(np.uint32).tobytes())
+            self._item_docs = array('I', data["item_docs"].astype(np.uint32).tobytes())
+            self._item_sections = array('B', data["item_sections"].astype(np.uint8).tobytes())
+            self._item_numbers = array('I', data["item_numbers"].astype(np.uint32).tobytes())
+            self._live = _to_bitmap(np.flatnonzero(live))
+            self._live_items = _to_bitmap(np.flatnonzero(live[data["item_docs"]]))
+
+            for prefix, postings in (("meeting", self._postings), ("item", self._item_postings)):
+                postings.clear()
+                offsets, ids = data[f"{prefix}_offsets"], data[f"{prefix}_ids"].astype(np.uint32)
+                for i, name in enumerate(data[f"{prefix}_tags"].tolist()):
+                    dimension, value = name.split("\t", 1)
+                    postings[(dimension, value)] = array('I', ids[offsets[i]:offsets[i + 1]].tobytes())
+
+        self._bitmaps.clear()
+        self._dirty = False
+        logger.info(f"Loaded tag index: {len(self)} meetings from {self.path}")
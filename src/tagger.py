@@ -3,103 +3,195 @@
 議事録内容に対する自動タグ付け
 """
 
+import hashlib
+import json
+import os
 import re
-from typing import List, Dict, Set, Tuple
-from collections import Counter
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Dict, NamedTuple, Optional, Set, Tuple, Union
 import logging
 
+from .keyword_automaton import KeywordAutomaton
+from .tag_index import TagIndex
+from .semantic_tagger import SemanticTagger, Taxonomy
+from .taxonomy import TaxonomyFile, default_taxonomy
+from .timeline import ITEM_SECTIONS
+
 logger = logging.getLogger(__name__)
 
+# タグの次元（tag_content の結果のキー）と、そのキーワードを持つ SmartTagger の属性
+TAXONOMY_DIMENSIONS = (
+    ("categories", "category_keywords"),
+    ("content_types", "content_type_keywords"),
+    ("priority", "priority_keywords"),
+    ("stakeholders", "stakeholder_keywords"),
+)
+
+# 専門術語として扱うキーワードの次元（カテゴリのキーワードそのものを術語タグにする）
+TECHNICAL_TERM_DIMENSION = "categories"
+
+class CompiledTaxonomy(NamedTuple):
+    automaton: KeywordAutomaton
+    order: Dict[Tuple[str, str], int]  # ラベル -> タクソノミーでの順番（タグの並び順）
+
+class TagMatch(NamedTuple):
+    dimension: str  # "categories", "technical_terms" など
+    tag: str
+    keyword: str
+    start: int
+    end: int
+
+@lru_cache(maxsize=8)
+def compile_taxonomy(taxonomy: Tuple[Tuple[str, Tuple[Tuple[str, Tuple[str, ...]], ...]], ...]) -> CompiledTaxonomy:
+    """
+    タクソノミーを1つのオートマトンにまとめる（同じタクソノミーなら再構築しない）
+
+    各キーワードのラベルは (次元, タグ)。カテゴリのキーワードには ("technical_terms", キーワード) も付ける。
+
+    Args:
+        taxonomy: ((次元, ((タグ, キーワード), ...)), ...)
+
+    Returns:
+        大文字小文字を区別しないオートマトンと、ラベルの順番
+    """
+    entries = []
+    for dimension, tags in taxonomy:
+        for tag, keywords in tags:
+            for keyword in keywords:
+                entries.append((keyword, (dimension, tag)))
+                if dimension == TECHNICAL_TERM_DIMENSION:
+                    entries.append((keyword, ("technical_terms", keyword)))
+    order: Dict[Tuple[str, str], int] = {}
+    for _, label in entries:
+        order.setdefault(label, len(order))
+    return CompiledTaxonomy(KeywordAutomaton(entries), order)
+
+def _iter_items(minutes: Dict) -> Iterator[Tuple[str, Dict]]:
+    """議事録の項目（(項目名, 項目) の順）"""
+    for section in ITEM_SECTIONS:
+        for item in minutes.get(section) or []:
+            yield section, item
+
+def _bounded_map(executor: ProcessPoolExecutor, function: Callable, iterable: Iterable, limit: int) -> Iterator:
+    """executor.map と同じ順で結果を返す（実行中の呼び出しを limit 件までにし、入力を先読みしすぎない）"""
+    pending: deque = deque()
+    for argument in iterable:
+        pending.append(executor.submit(function, argument))
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+# ワーカープロセスのタガー（_init_tag_worker で作成）
+_worker_tagger: Optional["SmartTagger"] = None
+
+def _init_tag_worker(taxonomy_path: str, cache_dir: Optional[Path], taxonomy: Taxonomy):
+    """ワーカープロセスのタガーを親プロセスと同じタクソノミーで作成（ファイルの変更は読み直さない）"""
+    global _worker_tagger
+    tagger = SmartTagger(taxonomy=TaxonomyFile(taxonomy_path, cache_dir, check_interval=float("inf")))
+    if tagger._taxonomy() != taxonomy:
+        for (_, tags), (_, attribute) in zip(taxonomy, TAXONOMY_DIMENSIONS):
+            setattr(tagger, attribute, {tag: list(keywords) for tag, keywords in tags})
+        tagger.refresh_taxonomy()
+    _worker_tagger = tagger
+
+def _tag_chunk(chunk: List[Tuple[str, Union[str, Dict], Optional[List]]]) -> List[Tuple[str, Dict]]:
+    """ワーカープロセスで塊の議事録をタグ付け"""
+    return _worker_tagger._tag_chunk(chunk)
+
+class _TaggingCheckpoint:
+    def __init__(self, path: Optional[str], taxonomy: Taxonomy, semantic: Optional[Dict[str, Any]] = None):
+        """
+        一括タグ付けのチェックポイント（1行目がタクソノミーと分類設定のハッシュ、以降は書き込み済みの会議ID）
+
+        タクソノミーか埋め込みによる分類の設定が異なるチェックポイントは破棄して最初からやり直す
+        （キーワードのみの実行と埋め込みを使う実行の結果を混ぜない）。
+        会議IDは flush まで溜め、まとめて追記する。
+
+        Args:
+            path: チェックポイントファイルのパス（Noneで記録しない）
+            taxonomy: タグ付けに使うタクソノミー
+            semantic: 埋め込みによる分類の設定（SemanticTagger.config、Noneでキーワードのみ）
+        """
+        self.path = Path(path) if path else None
+        config = json.dumps([taxonomy, semantic], ensure_ascii=False, sort_keys=True)
+        self.header = hashlib.sha256(config.encode('utf-8')).hexdigest()
+        self.done: Set[str] = set()
+        self._pending: List[str] = []
+        # ファイルを作り直すか（ない・別のタクソノミーの場合）
+        self._rewrite = True
+        if self.path is None or not self.path.exists():
+            return
+        with open(self.path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        if lines and lines[0] == self.header:
+            self.done = {json.loads(line) for line in lines[1:] if line}
+            self._rewrite = False
+            logger.info(f"Resuming tagging: {len(self.done)} meetings already tagged")
+        else:
+            logger.info("Taxonomy or semantic settings changed since the last checkpoint, tagging all meetings")
+
+    def add(self, keys: Iterable[str]):
+        """書き込んだ会議IDを追加"""
+        self._pending.extend(keys)
+
+    def flush(self):
+        """溜めた会議IDをファイルに追記"""
+        if self.path is None or not self._pending:
+            return
+        with open(self.path, 'w' if self._rewrite else 'a', encoding='utf-8') as f:
+            if self._rewrite:
+                f.write(self.header + "\n")
+            f.writelines(json.dumps(key, ensure_ascii=False) + "\n" for key in self._pending)
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(self._pending)
+        self._pending = []
+        self._rewrite = False
+
+    def finish(self):
+        """全件終わったらファイルを削除"""
+        if self.path is not None and self.path.exists():
+            self.path.unlink()
+        self._rewrite = True
+
 class SmartTagger:
-    def __init__(self):
-        """スマートタガーを初期化"""
-        
-        # 建築分野のカテゴリ別キーワード
-        self.category_keywords = {
-            "構造": [
-                "RC", "SRC", "PC", "鉄筋", "コンクリート", "構造", "基礎", 
-                "杭", "梁", "柱", "スラブ", "壁", "フレーム"
-            ],
-            "設備": [
-                "電気", "機械", "空調", "給排水", "ガス", "消防", "エレベーター",
-                "配管", "配線", "ダクト", "設備"
-            ],
-            "施工管理": [
-                "工程", "品質", "安全", "原価", "施工", "管理", "検査", 
-                "試験", "測定", "監理"
-            ],
-            "設計": [
-                "図面", "仕様", "設計", "計画", "レイアウト", "詳細",
-                "構造計算", "意匠", "構造図"
-            ],
-            "法規": [
-                "建築基準法", "消防法", "条例", "申請", "許可", "認定",
-                "検査済証", "確認申請"
-            ],
-            "材料": [
-                "材料", "資材", "鋼材", "木材", "仕上げ", "防水",
-                "断熱", "塗装", "タイル"
-            ]
-        }
-        
-        # 内容タイプ別キーワード
-        self.content_type_keywords = {
-            "決定事項": [
-                "決定", "確定", "承認", "採用", "選定", "合意", "了承",
-                "決める", "決まる"
-            ],
-            "行動項目": [
-                "検討", "確認", "調整", "実施", "対応", "準備", "作成",
-                "提出", "報告", "連絡", "相談", "修正", "変更"
-            ],
-            "課題": [
-                "課題", "問題", "懸念", "検討事項", "要確認", "要検討",
-                "要調整", "困った", "難しい"
-            ],
-            "情報共有": [
-                "報告", "連絡", "情報", "状況", "進捗", "現状",
-                "説明", "共有"
-            ]
-        }
+    def __init__(self, index: Optional[TagIndex] = None, semantic: Optional[SemanticTagger] = None,
+                 taxonomy: Optional[TaxonomyFile] = None):
+        """
+        スマートタガーを初期化
         
-        # 優先度キーワード
-        self.priority_keywords = {
-            "高": [
-                "緊急", "至急", "重要", "必須", "急ぎ", "すぐに",
-                "即座に", "早急", "優先"
-            ],
-            "中": [
-                "要確認", "要検討", "なるべく", "できれば", "推奨"
-            ],
-            "低": [
-                "参考", "情報", "念のため", "余裕があれば"
-            ]
-        }
+        タクソノミー（カテゴリ・内容タイプ・優先度・関係者のキーワード）はタクソノミーファイルから読み込み、
+        最初のタグ付けで1つのオートマトンにまとめる（ファイルの内容ごとにディスクにキャッシュ）。
+        ファイルが変更されると次のタグ付けで読み直す。キーワードの属性を直接変更した場合は refresh_taxonomy を呼ぶ。
         
-        # 関係者キーワード
-        self.stakeholder_keywords = {
-            "発注者": [
-                "発注者", "クライアント", "お客様", "施主", "建主"
-            ],
-            "設計者": [
-                "設計者", "設計事務所", "アーキテクト", "構造設計",
-                "設備設計", "意匠設計"
-            ],
-            "施工者": [
-                "施工者", "ゼネコン", "建設会社", "工事会社", "請負"
-            ],
-            "監理者": [
-                "監理者", "工事監理", "現場監督", "監督"
-            ],
-            "行政": [
-                "行政", "役所", "建築主事", "確認検査機関", "消防署"
-            ]
-        }
+        Args:
+            index: タグの転置索引（指定時は会議ID付きでタグ付けした議事録を追加する）
+            semantic: 埋め込みによるタグ分類器（指定時はキーワードのない言い換えにもタグを付ける）
+            taxonomy: タクソノミーファイル（Noneで既定の src/taxonomy.json）
+        """
+        self.index = index
+        self.semantic = semantic
+        self._taxonomy_key: Optional[Taxonomy] = None
+        self._compiled: Optional[CompiledTaxonomy] = None
+        
+        # カテゴリ・内容タイプ・優先度・関係者のキーワード（タクソノミーファイルの "tagger" 節）
+        self.taxonomy = taxonomy or default_taxonomy()
+        self._load_taxonomy()
     
     def tag_content(self, content: str, content_type: str = None) -> Dict:
         """
         コンテンツにタグを付与
         
+        カテゴリ・内容タイプ・優先度・関係者・専門術語は、タクソノミー全体をまとめた
+        オートマトンでテキストを一回走査した結果から求める。
+        埋め込みによる分類器があれば、キーワードで付かなかったカテゴリ・内容タイプ・関係者を補う。
+        
         Args:
             content: タグ付け対象のテキスト
             content_type: コンテンツタイプ（決定事項、行動項目など）
@@ -107,70 +199,119 @@ class SmartTagger:
         Returns:
             タグ情報辞書
         """
+        semantic_tags = self.semantic.classify([content], self._taxonomy())[0] if self.semantic else None
+        return self._build_tags(content, content_type, semantic_tags)
+    
+    def _build_tags(self, content: str, content_type: Optional[str],
+                    semantic_tags: Optional[Dict[str, List[str]]] = None) -> Dict:
+        """キーワードの走査結果と埋め込みによる分類結果からタグ情報辞書を作成"""
+        tags_by_dimension = self._scan(content)
+        for dimension, semantic in (semantic_tags or {}).items():
+            keyword_tags = tags_by_dimension.setdefault(dimension, [])
+            # 内容タイプは1つに決めるため、キーワードで付かなかった場合のみ
+            if dimension == "content_types" and keyword_tags:
+                continue
+            keyword_tags.extend(tag for tag in semantic if tag not in keyword_tags)
+        priorities = tags_by_dimension.get("priority")
+        
         tags = {
-            "categories": self._extract_category_tags(content),
-            "content_types": self._extract_content_type_tags(content, content_type),
-            "priority": self._extract_priority_tag(content),
-            "stakeholders": self._extract_stakeholder_tags(content),
+            "categories": tags_by_dimension.get("categories", []),
+            "content_types": [content_type] if content_type else tags_by_dimension.get("content_types", []),
+            "priority": priorities[0] if priorities else "中",  # 高優先度から順、なければ中
+            "stakeholders": tags_by_dimension.get("stakeholders", []),
             "keywords": self._extract_keywords(content),
-            "technical_terms": self._extract_technical_terms(content)
+            "technical_terms": tags_by_dimension.get("technical_terms", [])
         }
         
         return tags
     
-    def _extract_category_tags(self, content: str) -> List[str]:
-        """専門分野カテゴリタグを抽出"""
-        tags = []
-        content_lower = content.lower()
+    def find_tags(self, content: str) -> List[TagMatch]:
+        """
+        タクソノミーのキーワードの出現を、タグの次元ごとに位置付きで取得
         
-        for category, keywords in self.category_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in content_lower:
-                    tags.append(category)
-                    break
+        Args:
+            content: 対象テキスト
+            
+        Returns:
+            タグの出現（終了位置順、1つのキーワードが複数の次元のタグになる場合はそれぞれ）
+        """
+        return [
+            TagMatch(dimension, tag, content[match.start:match.end], match.start, match.end)
+            for match in self._compiled_taxonomy().automaton.iter_matches(content)
+            for dimension, tag in match.labels
+        ]
+    
+    def refresh_taxonomy(self):
+        """キーワードの属性の変更をタグ付けに反映（次のタグ付けでオートマトン・セントロイドを再構築）"""
+        self._taxonomy_key = None
+        self._compiled = None
+    
+    def _load_taxonomy(self):
+        """タクソノミーファイルからキーワードの属性を読み込む（属性の変更は破棄）"""
+        tagger_section = self.taxonomy.section("tagger")
+        for dimension, attribute in TAXONOMY_DIMENSIONS:
+            setattr(self, attribute, {tag: list(keywords)
+                                      for tag, keywords in tagger_section.get(dimension, {}).items()})
+        self._taxonomy_version = self.taxonomy.version
+        self._taxonomy_key = None
+        self._compiled = None
+        self._file_taxonomy_key = self._taxonomy()
+    
+    def _taxonomy(self) -> Taxonomy:
+        """タクソノミー（((次元, ((タグ, キーワード), ...)), ...)、オートマトンとセントロイドのキャッシュのキー）"""
+        if self.taxonomy.version != self._taxonomy_version:
+            self._load_taxonomy()
+        if self._taxonomy_key is None:
+            self._taxonomy_key = tuple(
+                (dimension, tuple((tag, tuple(keywords)) for tag, keywords in getattr(self, attribute).items()))
+                for dimension, attribute in TAXONOMY_DIMENSIONS
+            )
+        return self._taxonomy_key
+    
+    def _compiled_taxonomy(self) -> CompiledTaxonomy:
+        """タクソノミー全体のオートマトン（同じキーワードのタガー間で共有、ファイルのままならディスクにもキャッシュ）"""
+        taxonomy = self._taxonomy()
+        if self._compiled is None:
+            if taxonomy == self._file_taxonomy_key:
+                self._compiled = self.taxonomy.cached("tagger", lambda: compile_taxonomy(taxonomy))
+            else:
+                self._compiled = compile_taxonomy(taxonomy)
+        return self._compiled
+    
+    def _scan(self, content: str) -> Dict[str, List[str]]:
+        """
+        テキストを一回走査して、タグの次元ごとのタグを取得
         
-        return list(set(tags))  # 重複を除去
+        Args:
+            content: 対象テキスト
+            
+        Returns:
+            次元 -> タグのリスト（タクソノミーの順、"technical_terms" はカテゴリのキーワード）
+        """
+        compiled = self._compiled_taxonomy()
+        tags_by_dimension: Dict[str, List[str]] = {}
+        for dimension, tag in sorted(compiled.automaton.labels_in(content), key=compiled.order.__getitem__):
+            tags_by_dimension.setdefault(dimension, []).append(tag)
+        return tags_by_dimension
+    
+    def _extract_category_tags(self, content: str) -> List[str]:
+        """専門分野カテゴリタグを抽出"""
+        return self._scan(content).get("categories", [])
     
     def _extract_content_type_tags(self, content: str, provided_type: str = None) -> List[str]:
         """内容タイプタグを抽出"""
         if provided_type:
             return [provided_type]
-        
-        tags = []
-        content_lower = content.lower()
-        
-        for content_type, keywords in self.content_type_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in content_lower:
-                    tags.append(content_type)
-                    break
-        
-        return tags
+        return self._scan(content).get("content_types", [])
     
     def _extract_priority_tag(self, content: str) -> str:
         """優先度タグを抽出"""
-        content_lower = content.lower()
-        
-        # 高優先度から順にチェック
-        for priority, keywords in self.priority_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in content_lower:
-                    return priority
-        
-        return "中"  # デフォルト
+        priorities = self._scan(content).get("priority")
+        return priorities[0] if priorities else "中"
     
     def _extract_stakeholder_tags(self, content: str) -> List[str]:
         """関係者タグを抽出"""
-        tags = []
-        content_lower = content.lower()
-        
-        for stakeholder, keywords in self.stakeholder_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in content_lower:
-                    tags.append(stakeholder)
-                    break
-        
-        return tags
+        return self._scan(content).get("stakeholders", [])
     
     def _extract_keywords(self, content: str) -> List[str]:
         """重要キーワードを抽出"""
@@ -195,48 +336,169 @@ class SmartTagger:
     
     def _extract_technical_terms(self, content: str) -> List[str]:
         """専門術語を抽出"""
-        technical_terms = []
-        
-        # すべてのカテゴリキーワードをチェック
-        all_keywords = []
-        for keywords in self.category_keywords.values():
-            all_keywords.extend(keywords)
-        
-        content_lower = content.lower()
-        for keyword in all_keywords:
-            if keyword.lower() in content_lower:
-                technical_terms.append(keyword)
-        
-        return list(set(technical_terms))
+        return self._scan(content).get("technical_terms", [])
     
-    def tag_minutes(self, minutes: Dict) -> Dict:
+    def tag_minutes(self, minutes: Dict, meeting_id: Optional[str] = None) -> Dict:
         """
         議事録全体にタグを付与
         
         Args:
-            minutes: 議事録データ
+            minutes: 議事録データ（変更しない）
+            meeting_id: 会議ID（索引があれば、タグ付けした議事録をこのIDで索引に追加）
             
         Returns:
             タグ付きの議事録データ
         """
+        # 埋め込みによる分類は全項目をまとめて1回で行う
+        contents = [item.get("content", "") for _, item in _iter_items(minutes)]
+        semantic_tags = None
+        if self.semantic and contents:
+            semantic_tags = self.semantic.classify(contents, self._taxonomy())
+        
+        tagged_minutes = self._tag_minutes(minutes, semantic_tags)
+        
+        if self.index is not None and meeting_id:
+            self.index.add(tagged_minutes, meeting_id)
+        
+        return tagged_minutes
+    
+    def _tag_minutes(self, minutes: Dict, semantic_tags: Optional[List[Dict[str, List[str]]]] = None) -> Dict:
+        """議事録の各項目にタグを付けたコピー（項目の辞書もコピーし、元の議事録は変更しない）"""
         tagged_minutes = minutes.copy()
+        semantic = iter(semantic_tags) if semantic_tags is not None else None
         
         # 各セクションにタグを追加
-        for section in ["decisions", "action_items", "issues"]:
+        for section in ITEM_SECTIONS:
             if section in tagged_minutes:
-                for item in tagged_minutes[section]:
+                items = []
+                for item in tagged_minutes[section] or []:
+                    item = dict(item)
                     content = item.get("content", "")
                     content_type = item.get("type", section[:-1])  # 's'を除去
                     
                     # タグを生成
-                    tags = self.tag_content(content, content_type)
-                    item["tags"] = tags
+                    item["tags"] = self._build_tags(content, content_type, next(semantic) if semantic else None)
+                    items.append(item)
+                tagged_minutes[section] = items
         
         # 全体のタグサマリーを生成
         tagged_minutes["tag_summary"] = self._generate_tag_summary(tagged_minutes)
         
         return tagged_minutes
     
+    def tag_many(self, source: Iterable[Tuple[str, Union[str, Dict]]],
+                 sink: Optional[Callable[[List[Tuple[str, Dict]]], Any]] = None,
+                 workers: Optional[int] = None, chunk_size: int = 32,
+                 checkpoint: Optional[str] = None, report_interval: float = 10.0) -> Dict:
+        """
+        多数の議事録をまとめてタグ付け（タクソノミー変更後の全会議の再タグ付けなど）
+        
+        議事録を chunk_size 件ずつの塊にしてプロセスプールでタグ付けし、終わった塊から順に sink にまとめて書き込む。
+        プールに渡す塊はワーカー数の2倍までとし、議事録を全件メモリに読み込まない。
+        ワーカーは呼び出し時のタクソノミーでタグ付けする（途中でファイルが変更されても反映しない）。
+        埋め込みによる分類器があれば、塊ごとの分類はこのプロセスで一括して行い、結果をワーカーに渡す。
+        checkpoint を指定すると書き込んだ会議IDをファイルに追記し、中断後に同じタクソノミーで呼び出すと
+        書き込み済みの会議を飛ばして再開する（全件終わるとファイルを削除）。
+        
+        Args:
+            source: (会議ID, 議事録) の反復（議事録は辞書またはJSON文字列、MeetingArchive.iter_minutes など）
+            sink: タグ付けした (会議ID, 議事録) のリストを書き込む関数（MeetingArchive.update_minutes など）
+            workers: ワーカープロセス数（Noneで CPU 数、0 か 1 でこのプロセスのみ）
+            chunk_size: ワーカーに1回で渡す議事録数
+            checkpoint: 再開用のチェックポイントファイル（Noneで再開しない）
+            report_interval: 処理速度をログに出し、索引・チェックポイントを保存する間隔（秒）
+            
+        Returns:
+            "meetings"（タグ付けした会議数）, "items", "skipped"（チェックポイントにより飛ばした会議数）,
+            "seconds", "meetings_per_second", "items_per_second"
+        """
+        taxonomy = self._taxonomy()
+        progress = _TaggingCheckpoint(checkpoint, taxonomy, self.semantic.config() if self.semantic else None)
+        workers = os.cpu_count() or 1 if workers is None else workers
+        stats = {"meetings": 0, "items": 0, "skipped": 0}
+        
+        def chunks() -> Iterator[List[Tuple[str, Union[str, Dict], Optional[List]]]]:
+            chunk = []
+            for key, minutes in source:
+                if key in progress.done:
+                    stats["skipped"] += 1
+                    continue
+                chunk.append((key, minutes))
+                if len(chunk) >= chunk_size:
+                    yield self._prepare_chunk(chunk)
+                    chunk = []
+            if chunk:
+                yield self._prepare_chunk(chunk)
+        
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(
+                workers, initializer=_init_tag_worker,
+                initargs=(str(self.taxonomy.path), self.taxonomy.cache_dir, taxonomy))
+            results = _bounded_map(executor, _tag_chunk, chunks(), workers * 2)
+        else:
+            results = (self._tag_chunk(chunk) for chunk in chunks())
+        
+        start = last_report = time.perf_counter()
+        try:
+            for tagged in results:
+                if sink is not None:
+                    sink(tagged)
+                for key, minutes in tagged:
+                    if self.index is not None:
+                        self.index.add(minutes, key)
+                    stats["items"] += sum(1 for _ in _iter_items(minutes))
+                stats["meetings"] += len(tagged)
+                progress.add(key for key, _ in tagged)
+                
+                now = time.perf_counter()
+                if now - last_report >= report_interval:
+                    self._save_progress(progress)
+                    last_report = now
+                    logger.info(f"Tagged {stats['meetings']} meetings "
+                                f"({stats['meetings'] / (now - start):.1f} meetings/s, "
+                                f"{stats['items'] / (now - start):.1f} items/s)")
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            # 中断した場合も書き込み済みの会議までを記録する
+            self._save_progress(progress)
+        progress.finish()
+        
+        seconds = time.perf_counter() - start
+        stats.update({
+            "seconds": seconds,
+            "meetings_per_second": stats["meetings"] / seconds if seconds else 0.0,
+            "items_per_second": stats["items"] / seconds if seconds else 0.0,
+        })
+        logger.info(f"Tagged {stats['meetings']} meetings ({stats['items']} items) in {seconds:.1f}s, "
+                    f"skipped {stats['skipped']} already tagged")
+        return stats
+    
+    def _prepare_chunk(self, chunk: List[Tuple[str, Union[str, Dict]]]) -> List[Tuple[str, Union[str, Dict], Optional[List]]]:
+        """塊の議事録に埋め込みによる分類結果を添える（分類器がなければNone、分類は塊の全項目で1回）"""
+        if not self.semantic:
+            return [(key, minutes, None) for key, minutes in chunk]
+        parsed = [(key, json.loads(minutes) if isinstance(minutes, str) else minutes) for key, minutes in chunk]
+        counts = [sum(1 for _ in _iter_items(minutes)) for _, minutes in parsed]
+        contents = [item.get("content", "") for _, minutes in parsed for _, item in _iter_items(minutes)]
+        semantic_tags = self.semantic.classify(contents, self._taxonomy()) if contents else []
+        bounds = list(accumulate([0] + counts))
+        return [(key, minutes, semantic_tags[bounds[i]:bounds[i + 1]]) for i, (key, minutes) in enumerate(parsed)]
+    
+    def _tag_chunk(self, chunk: List[Tuple[str, Union[str, Dict], Optional[List]]]) -> List[Tuple[str, Dict]]:
+        """塊の議事録をタグ付け（JSON文字列はここで読み込む）"""
+        return [
+            (key, self._tag_minutes(json.loads(minutes) if isinstance(minutes, str) else minutes, semantic_tags))
+            for key, minutes, semantic_tags in chunk
+        ]
+    
+    def _save_progress(self, progress: "_TaggingCheckpoint"):
+        """索引を保存してから、チェックポイントに書き込み済みの会議を記録"""
+        if self.index is not None:
+            self.index.save()
+        progress.flush()
+    
     def _generate_tag_summary(self, minutes: Dict) -> Dict:
         """議事録全体のタグサマリーを生成"""
         all_categories = []
@@ -272,6 +534,8 @@ class SmartTagger:
         """
         タグに基づいて議事録を検索
         
+        リストを毎回走査するため、蓄積した議事録の検索には索引（self.index.search）を使う。
+        
         Args:
             minutes_list: 議事録のリスト
             search_criteria: 検索条件
@@ -314,6 +578,28 @@ class SmartTagger:
         
         return True
 
+def iter_minutes_files(paths: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    議事録のJSONファイル（SmartTagger.tag_many の入力、ディレクトリは直下の *.json を名前順に）
+
+    Args:
+        paths: ファイルまたはディレクトリのパス
+
+    Returns:
+        (ファイルパス, JSON文字列) の反復
+    """
+    for path in map(Path, paths):
+        for file_path in sorted(path.glob("*.json")) if path.is_dir() else [path]:
+            yield str(file_path), file_path.read_text(encoding='utf-8')
+
+def write_minutes_files(batch: List[Tuple[str, Dict]]):
+    """タグ付けした議事録をJSONファイルに書き戻す（SmartTagger.tag_many の書き込み先、一時ファイルから置き換え）"""
+    for file_path, minutes in batch:
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(minutes, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, file_path)
+
 def main():
     """テスト実行"""
     tagger = SmartTagger()
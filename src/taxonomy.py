@@ -0,0 +1,164 @@
+"""
+タクソノミーファイル
+タグ・議事録・簡易版アプリのキーワードを1つのJSONファイルから読み込み、変更を検出して再読み込みする
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 既定のタクソノミーファイル（src/taxonomy.json）
+DEFAULT_TAXONOMY_PATH = Path(__file__).with_name("taxonomy.json")
+
+T = TypeVar("T")
+
+class TaxonomyFile:
+    def __init__(self, path: Optional[str] = None, cache_dir: Optional[str] = "data/taxonomy_cache",
+                 check_interval: float = 1.0):
+        """
+        タクソノミーファイルを初期化（最初の参照で読み込む）
+
+        ファイルの更新時刻とサイズを check_interval 秒に1回だけ確認し、変わっていれば読み直す。
+        内容のハッシュ（version）が変わらなければ、読み直しても利用側のキャッシュは無効にならない。
+        オートマトンなどの構築結果は cached で (ハッシュ, 名前) をキーにディスクに保存し、
+        ファイルが変わるまで再構築しない。
+
+        Args:
+            path: タクソノミーファイルのパス（Noneで DEFAULT_TAXONOMY_PATH）
+            cache_dir: 構築結果のキャッシュディレクトリ（Noneでディスクに保存しない）
+            check_interval: ファイルの変更を確認する間隔（秒、0で参照のたびに確認）
+        """
+        self.path = Path(path) if path else DEFAULT_TAXONOMY_PATH
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {}
+        self._version = ""
+        self._stat: Optional[tuple] = None
+        self._checked_at = float("-inf")
+        # 構築結果（名前 -> (ハッシュ, 構築結果)）
+        self._built: Dict[str, tuple] = {}
+
+    @property
+    def version(self) -> str:
+        """ファイルの内容のSHA-256（変更の検出・キャッシュのキー）"""
+        self._reload_if_changed()
+        return self._version
+
+    def section(self, name: str) -> Dict[str, Any]:
+        """
+        タクソノミーの節（"tagger", "minutes", "quick_analysis" など）
+
+        Args:
+            name: 節の名前
+
+        Returns:
+            節の辞書（ない場合は空の辞書）
+        """
+        self._reload_if_changed()
+        return self._data.get(name, {})
+
+    def cached(self, name: str, build: Callable[[], T]) -> T:
+        """
+        現在のファイルの内容から構築した結果（メモリ・ディスクのキャッシュがあれば再利用）
+
+        Args:
+            name: 構築結果の名前（ファイル名の一部）
+            build: 構築する関数（結果はpickle可能なもの）
+
+        Returns:
+            構築結果
+        """
+        version = self.version
+        built = self._built.get(name)
+        if built is not None and built[0] == version:
+            return built[1]
+
+        result = self._read_cache(name, version)
+        if result is None:
+            result = build()
+            self._write_cache(name, version, result)
+        self._built[name] = (version, result)
+        return result
+
+    def _reload_if_changed(self):
+        """確認間隔を過ぎていれば、ファイルの更新時刻・サイズを確認して変わっていれば読み直す"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except OSError as e:
+                if not self._version:
+                    raise
+                logger.warning(f"Taxonomy file is unavailable, keeping the loaded taxonomy: {e}")
+                return
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+            if stat_key == self._stat:
+                return
+
+            raw = self.path.read_bytes()
+            version = hashlib.sha256(raw).hexdigest()
+            if version != self._version:
+                try:
+                    data = json.loads(raw.decode('utf-8'))
+                except ValueError as e:
+                    if not self._version:
+                        raise
+                    # 編集途中の不正なJSONでは読み込み済みのタクソノミーを使い続ける（次の変更まで読み直さない）
+                    logger.warning(f"Invalid taxonomy file {self.path}, keeping the loaded taxonomy: {e}")
+                    self._stat = stat_key
+                    return
+                self._data, self._version = data, version
+                logger.info(f"Loaded taxonomy from {self.path} ({version[:12]})")
+            self._stat = stat_key
+
+    def _cache_path(self, name: str, version: str) -> Path:
+        """構築結果のキャッシュファイルのパス"""
+        return self.cache_dir / f"{name}.{version[:16]}.pkl"
+
+    def _read_cache(self, name: str, version: str) -> Optional[Any]:
+        """構築結果をディスクキャッシュから読み込む"""
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_path(name, version), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def _write_cache(self, name: str, version: str, result: Any):
+        """構築結果をディスクキャッシュに保存（同じ名前の古い版は削除）"""
+        if self.cache_dir is None:
+            return
+        cache_path = self._cache_path(name, version)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+            for old_path in self.cache_dir.glob(f"{name}.*.pkl"):
+                if old_path != cache_path:
+                    old_path.unlink()
+        except OSError as e:
+            logger.warning(f"Failed to write taxonomy cache {cache_path}: {e}")
+
+@lru_cache(maxsize=None)
+def default_taxonomy() -> TaxonomyFile:
+    """既定のタクソノミーファイル（プロセス内で共有）"""
+    return TaxonomyFile()
@@ -4,97 +4,417 @@
 """
 
 import pdfplumber
-import re
+import hashlib
+import os
+import sys
 import json
+import time
+from dataclasses import asdict
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Iterator, Tuple, Optional
 import logging
 
+from .extraction_engine import ExtractionEngine
+from .glossary_tables import GlossaryTableExtractor
+from .text_cache import PageTextCache
+
 logger = logging.getLogger(__name__)
 
+# 術語 -> [出現回数, 出現ページ番号（1始まり）のリスト]
+TermOccurrences = Dict[str, List]
+
+# (出現情報, 用語集テーブルの行（GlossaryEntryの辞書）のリスト)
+ExtractionResult = Tuple[TermOccurrences, List[Dict]]
+
+class FailedExtraction(dict):
+    """抽出に失敗した（タイムアウト・異常終了・読み込みエラー）ファイルの出現情報（空）"""
+
+def extraction_failed(occurrences: TermOccurrences) -> bool:
+    """出現情報が抽出の失敗を表すか（マニフェストに記録せず、次回の走査で再解析させる）"""
+    return isinstance(occurrences, FailedExtraction)
+
+def _extract_task(extractor: "TermExtractor", pdf_path: str, start: int, end: Optional[int]) -> ExtractionResult:
+    """プロセスプールのワーカーで実行する抽出タスク（ファイル全体またはページ範囲）"""
+    return extractor._extract_pages(pdf_path, start, end)
+
+def _merge_occurrences(target: TermOccurrences, source: TermOccurrences):
+    """ページ範囲ごとの出現情報を統合"""
+    for term, (count, pages) in source.items():
+        entry = target.setdefault(term, [0, []])
+        entry[0] += count
+        entry[1].extend(pages)
+
+def _merge_results(target: ExtractionResult, source: ExtractionResult):
+    """ページ範囲ごとの抽出結果を統合"""
+    _merge_occurrences(target[0], source[0])
+    target[1].extend(source[1])
+
 class TermExtractor:
-    def __init__(self):
-        # 建筑专业术语的常见模式
-        self.term_patterns = [
-            r'[A-Z]{2,}',  # 大写缩写 (RC, PC等)
-            r'[\u4e00-\u9faf]{2,}工事',  # XX工事
-            r'[\u4e00-\u9faf]{2,}材料',  # XX材料
-            r'[\u4e00-\u9faf]{2,}構造',  # XX構造
-            r'[\u4e00-\u9faf]{2,}設備',  # XX設備
-            r'[\u4e00-\u9faf]{2,}管理',  # XX管理
-            r'コンクリート[^\s]*',  # コンクリート関連
-            r'鉄筋[^\s]*',  # 鉄筋関連
-            r'基礎[^\s]*',  # 基礎関連
-            r'施工[^\s]*',  # 施工関連
-        ]
-        
-        # 除外する一般的な単語
-        self.exclude_words = {
-            '工事', '材料', '構造', '設備', '管理', '施工', '基礎',
-            'について', 'により', 'による', 'として', 'までに',
-            'ページ', '図面', '参照', '以下', '以上', '記載',
-        }
+    # 抽出結果の形式のバージョン（変更時はマニフェストの記録を再抽出させる）
+    OUTPUT_VERSION = 2
+    
+    def __init__(self, text_cache: Optional[PageTextCache] = None, max_rss_mb: Optional[float] = None,
+                 glossary_tables: bool = False):
+        """
+        術語抽出器を初期化
+        
+        Args:
+            text_cache: ページテキストキャッシュ（指定時はPDFの再解析を省略）
+            max_rss_mb: 抽出中の常駐メモリの上限（MB）。指定時は上限を超えるとPDFを開き直し、
+                並列抽出ではワーカープロセスをタスクごとに作り直す
+            glossary_tables: 用語集テーブルを検出して行ごとに取り込む（そのページはパターン照合しない）。
+                ページごとの判定結果はページテキストと同じキャッシュ・メモリ上限付きの読み込みを使う
+        """
+        self.max_rss_mb = max_rss_mb
+        self.glossary_extractor = GlossaryTableExtractor() if glossary_tables else None
+        
+        # 一般的な術語パターン（パターン表は src/term_patterns.py で共有）
+        backend_options = {"max_rss_mb": max_rss_mb} if max_rss_mb else None
+        self.engine = ExtractionEngine("general", "pdfplumber", text_cache, backend_options)
+        self.text_cache = text_cache
+        self.term_patterns = self.engine.pattern_set.patterns["術語"]
+        self.exclude_words = self.engine.pattern_set.exclude_words
+        
+        # 並列抽出の設定（この容量以上のPDFはページ範囲に分割して処理）
+        self.large_pdf_bytes = 20 * 1024 * 1024
+        self.pages_per_task = 50
     
     def extract_from_pdf(self, pdf_path: str) -> Set[str]:
         """PDFから専門術語を抽出"""
-        terms = set()
+        return set(self.extract_occurrences(pdf_path))
+    
+    def extract_occurrences(self, pdf_path: str) -> TermOccurrences:
+        """
+        PDFから専門術語とその出現回数・出現ページを抽出
         
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        page_terms = self._extract_terms_from_text(text)
-                        terms.update(page_terms)
+        Args:
+            pdf_path: PDFファイルパス
+            
+        Returns:
+            術語 -> [出現回数, 出現ページのリスト]（読み込めない場合は空）
+        """
+        return self.extract_with_glossary(pdf_path)[0]
+    
+    def extract_with_glossary(self, pdf_path: str) -> ExtractionResult:
+        """
+        PDFから専門術語の出現情報と用語集テーブルの行を抽出
+        
+        Args:
+            pdf_path: PDFファイルパス
             
-            logger.info(f"Extracted {len(terms)} terms from {pdf_path}")
-            return terms
+        Returns:
+            (術語 -> [出現回数, 出現ページのリスト], 用語集の行)
+            （読み込めない場合は空の FailedExtraction と空のリスト）
+        """
+        try:
+            result = self._extract_pages(pdf_path)
+            logger.info(f"Extracted {len(result[0])} terms ({len(result[1])} glossary rows) from {pdf_path}")
+            return result
             
         except Exception as e:
             logger.error(f"Error extracting from {pdf_path}: {e}")
-            return set()
+            return FailedExtraction(), []
+    
+    def _extract_pages(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> ExtractionResult:
+        """
+        PDFの指定ページ範囲から専門術語を抽出
+        
+        Args:
+            pdf_path: PDFファイルパス
+            start: 開始ページ（0始まり）
+            end: 終了ページ（このページを含まない、Noneで最終ページまで）
+            
+        Returns:
+            (術語 -> [出現回数, 出現ページのリスト], 用語集の行)
+        """
+        occurrences = {}
+        glossary = []
+        
+        def add(term, page):
+            entry = occurrences.setdefault(term, [0, []])
+            entry[0] += 1
+            if not entry[1] or entry[1][-1] != page:
+                entry[1].append(page)
+        
+        if self.glossary_extractor is None:
+            for hit in self.engine.extract_pages(pdf_path, start, end):
+                add(hit.term, hit.page)
+            return occurrences, glossary
+        
+        # 用語集ページは表の行をそのまま術語とし、それ以外のページのみパターン照合する
+        for page_num, entries, text in self.glossary_extractor.iter_pdf_pages(pdf_path, start, end, self.engine):
+            if entries is None:
+                for hit in self.engine.extract_text(text, pdf_path, page_num):
+                    add(hit.term, hit.page)
+                continue
+            for entry in entries:
+                add(entry.term, page_num)
+                glossary.append(asdict(entry))
+        
+        return occurrences, glossary
+    
+    def iter_page_texts(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """
+        PDFのページテキストを順に取得（キャッシュがあればPDFは解析しない）
+        
+        Args:
+            pdf_path: PDFファイルパス
+            start: 開始ページ（0始まり）
+            end: 終了ページ（このページを含まない、Noneで最終ページまで）
+            
+        Yields:
+            ページテキスト
+        """
+        yield from self.engine.iter_page_texts(pdf_path, start, end)
+    
+    def pattern_fingerprint(self) -> str:
+        """抽出パターンと除外語のハッシュ（変更時に抽出結果を無効化するため）"""
+        config = f"{self.engine.fingerprint()}:{self.OUTPUT_VERSION}"
+        if self.glossary_extractor is not None:
+            config += f":glossary:{self.glossary_extractor.fingerprint()}"
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
     
     def _extract_terms_from_text(self, text: str) -> Set[str]:
         """テキストから専門術語を抽出"""
-        terms = set()
-        
-        # パターンマッチングで術語を抽出
-        for pattern in self.term_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                # クリーニング
-                term = self._clean_term(match)
-                if self._is_valid_term(term):
-                    terms.add(term)
-        
-        return terms
-    
-    def _clean_term(self, term: str) -> str:
-        """術語をクリーニング"""
-        # 前後の空白や記号を除去
-        term = re.sub(r'^[^\w\u4e00-\u9faf]+|[^\w\u4e00-\u9faf]+$', '', term)
-        return term.strip()
-    
-    def _is_valid_term(self, term: str) -> bool:
-        """有効な術語かチェック"""
-        if len(term) < 2:
-            return False
-        if term in self.exclude_words:
-            return False
-        if re.match(r'^\d+$', term):  # 数字のみは除外
-            return False
-        return True
-    
-    def extract_from_directory(self, pdf_dir: str) -> Dict[str, List[str]]:
-        """ディレクトリ内の全PDFから術語を抽出"""
-        pdf_dir = Path(pdf_dir)
-        all_terms = {}
-        
-        for pdf_file in pdf_dir.glob("**/*.pdf"):
-            terms = self.extract_from_pdf(str(pdf_file))
-            all_terms[str(pdf_file)] = list(terms)
-        
-        return all_terms
+        return set(self._count_terms_in_text(text))
+    
+    def _count_terms_in_text(self, text: str) -> Counter:
+        """テキスト中の専門術語の出現回数を数える（パターン間の重複は数えない）"""
+        return self.engine.count_terms(text)["術語"]
+    
+    def extract_from_directory(self, pdf_dir: str, workers: int = 1,
+                               timeout: Optional[float] = 600.0) -> Dict[str, List[str]]:
+        """
+        ディレクトリ内の全PDFから術語を抽出
+        
+        Args:
+            pdf_dir: PDFディレクトリ
+            workers: ワーカープロセス数（1で逐次処理、Noneでコア数）
+            timeout: 1タスク（ファイルまたはページ範囲）あたりのタイムアウト秒数
+            
+        Returns:
+            ファイルパス別の術語リスト（パス順・術語順にソート済み）
+        """
+        all_terms = dict(self.iter_extract_directory(pdf_dir, workers, timeout))
+        return {path: all_terms[path] for path in sorted(all_terms)}
+    
+    def iter_extract_directory(self, pdf_dir: str, workers: int = 1,
+                               timeout: Optional[float] = 600.0) -> Iterator[Tuple[str, List[str]]]:
+        """
+        ディレクトリ内の全PDFから術語を抽出し、完了したファイルから順に返す
+        
+        大きなPDFはページ範囲ごとのタスクに分割され、全範囲の完了後にまとめて返される。
+        タイムアウトしたファイルや読み込めないファイルは空リストを返す
+        （iter_extract_with_glossary では extraction_failed で判別できる）。
+        
+        Args:
+            pdf_dir: PDFディレクトリ
+            workers: ワーカープロセス数（1で逐次処理、Noneでコア数）
+            timeout: 1タスクあたりのタイムアウト秒数（並列時のみ有効）
+            
+        Yields:
+            (ファイルパス, ソート済み術語リスト)
+        """
+        pdf_files = sorted(str(p) for p in Path(pdf_dir).glob("**/*.pdf"))
+        yield from self.iter_extract_files(pdf_files, workers, timeout)
+    
+    def iter_extract_files(self, pdf_files: List[str], workers: int = 1,
+                           timeout: Optional[float] = 600.0) -> Iterator[Tuple[str, List[str]]]:
+        """
+        指定したPDFファイル群から術語を抽出し、完了したファイルから順に返す
+        
+        Args:
+            pdf_files: PDFファイルパスのリスト
+            workers: ワーカープロセス数（1で逐次処理、Noneでコア数）
+            timeout: 1タスクあたりのタイムアウト秒数（並列時のみ有効）
+            
+        Yields:
+            (ファイルパス, ソート済み術語リスト)
+        """
+        for pdf_file, occurrences in self.iter_extract_occurrences(pdf_files, workers, timeout):
+            yield pdf_file, sorted(occurrences)
+    
+    def iter_extract_occurrences(self, pdf_files: List[str], workers: int = 1,
+                                 timeout: Optional[float] = 600.0) -> Iterator[Tuple[str, TermOccurrences]]:
+        """
+        指定したPDFファイル群から術語の出現情報を抽出し、完了したファイルから順に返す
+        
+        Args:
+            pdf_files: PDFファイルパスのリスト
+            workers: ワーカープロセス数（1で逐次処理、Noneでコア数）
+            timeout: 1タスクあたりのタイムアウト秒数（並列時のみ有効）
+            
+        Yields:
+            (ファイルパス, 術語 -> [出現回数, 出現ページのリスト])
+        """
+        for pdf_file, occurrences, _ in self.iter_extract_with_glossary(pdf_files, workers, timeout):
+            yield pdf_file, occurrences
+    
+    def iter_extract_with_glossary(self, pdf_files: List[str], workers: int = 1,
+                                   timeout: Optional[float] = 600.0) -> Iterator[Tuple[str, TermOccurrences, List[Dict]]]:
+        """
+        指定したPDFファイル群から術語の出現情報と用語集の行を抽出し、完了したファイルから順に返す
+        
+        Args:
+            pdf_files: PDFファイルパスのリスト
+            workers: ワーカープロセス数（1で逐次処理、Noneでコア数）
+            timeout: 1タスクあたりのタイムアウト秒数（並列時のみ有効）
+            
+        Yields:
+            (ファイルパス, 術語 -> [出現回数, 出現ページのリスト], 用語集の行)
+            （抽出に失敗したファイルの出現情報は空の FailedExtraction）
+        """
+        workers = workers or os.cpu_count() or 1
+        
+        if workers <= 1:
+            for pdf_file in pdf_files:
+                yield (pdf_file, *self.extract_with_glossary(pdf_file))
+            return
+        
+        yield from self._iter_extract_parallel(pdf_files, workers, timeout)
+    
+    def _plan_tasks(self, pdf_files: List[str]) -> List[Tuple[str, int, Optional[int]]]:
+        """PDFファイルを抽出タスク（パス, 開始ページ, 終了ページ）に分割"""
+        tasks = []
+        for pdf_file in pdf_files:
+            page_count = None
+            try:
+                if os.path.getsize(pdf_file) >= self.large_pdf_bytes:
+                    with pdfplumber.open(pdf_file) as pdf:
+                        page_count = len(pdf.pages)
+            except Exception as e:
+                logger.warning(f"Could not count pages of {pdf_file}: {e}")
+            
+            if not page_count or page_count <= self.pages_per_task:
+                tasks.append((pdf_file, 0, None))
+                continue
+            
+            for start in range(0, page_count, self.pages_per_task):
+                tasks.append((pdf_file, start, min(start + self.pages_per_task, page_count)))
+        
+        return tasks
+    
+    def _iter_extract_parallel(self, pdf_files: List[str], workers: int,
+                               timeout: Optional[float]) -> Iterator[Tuple[str, TermOccurrences, List[Dict]]]:
+        """プロセスプールでPDFを並列抽出"""
+        tasks = deque(self._plan_tasks(pdf_files))
+        pending = {}
+        for pdf_file, _, _ in tasks:
+            pending[pdf_file] = pending.get(pdf_file, 0) + 1
+        partial = {pdf_file: ({}, []) for pdf_file in pending}
+        
+        # 実行中タスク数をワーカー数以下に抑え、投入時刻をそのまま開始時刻とみなす
+        running = {}
+        retried = set()
+        executor = self._new_executor(workers)
+        
+        def finish(pdf_file):
+            del pending[pdf_file]
+            occurrences, glossary = partial.pop(pdf_file)
+            for _, pages in occurrences.values():
+                pages.sort()
+            glossary.sort(key=lambda entry: entry["page"])
+            return pdf_file, occurrences, glossary
+        
+        try:
+            while tasks or running:
+                # 異常終了後の再試行タスクは他のタスクと同時に実行しない
+                while tasks and len(running) < workers:
+                    if any(task in retried for task, _ in running.values()):
+                        break
+                    if tasks[0] in retried and running:
+                        break
+                    task = tasks.popleft()
+                    if task[0] not in pending:
+                        continue
+                    try:
+                        future = executor.submit(_extract_task, self, *task)
+                    except BrokenProcessPool:
+                        tasks.appendleft(task)
+                        self._terminate_executor(executor)
+                        executor = self._new_executor(workers)
+                        continue
+                    running[future] = (task, time.monotonic())
+                
+                if not running:
+                    continue
+                
+                wait_time = None
+                if timeout is not None:
+                    oldest = min(started for _, started in running.values())
+                    wait_time = max(0.0, oldest + timeout - time.monotonic())
+                done, _ = wait(running, timeout=wait_time, return_when=FIRST_COMPLETED)
+                
+                broken = False
+                for future in done:
+                    task, _ = running.pop(future)
+                    pdf_file, start, end = task
+                    if pdf_file not in pending:
+                        continue
+                    try:
+                        _merge_results(partial[pdf_file], future.result())
+                    except BrokenProcessPool:
+                        # ワーカーが異常終了した場合はどのタスクが原因か特定できないため一度だけ再試行する
+                        broken = True
+                        if task in retried:
+                            logger.error(f"Worker crashed while extracting from {pdf_file}")
+                            partial[pdf_file] = (FailedExtraction(), [])
+                            yield finish(pdf_file)
+                        else:
+                            retried.add(task)
+                            tasks.appendleft(task)
+                        continue
+                    except Exception as e:
+                        logger.error(f"Error extracting from {pdf_file} (pages {start}-{end}): {e}")
+                        partial[pdf_file] = (FailedExtraction(), [])
+                        yield finish(pdf_file)
+                        continue
+                    
+                    pending[pdf_file] -= 1
+                    if pending[pdf_file] == 0:
+                        logger.info(f"Extracted {len(partial[pdf_file][0])} terms from {pdf_file}")
+                        yield finish(pdf_file)
+                
+                expired = []
+                if timeout is not None:
+                    now = time.monotonic()
+                    expired = [future for future, (_, started) in running.items()
+                               if not future.done() and now - started >= timeout]
+                
+                for future in expired:
+                    (pdf_file, _, _), _ = running.pop(future)
+                    if pdf_file in pending:
+                        logger.error(f"Timed out extracting from {pdf_file} after {timeout}s")
+                        partial[pdf_file] = (FailedExtraction(), [])
+                        yield finish(pdf_file)
+                
+                if broken or expired:
+                    # 実行中のタスクは個別に停止できないため、プールごと作り直して残りを再投入する
+                    tasks.extendleft(reversed([task for task, _ in running.values()]))
+                    running = {}
+                    self._terminate_executor(executor)
+                    executor = self._new_executor(workers)
+        finally:
+            self._terminate_executor(executor)
+    
+    def _new_executor(self, workers: int) -> ProcessPoolExecutor:
+        """ワーカープロセスのプールを作成（メモリ上限の指定時はタスクごとにワーカーを作り直す）"""
+        # max_tasks_per_child はPython 3.11以降（それ以前はワーカー内でPDFを開き直して上限を守る）
+        if self.max_rss_mb and sys.version_info >= (3, 11):
+            return ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1)
+        return ProcessPoolExecutor(max_workers=workers)
+    
+    @staticmethod
+    def _terminate_executor(executor: ProcessPoolExecutor):
+        """ワーカープロセスを強制終了してプールを破棄"""
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
     
     def save_terms_to_json(self, terms_dict: Dict[str, List[str]], output_path: str):
         """術語辞書をJSONファイルに保存"""
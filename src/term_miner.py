@@ -0,0 +1,295 @@
+"""
+統計的術語抽出
+コーパス全体の複合名詞候補をC-value / TF-IDFで評価し、パターンにない術語を見つける
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Sequence, Tuple
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import MeCab
+except ImportError:
+    MeCab = None
+
+# 術語を構成しうる文字（漢字・々・カタカナ・長音・英数字（全角含む））のコードポイント範囲
+_TERM_CHAR_RANGES = [
+    (0x4E00, 0x9FAF), (0x3005, 0x3005), (0x30A1, 0x30F6), (0x30FC, 0x30FC),
+    (0x30, 0x39), (0x41, 0x5A), (0x61, 0x7A),
+    (0xFF10, 0xFF19), (0xFF21, 0xFF3A), (0xFF41, 0xFF5A),
+]
+
+def _term_char_mask(codes: np.ndarray) -> np.ndarray:
+    """各文字が術語を構成しうる文字かどうか"""
+    mask = np.zeros(len(codes), dtype=bool)
+    for low, high in _TERM_CHAR_RANGES:
+        mask |= (codes >= low) & (codes <= high)
+    return mask
+
+@dataclass
+class MinedTerm:
+    """統計的に抽出された術語候補"""
+    term: str
+    frequency: int
+    doc_freq: int
+    c_value: float
+    tfidf: float
+
+class TermMiner:
+    def __init__(self, method: str = "auto", min_units: int = 2, max_units: int = 10,
+                 min_freq: int = 3, chunk_chars: int = 500_000, max_vocab: int = 2_000_000):
+        """
+        統計的術語抽出器を初期化
+
+        候補はMeCabの名詞連続（method="mecab"）または文字n-gram（method="ngram"）。
+        文書はchunk_chars文字ごとにまとめて疎行列（文書 x 候補）で数え、
+        候補ごとの出現回数と文書頻度だけを累積するため、メモリは候補数に比例する。
+
+        Args:
+            method: "mecab", "ngram", または "auto"（MeCabがあればmecab）
+            min_units: 候補の最小単位数（mecabは形態素数、ngramは文字数）
+            max_units: 候補の最大単位数
+            min_freq: 評価対象とする最小出現回数
+            chunk_chars: 1チャンクあたりの文字数
+            max_vocab: 候補数の上限（超えたら低頻度の候補を切り捨てる）
+        """
+        if method == "auto":
+            method = "mecab" if MeCab is not None else "ngram"
+        if method == "mecab" and MeCab is None:
+            raise ImportError("MeCab is not installed (pip install mecab-python3)")
+        if method not in ("mecab", "ngram"):
+            raise ValueError(f"Unknown method: {method}")
+
+        self.method = method
+        self.min_units = min_units
+        self.max_units = max_units
+        self.min_freq = min_freq
+        self.chunk_chars = chunk_chars
+        self.max_vocab = max_vocab
+        self._tagger = MeCab.Tagger() if method == "mecab" else None
+
+        self.vocab: Dict[Hashable, int] = {}
+        self._keys: List[Hashable] = []
+        self.freq = np.zeros(0, dtype=np.int64)
+        self.doc_freq = np.zeros(0, dtype=np.int64)
+        self.num_docs = 0
+        self.pruned = 0
+
+    def add_documents(self, documents: Iterable[str]):
+        """
+        文書（ページテキストなど）を数える
+
+        Args:
+            documents: 文書テキストのイテレータ（順に読み込み、チャンクごとに破棄）
+        """
+        chunk: List[str] = []
+        chunk_size = 0
+        for text in documents:
+            chunk.append(text or "")
+            chunk_size += len(text or "")
+            if chunk_size >= self.chunk_chars:
+                self._count_chunk(chunk)
+                chunk, chunk_size = [], 0
+        if chunk:
+            self._count_chunk(chunk)
+
+    def mine(self, documents: Iterable[str], top_n: int = 500) -> List[MinedTerm]:
+        """
+        文書群から術語候補を抽出
+
+        Args:
+            documents: 文書テキストのイテレータ
+            top_n: 返す候補数
+
+        Returns:
+            C-value順（同値はTF-IDF順）の術語候補
+        """
+        self.add_documents(documents)
+        return self.top_terms(top_n)
+
+    def _count_chunk(self, docs: List[str]):
+        """チャンク内の候補を疎行列で数え、出現回数と文書頻度に加算"""
+        if self.method == "mecab":
+            rows, cols = self._candidate_ids_mecab(docs)
+        else:
+            rows, cols = self._candidate_ids_ngram(docs)
+
+        # 同じ (文書, 候補) の重複はCSR変換時に合算される
+        counts = sparse.coo_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+            shape=(len(docs), len(self._keys))
+        ).tocsr()
+
+        self._grow(len(self._keys))
+        self.freq += np.asarray(counts.sum(axis=0)).ravel()
+        self.doc_freq += counts.getnnz(axis=0)
+        self.num_docs += len(docs)
+
+        if len(self._keys) > self.max_vocab:
+            self._prune(self.max_vocab // 2)
+
+    def _candidate_ids_ngram(self, docs: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """文字n-gram候補の (文書番号, 候補ID) 配列"""
+        # 文書を改行で連結（改行は術語文字でないため、n-gramが文書をまたぐことはない）
+        text = "\n".join(docs)
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        doc_starts = np.cumsum([0] + [len(doc) + 1 for doc in docs[:-1]])
+
+        # 各位置から続く術語文字の連続長
+        positions = np.arange(len(codes))
+        breaks = np.append(np.nonzero(~_term_char_mask(codes))[0], len(codes))
+        run_length = breaks[np.searchsorted(breaks, positions)] - positions
+
+        rows, cols = [], []
+        for n in range(self.min_units, self.max_units + 1):
+            starts = np.nonzero(run_length >= n)[0]
+            if len(starts) == 0:
+                break
+            # n文字分のコードポイントを1つのバイト列キーとして扱う
+            windows = np.ascontiguousarray(sliding_window_view(codes, n)[starts])
+            keys = windows.view(np.dtype((np.void, 4 * n))).ravel()
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            ids = self._lookup_ids(key.tobytes() for key in unique_keys)
+            rows.append(np.searchsorted(doc_starts, starts, side="right") - 1)
+            cols.append(ids[inverse.ravel()])
+
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def _candidate_ids_mecab(self, docs: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """名詞連続候補の (文書番号, 候補ID) 配列"""
+        rows, keys = [], []
+        for doc_index, text in enumerate(docs):
+            for nouns in self._noun_sequences(text):
+                for length in range(self.min_units, min(len(nouns), self.max_units) + 1):
+                    for start in range(len(nouns) - length + 1):
+                        rows.append(doc_index)
+                        keys.append(nouns[start:start + length])
+        return np.array(rows, dtype=np.int64), self._lookup_ids(keys)
+
+    def _noun_sequences(self, text: str) -> Iterable[Tuple[str, ...]]:
+        """MeCabで連続する名詞の列を取得"""
+        nouns = []
+        node = self._tagger.parseToNode(text)
+        while node:
+            if node.surface and node.feature.startswith("名詞"):
+                nouns.append(node.surface)
+            elif nouns:
+                yield tuple(nouns)
+                nouns = []
+            node = node.next
+        if nouns:
+            yield tuple(nouns)
+
+    def _lookup_ids(self, keys: Iterable[Hashable]) -> np.ndarray:
+        """候補キーのIDを取得（未登録なら追加）"""
+        vocab, all_keys = self.vocab, self._keys
+        ids = []
+        for key in keys:
+            term_id = vocab.get(key)
+            if term_id is None:
+                term_id = vocab[key] = len(all_keys)
+                all_keys.append(key)
+            ids.append(term_id)
+        return np.array(ids, dtype=np.int64)
+
+    def _grow(self, size: int):
+        if size > len(self.freq):
+            self.freq = np.concatenate([self.freq, np.zeros(size - len(self.freq), dtype=np.int64)])
+            self.doc_freq = np.concatenate([self.doc_freq, np.zeros(size - len(self.doc_freq), dtype=np.int64)])
+
+    def _prune(self, keep_count: int):
+        """
+        低頻度の候補を切り捨てて候補数を抑える
+
+        切り捨てた候補が後のチャンクで再び現れた場合は0から数え直すため、
+        その出現回数は過小評価になる（上位の候補にはほぼ影響しない）。
+        """
+        keep = np.sort(np.argpartition(-self.freq, keep_count)[:keep_count])
+        self.pruned += len(self._keys) - len(keep)
+        self._keys = [self._keys[i] for i in keep]
+        self.vocab = {key: i for i, key in enumerate(self._keys)}
+        self.freq = self.freq[keep]
+        self.doc_freq = self.doc_freq[keep]
+        logger.info(f"Pruned term candidates to {len(self._keys)} (total pruned: {self.pruned})")
+
+    def _units(self, key: Hashable) -> Sequence[str]:
+        """候補キーを単位（文字または形態素）の列に変換"""
+        return key.decode("utf-32-le") if self.method == "ngram" else key
+
+    def top_terms(self, top_n: int = 500) -> List[MinedTerm]:
+        """
+        数え終えた候補をC-value / TF-IDFで評価
+
+        C-value(a) = log2|a| * (f(a) - 候補aを含むより長い候補の平均出現回数)
+        TF-IDF(a) = f(a) * (log((1 + N) / (1 + df(a))) + 1)
+
+        出現回数が候補aを含むより長い候補と同じ候補（「鉄筋コンクリート」に対する「筋コンクリート」など、
+        常に長い候補の一部として現れる断片）は、極大な候補ではないため除く。
+
+        Args:
+            top_n: 返す候補数
+
+        Returns:
+            C-value順（同値はTF-IDF順）の術語候補
+        """
+        candidates = np.nonzero(self.freq >= self.min_freq)[0]
+        if len(candidates) == 0:
+            return []
+
+        units = [self._units(self._keys[i]) for i in candidates]
+        index = {unit: j for j, unit in enumerate(units)}
+        freq = self.freq[candidates].astype(np.float64)
+        doc_freq = self.doc_freq[candidates]
+        lengths = np.array([len(unit) for unit in units], dtype=np.float64)
+
+        # nested[b, a] = 1: 候補aは候補bの一部
+        rows, cols = [], []
+        for j, unit in enumerate(units):
+            for length in range(self.min_units, len(unit)):
+                for start in range(len(unit) - length + 1):
+                    k = index.get(unit[start:start + length])
+                    if k is not None:
+                        rows.append(j)
+                        cols.append(k)
+        nested = sparse.coo_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(units), len(units))
+        ).tocsr()
+        nested.data[:] = 1
+
+        # 候補aを含む候補の最大出現回数（aと同じなら、aは常にその候補の一部として現れる）
+        containing_max = nested.multiply(freq[:, None]).max(axis=0).toarray().ravel()
+        maximal = containing_max < freq
+
+        containing_count = nested.getnnz(axis=0)
+        containing_freq = nested.T @ freq
+        nested_mean = np.divide(containing_freq, containing_count,
+                                out=np.zeros_like(freq), where=containing_count > 0)
+        c_value = np.log2(lengths) * (freq - nested_mean)
+        tfidf = freq * (np.log((1 + self.num_docs) / (1 + doc_freq)) + 1)
+
+        results = []
+        for j in np.lexsort((-tfidf, -c_value)):
+            if c_value[j] <= 0 or len(results) >= top_n:
+                break
+            term = "".join(units[j])
+            if not maximal[j] or term.isdigit():
+                continue
+            results.append(MinedTerm(
+                term=term,
+                frequency=int(self.freq[candidates[j]]),
+                doc_freq=int(doc_freq[j]),
+                c_value=float(c_value[j]),
+                tfidf=float(tfidf[j])
+            ))
+
+        logger.info(f"Mined {len(results)} terms from {len(candidates)} candidates "
+                    f"({self.num_docs} documents)")
+        return results
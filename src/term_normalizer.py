@@ -0,0 +1,72 @@
+"""
+術語の正規化
+全角/半角・長音記号・英字の大文字小文字の違いを吸収し、表記ゆれを1つの術語IDにまとめる
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List
+
+# カタカナの直後にあるダッシュ類は長音記号とみなす（NFKC後の文字）
+_LONG_VOWEL_RE = re.compile(r'(?<=[ァ-ヺ])[\-‐‑‒–—―−~〜]')
+_SPACE_RE = re.compile(r'\s+')
+
+def normalize_term(term: str) -> str:
+    """
+    術語の表記を正規化（表示用、大文字小文字は保持）
+
+    NFKCで全角英数字・半角カナを統一し、カタカナ後のダッシュ類を長音記号「ー」にそろえる。
+
+    Args:
+        term: 術語
+
+    Returns:
+        正規化した術語（例: 「ＲＣ造」→「RC造」、「ｺﾝｸﾘｰﾄ」→「コンクリート」）
+    """
+    text = unicodedata.normalize('NFKC', term)
+    text = _LONG_VOWEL_RE.sub('ー', text)
+    return _SPACE_RE.sub(' ', text).strip()
+
+def canonical_key(term: str) -> str:
+    """
+    術語IDとして使う正規化キー（英字の大文字小文字も同一視）
+
+    Args:
+        term: 術語
+
+    Returns:
+        正規化キー（例: 「rc造」「ＲＣ造」「RC造」はすべて「rc造」）
+    """
+    return normalize_term(term).casefold()
+
+def choose_canonical(surfaces: Iterable[str]) -> str:
+    """
+    表記ゆれの中から代表表記を選ぶ
+
+    正規化後の表記で最も多いものを選び、同数の場合は文字コード順で先のもの
+    （大文字の英字を含む表記）を選ぶ。
+
+    Args:
+        surfaces: 同じ正規化キーを持つ表記
+
+    Returns:
+        代表表記
+    """
+    counts = Counter(normalize_term(surface) for surface in surfaces)
+    return min(counts, key=lambda surface: (-counts[surface], surface))
+
+def group_terms(terms: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    術語を正規化キーでまとめる
+
+    Args:
+        terms: 術語（表記ゆれを含む）
+
+    Returns:
+        代表表記 -> その表記ゆれのリスト（代表表記自体が入力にあれば含む、入力順）
+    """
+    groups: Dict[str, List[str]] = {}
+    for term in dict.fromkeys(terms):
+        groups.setdefault(canonical_key(term), []).append(term)
+    return {choose_canonical(surfaces): surfaces for surfaces in groups.values()}
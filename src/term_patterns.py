@@ -0,0 +1,189 @@
+"""
+術語抽出パターンの共有レジストリ
+各抽出器のパターン表をここに集約し、名前で参照する
+"""
+
+import copy
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+# 一般的な術語パターン（TermExtractor）
+GENERAL_PATTERNS = [
+    r'[A-Z]{2,}',  # 大写缩写 (RC, PC等)
+    r'[\u4e00-\u9faf]{2,}工事',  # XX工事
+    r'[\u4e00-\u9faf]{2,}材料',  # XX材料
+    r'[\u4e00-\u9faf]{2,}構造',  # XX構造
+    r'[\u4e00-\u9faf]{2,}設備',  # XX設備
+    r'[\u4e00-\u9faf]{2,}管理',  # XX管理
+    r'コンクリート[^\s]*',  # コンクリート関連
+    r'鉄筋[^\s]*',  # 鉄筋関連
+    r'基礎[^\s]*',  # 基礎関連
+    r'施工[^\s]*',  # 施工関連
+]
+
+GENERAL_EXCLUDE_WORDS = {
+    '工事', '材料', '構造', '設備', '管理', '施工', '基礎',
+    'について', 'により', 'による', 'として', 'までに',
+    'ページ', '図面', '参照', '以下', '以上', '記載',
+}
+
+# 建築専門用語のカテゴリ別パターン（PDFTermExtractor）
+BUILDING_PATTERNS = {
+    # 構造関連
+    "構造": [
+        r'RC[造構法工事]*', r'PC[造構法工事]*', r'SRC[造構法工事]*',
+        r'鉄筋[コンクリート造構法]*', r'鉄[骨筋][造構法]*',
+        r'木[造構法]*', r'鋼[造構法]*', r'混合構造',
+        r'基礎[工事構造]*', r'杭[工事基礎]*', r'直接基礎',
+        r'梁[構造]*', r'柱[構造]*', r'スラブ[構造]*',
+        r'壁[構造]*', r'床[構造]*', r'屋根[構造]*'
+    ],
+    
+    # 工事関連
+    "工事": [
+        r'基礎工事', r'杭工事', r'土工事', r'躯体工事',
+        r'型枠工事', r'配筋工事', r'コンクリート工事',
+        r'鉄骨工事', r'防水工事', r'仕上工事',
+        r'設備工事', r'電気工事', r'機械工事',
+        r'外構工事', r'解体工事'
+    ],
+    
+    # 材料関連
+    "材料": [
+        r'コンクリート[強度種類]*', r'鉄筋[材料種類]*',
+        r'鋼[材料種類]*', r'木[材料種類]*',
+        r'セメント[種類]*', r'骨材[種類]*',
+        r'添加[剤材料]*', r'防水[材料]*',
+        r'断熱[材料]*', r'仕上[材料]*'
+    ],
+    
+    # 管理関連
+    "管理": [
+        r'品質管理', r'安全管理', r'工程管理', r'施工管理',
+        r'原価管理', r'環境管理', r'労務管理',
+        r'検査[方法種類]*', r'試験[方法種類]*',
+        r'測定[方法種類]*', r'監理[業務]*'
+    ],
+    
+    # 設計関連
+    "設計": [
+        r'構造設計', r'意匠設計', r'設備設計',
+        r'構造計算', r'応力解析', r'耐震設計',
+        r'図面[種類]*', r'仕様[書類]*', r'詳細図',
+        r'施工図[面]*', r'竣工図[面]*'
+    ],
+    
+    # 法規関連
+    "法規": [
+        r'建築基準法', r'消防法', r'都市計画法',
+        r'確認申請', r'建築許可', r'完了検査',
+        r'検査済証', r'建築確認', r'用途変更',
+        r'構造計算[適合判定]*'
+    ]
+}
+
+BUILDING_EXCLUDE_WORDS = {
+    'について', 'により', 'による', 'として', 'ための',
+    'である', 'であり', 'です', 'ます', 'した',
+    'する', 'され', 'など', 'また', 'さらに',
+    'ページ', '図面', '参照', '以下', '以上', '記載',
+    '場合', '時期', '方法', '状況', '条件'
+}
+
+# 建築専門用語の詳細パターン（RealTermExtractor）
+DETAILED_BUILDING_PATTERNS = {
+    "構造関連": [
+        r'RC[造構法工事施工]*', r'PC[造構法工事施工]*', r'SRC[造構法工事施工]*',
+        r'鉄筋[コンクリート造構法工事]*', r'基礎[工事構造設計施工]*', 
+        r'杭[工事基礎施工打設]*', r'直接基礎', r'布基礎', r'独立基礎', r'べた基礎',
+        r'躯体[工事構造施工]*', r'柱[構造部材設計]*', r'梁[構造部材設計]*', 
+        r'スラブ[構造床版]*', r'壁[構造耐力壁]*', r'階段[構造設計]*',
+        r'耐震[構造設計診断]*', r'制震[構造設計装置]*', r'免震[構造設計装置]*',
+        r'構造[設計計算解析]*', r'荷重[設計計算]*', r'応力[計算解析]*'
+    ],
+    "工事関連": [
+        r'型枠[工事作業施工設置]*', r'配筋[工事作業施工]*', 
+        r'コンクリート[工事打設養生]*', r'仕上[工事作業施工]*',
+        r'防水[工事作業施工材料]*', r'左官[工事作業施工]*',
+        r'塗装[工事作業施工]*', r'内装[工事作業施工]*', r'外装[工事作業施工]*',
+        r'設備[工事配管施工]*', r'電気[工事配線施工]*', r'給排水[工事配管施工]*',
+        r'空調[工事設備施工]*', r'衛生[設備工事]*', r'昇降機[設備工事]*',
+        r'足場[工事安全施工]*', r'養生[作業安全]*', r'解体[工事作業]*'
+    ],
+    "材料関連": [
+        r'コンクリート[強度品質調合Fc\d+]*', r'鉄筋[材料規格D\d+SD\d+]*',
+        r'セメント[種類普通高炉早強]*', r'骨材[粗細川砂利砕石]*',
+        r'添加剤[AE減水高性能]*', r'防水[材料シートアスファルト]*',
+        r'断熱[材料保温グラスウール]*', r'仕上[材料塗装クロス]*',
+        r'建具[材料アルミ木製樹脂]*', r'ガラス[材料複層強化]*',
+        r'タイル[材料仕上]*', r'石材[材料仕上]*', r'金属[材料建材]*'
+    ],
+    "管理関連": [
+        r'品質[管理検査試験]*', r'安全[管理対策教育]*', 
+        r'工程[管理スケジュール計画]*', r'施工[管理監理]*',
+        r'検査[方法試験中間完了]*', r'試験[方法強度品質]*',
+        r'測定[方法計測]*', r'記録[管理保管写真]*', r'報告[書類提出]*',
+        r'監理[業務確認]*', r'監督[業務指導]*', r'検収[業務確認]*'
+    ],
+    "設計関連": [
+        r'構造[設計計算]*', r'意匠[設計デザイン]*', r'設備[設計機械電気]*',
+        r'施工[図面詳細]*', r'仕様[書規定基準]*', r'詳細[図面設計]*',
+        r'断面[図詳細構造]*', r'平面[図設計配置]*', r'立面[図設計外観]*',
+        r'配置[図敷地計画]*', r'矩計[図詳細]*', r'展開[図内装]*'
+    ],
+    "法規関連": [
+        r'建築基準法[第\d+条項款]*', r'確認[申請済証]*', r'完了[検査済証]*',
+        r'検査[済証中間完了]*', r'建築[確認許可]*', r'消防[法令規定]*',
+        r'都市計画[法令規定]*', r'条例[地方自治体]*', r'建設業法',
+        r'労働安全衛生法', r'廃棄物処理法', r'環境[基準法令]*'
+    ],
+    "測定・試験": [
+        r'強度[試験測定N/mm²MPa]*', r'スランプ[試験測定cm]*',
+        r'空気量[測定試験%]*', r'温度[測定管理℃]*', r'湿度[測定管理%]*',
+        r'騒音[測定dB]*', r'振動[測定計測]*', r'厚さ[測定mm]*',
+        r'寸法[測定精度公差]*', r'レベル[測定標高]*', r'通り[測定芯]*'
+    ],
+    "機械・設備": [
+        r'クレーン[重機建設機械]*', r'ポンプ[車コンクリート]*',
+        r'ミキサー[車コンクリート]*', r'バックホウ[重機掘削]*',
+        r'ブルドーザー[重機整地]*', r'ローラー[重機締固]*',
+        r'発電機[設備電源]*', r'コンプレッサー[設備空気]*'
+    ]
+}
+
+@dataclass
+class PatternSet:
+    """カテゴリ別の術語パターンと、一致した語の後処理条件"""
+    patterns: Dict[str, List[str]]
+    flags: int = 0
+    exclude_words: Set[str] = field(default_factory=set)
+    min_length: int = 2
+    max_length: Optional[int] = None
+    clean: bool = True  # 前後の空白や記号を除去してから判定する
+
+# 名前付きパターンセット
+PATTERN_SETS: Dict[str, PatternSet] = {
+    "general": PatternSet({"術語": GENERAL_PATTERNS}, exclude_words=GENERAL_EXCLUDE_WORDS),
+    "building": PatternSet(BUILDING_PATTERNS, re.IGNORECASE, BUILDING_EXCLUDE_WORDS),
+    "building_detailed": PatternSet(DETAILED_BUILDING_PATTERNS, re.IGNORECASE,
+                                    max_length=15, clean=False),
+}
+
+def get_pattern_set(name: str) -> PatternSet:
+    """
+    登録済みのパターンセットを取得
+
+    Args:
+        name: パターンセット名（"general", "building", "building_detailed"）
+
+    Returns:
+        パターンセットのコピー（抽出器ごとに変更しても登録内容には影響しない）
+    """
+    if name not in PATTERN_SETS:
+        raise ValueError(f"Unknown pattern set: {name}")
+    return copy.deepcopy(PATTERN_SETS[name])
+
+def register_pattern_set(name: str, pattern_set: PatternSet):
+    """パターンセットを登録（同名のセットは置き換える）"""
+    PATTERN_SETS[name] = pattern_set
@@ -0,0 +1,97 @@
+"""
+PDFページテキストキャッシュ
+抽出済みのページテキストを圧縮保存し、術語パターン変更時のPDF再解析を不要にする
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import logging
+
+from .pdf_manifest import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# (PDFパス, 開始ページ, 終了ページ) -> ページテキストのイテレータ
+PageReader = Callable[[str, int, Optional[int]], Iterator[str]]
+
+class PageTextCache:
+    def __init__(self, cache_dir: str = "data/text_cache"):
+        """
+        ページテキストキャッシュを初期化
+
+        キャッシュはファイル内容のハッシュと抽出バックエンド名をキーとし、
+        1行1ページのJSON文字列をgzip圧縮して保存する。
+
+        Args:
+            cache_dir: キャッシュディレクトリ
+        """
+        self.cache_dir = Path(cache_dir)
+        self._hashes: Dict[str, Tuple[int, float, str]] = {}
+
+    def iter_pages(self, pdf_path: str, backend: str, read_pages: PageReader,
+                   start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """
+        ページテキストを順に返す（キャッシュがなければ抽出しながら保存）
+
+        ページ範囲指定でキャッシュがない場合は、部分的なキャッシュを作らず直接抽出する。
+
+        Args:
+            pdf_path: PDFファイルパス
+            backend: 抽出バックエンド名（pdfplumber, pypdf2など）
+            read_pages: キャッシュがない場合のページ抽出関数
+            start: 開始ページ（0始まり）
+            end: 終了ページ（このページを含まない）
+
+        Yields:
+            ページテキスト
+        """
+        cache_path = self.cache_path(pdf_path, backend)
+
+        if cache_path.exists():
+            yield from self._read_cached(cache_path, start, end)
+            return
+
+        if start != 0 or end is not None:
+            yield from read_pages(pdf_path, start, end)
+            return
+
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for text in read_pages(pdf_path, start, end):
+                    f.write(json.dumps(text or "", ensure_ascii=False) + "\n")
+                    yield text or ""
+            os.replace(tmp_path, cache_path)
+        finally:
+            # 途中で中断された場合は不完全なキャッシュを残さない
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def cache_path(self, pdf_path: str, backend: str) -> Path:
+        """キャッシュファイルのパス"""
+        sha256 = self._file_hash(pdf_path)
+        return self.cache_dir / sha256[:2] / f"{sha256}.{backend}.jsonl.gz"
+
+    def _file_hash(self, pdf_path: str) -> str:
+        """サイズと更新時刻が変わらない限りハッシュを再計算しない"""
+        stat = os.stat(pdf_path)
+        cached = self._hashes.get(pdf_path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime):
+            return cached[2]
+
+        sha256 = file_sha256(pdf_path)
+        self._hashes[pdf_path] = (stat.st_size, stat.st_mtime, sha256)
+        return sha256
+
+    def _read_cached(self, cache_path: Path, start: int, end: Optional[int]) -> Iterator[str]:
+        """キャッシュファイルから指定範囲のページを読み込む"""
+        with gzip.open(cache_path, 'rt', encoding='utf-8') as f:
+            for page_num, line in enumerate(f):
+                if end is not None and page_num >= end:
+                    break
+                if page_num >= start:
+                    yield json.loads(line)
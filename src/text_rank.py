@@ -0,0 +1,230 @@
+"""
+抽出型要約（TextRank）
+文字n-gramのTF-IDFで文の類似度グラフを作り、PageRankで中心的な文を選ぶ
+"""
+
+from typing import List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+def char_ngram_counts(texts: Sequence[str], ngram_range: Tuple[int, int] = (2, 3),
+                      vocabulary: Optional[np.ndarray] = None) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    テキストごとの文字n-gramの出現回数行列
+
+    分かち書きを使わず、全文の文字コードの配列からn-gramをまとめて求める。
+    n-gramは文字コード（21ビット）を連結した整数キーで表すため、長さの異なるn-gramのキーは重ならない。
+
+    Args:
+        texts: テキストのリスト
+        ngram_range: n-gramの最小・最大文字数
+        vocabulary: 列に対応するn-gramのキー（昇順）。指定時はその列に数え、含まれないn-gramは無視
+
+    Returns:
+        (テキスト x n-gram の疎行列, 列に対応するn-gramのキー（昇順）)
+    """
+    num_texts = len(texts)
+    lengths = np.array([len(text) for text in texts], dtype=np.int64)
+    joined = "\0".join(texts)
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+    # 各文字のテキスト番号とテキスト中の位置（区切りの \0 は直前のテキストの末尾に数える）
+    text_of = np.repeat(np.arange(num_texts), lengths + 1)[:len(codes)]
+    starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1])) if num_texts else np.zeros(0, dtype=np.int64)
+    position = np.arange(len(codes)) - starts[text_of]
+
+    rows, keys = [], []
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        count = len(codes) - n + 1
+        if count <= 0:
+            continue
+        # テキストの中に収まるn-gramのみ
+        valid = np.flatnonzero(position[:count] + n <= lengths[text_of[:count]])
+        ngram_keys = np.zeros(len(valid), dtype=np.int64)
+        for offset in range(n):
+            ngram_keys = (ngram_keys << 21) | codes[valid + offset]
+        rows.append(text_of[valid])
+        keys.append(ngram_keys)
+
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+    keys = np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64)
+    if vocabulary is None:
+        vocabulary, cols = np.unique(keys, return_inverse=True)
+        cols = cols.ravel()
+    else:
+        cols = np.searchsorted(vocabulary, keys)
+        found = cols < len(vocabulary)
+        found[found] = vocabulary[cols[found]] == keys[found]
+        rows, cols = rows[found], cols[found]
+
+    counts = sparse.coo_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(num_texts, len(vocabulary))
+    ).tocsr()
+    return counts, vocabulary
+
+def char_ngram_tfidf(sentences: Sequence[str], ngram_range: Tuple[int, int] = (2, 3),
+                     max_df: float = 1.0, min_df_limit: int = 10) -> sparse.csr_matrix:
+    """
+    文ごとの文字n-gramのTF-IDF行列（行はL2正規化）
+
+    TFは 1 + log(出現回数)、IDFは log((1 + 文数) / (1 + 文書頻度)) + 1。
+
+    Args:
+        sentences: 文のリスト
+        ngram_range: n-gramの最小・最大文字数
+        max_df: この割合を超える文に現れるn-gramは除外（「ます」「ので」など）
+        min_df_limit: 除外する文書頻度の下限（文数が少ないときに共通のn-gramを除外しすぎないため）
+
+    Returns:
+        文 x n-gram の疎行列
+    """
+    num_sentences = len(sentences)
+    counts, vocabulary = char_ngram_counts(sentences, ngram_range)
+    vocab_size = len(vocabulary)
+    if vocab_size == 0:
+        return sparse.csr_matrix((num_sentences, 0))
+
+    doc_freq = np.bincount(counts.indices, minlength=vocab_size)
+    common = doc_freq > max(max_df * num_sentences, min_df_limit)
+    if common.any():
+        counts = counts[:, np.flatnonzero(~common)]
+        doc_freq = doc_freq[~common]
+    idf = (np.log((1 + num_sentences) / (1 + doc_freq)) + 1).astype(np.float32)
+    counts.data = (1 + np.log(counts.data)) * idf[counts.indices]
+
+    norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (sparse.diags((1 / norms).astype(np.float32)) @ counts).tocsr()
+
+class TextRank:
+    def __init__(self, ngram_range: Tuple[int, int] = (2, 3), max_neighbors: int = 20,
+                 min_similarity: float = 0.05, max_df: float = 0.2, damping: float = 0.85,
+                 max_iter: int = 100, tol: float = 1e-6, redundancy: float = 0.3, block_size: int = 256):
+        """
+        TextRank要約器を初期化
+
+        類似度グラフは各文の類似度上位 max_neighbors 文だけを辺として持つ疎行列で、
+        類似度は block_size 文ずつ計算するため、文数が数千でも全体の類似度行列は作らない。
+        多くの文に現れるn-gram（「ます」など）は除外し、類似度の計算量を抑える。
+        文を選ぶときは既に選んだ文との類似度を差し引き（MMR）、同じ内容の繰り返しを避ける。
+
+        Args:
+            ngram_range: 文字n-gramの最小・最大文字数
+            max_neighbors: 1文あたりの辺の数の上限
+            min_similarity: 辺とみなす最小のコサイン類似度
+            max_df: この割合を超える文に現れるn-gramは類似度に使わない
+            damping: PageRankの減衰率
+            max_iter: べき乗法の最大反復回数
+            tol: 収束判定（スコアの変化のL1ノルム）
+            redundancy: 選択済みの文との類似度にかける重み（0で重複を考慮しない）
+            block_size: 類似度を一度に計算する文数
+        """
+        self.ngram_range = ngram_range
+        self.max_neighbors = max_neighbors
+        self.min_similarity = min_similarity
+        self.max_df = max_df
+        self.damping = damping
+        self.max_iter = max_iter
+        self.tol = tol
+        self.redundancy = redundancy
+        self.block_size = block_size
+
+    def select(self, sentences: Sequence[str], top_n: int = 5,
+               weights: Optional[Sequence[float]] = None) -> List[int]:
+        """
+        要約に使う文を選択
+
+        Args:
+            sentences: 文のリスト
+            top_n: 選択する文の数
+            weights: 文ごとの重み（PageRankのテレポート確率に比例させる、Noneで一様）
+
+        Returns:
+            選択した文の番号（出現順）
+        """
+        if len(sentences) <= top_n:
+            return list(range(len(sentences)))
+
+        vectors = char_ngram_tfidf(sentences, self.ngram_range, self.max_df)
+        scores = self.rank_vectors(vectors, weights)
+        scores = scores / scores.max()
+
+        selected: List[int] = []
+        max_similarity = np.zeros(len(sentences))
+        for _ in range(top_n):
+            mmr = (1 - self.redundancy) * scores - self.redundancy * max_similarity
+            mmr[selected] = -np.inf
+            index = int(np.argmax(mmr))
+            selected.append(index)
+            similarity = (vectors @ vectors[index].T).toarray().ravel()
+            np.maximum(max_similarity, similarity, out=max_similarity)
+
+        return sorted(selected)
+
+    def rank(self, sentences: Sequence[str], weights: Optional[Sequence[float]] = None) -> np.ndarray:
+        """
+        文のTextRankスコア
+
+        Args:
+            sentences: 文のリスト
+            weights: 文ごとの重み（Noneで一様）
+
+        Returns:
+            スコア（合計1）
+        """
+        if not sentences:
+            return np.zeros(0)
+        return self.rank_vectors(char_ngram_tfidf(sentences, self.ngram_range, self.max_df), weights)
+
+    def rank_vectors(self, vectors: sparse.csr_matrix, weights: Optional[Sequence[float]] = None) -> np.ndarray:
+        """文ベクトル（L2正規化済み）の類似度グラフでPageRankを計算"""
+        num_sentences = vectors.shape[0]
+        teleport = np.ones(num_sentences) if weights is None else np.asarray(weights, dtype=float)
+        teleport = teleport / teleport.sum()
+
+        graph = self._similarity_graph(vectors)
+        out_weight = np.asarray(graph.sum(axis=1)).ravel()
+        dangling = out_weight == 0
+        out_weight[dangling] = 1
+        transition_t = (sparse.diags(1 / out_weight) @ graph).T.tocsr()
+
+        scores = teleport.copy()
+        for _ in range(self.max_iter):
+            # 辺のない文のスコアはテレポート確率に従って配る
+            updated = (1 - self.damping) * teleport + self.damping * (
+                transition_t @ scores + scores[dangling].sum() * teleport)
+            converged = np.abs(updated - scores).sum() < self.tol
+            scores = updated
+            if converged:
+                break
+        return scores
+
+    def _similarity_graph(self, vectors: sparse.csr_matrix) -> sparse.csr_matrix:
+        """各文の類似度上位の文だけを辺とする対称な疎行列"""
+        num_sentences = vectors.shape[0]
+        neighbors = min(self.max_neighbors, num_sentences - 1)
+        if neighbors <= 0:
+            return sparse.csr_matrix((num_sentences, num_sentences))
+
+        vectors_t = vectors.T.tocsc()
+        rows, cols, values = [], [], []
+        for start in range(0, num_sentences, self.block_size):
+            end = min(start + self.block_size, num_sentences)
+            similarity = (vectors[start:end] @ vectors_t).toarray()
+            similarity[np.arange(end - start), np.arange(start, end)] = 0
+
+            top = np.argpartition(-similarity, neighbors - 1, axis=1)[:, :neighbors]
+            top_values = np.take_along_axis(similarity, top, axis=1)
+            keep = top_values > self.min_similarity
+            rows.append(np.repeat(np.arange(start, end), neighbors)[keep.ravel()])
+            cols.append(top[keep])
+            values.append(top_values[keep])
+
+        graph = sparse.csr_matrix(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(num_sentences, num_sentences))
+        return graph.maximum(graph.T)
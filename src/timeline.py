@@ -0,0 +1,133 @@
+"""
+議事録項目のタイムライン
+文字起こしのセグメントの時刻を議事録項目に対応付け、時刻から項目を、項目から時刻を引く
+"""
+
+from bisect import bisect_right
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 時刻を付ける議事録の項目
+ITEM_SECTIONS = ("decisions", "action_items", "issues")
+
+def format_timestamp(seconds: float) -> str:
+    """秒数を「時:分:秒」（例: 01:02:03）に変換"""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+class SegmentSpans:
+    def __init__(self):
+        """
+        連結した文字起こしの文字位置からセグメントを引く対応表を初期化
+
+        セグメントの開始文字位置の昇順の配列を二分探索するため、
+        セグメントの追加は末尾のみ（文字起こしの順）とする。
+        """
+        self._offsets: List[int] = []
+        self._segments: List[Tuple[Any, float, float]] = []
+
+    def add(self, offset: int, segment: Dict, default_id: Any = None):
+        """
+        セグメントを追加（時刻のないセグメント・空のセグメントは無視）
+
+        Args:
+            offset: 連結した文字起こしでのセグメントの開始文字位置
+            segment: "text", "start", "end"（秒）と任意の "id" を持つセグメント（Whisperの出力など）
+            default_id: "id" がない場合のセグメントID
+        """
+        if not segment.get("text") or segment.get("start") is None or segment.get("end") is None:
+            return
+        self._offsets.append(offset)
+        self._segments.append((segment.get("id", default_id), float(segment["start"]), float(segment["end"])))
+
+    def __bool__(self) -> bool:
+        return bool(self._segments)
+
+    def span(self, start: int, end: int) -> Dict:
+        """
+        文字範囲 [start, end) を含むセグメントの時刻とID
+
+        Args:
+            start: 開始文字位置
+            end: 終了文字位置
+
+        Returns:
+            "start", "end"（秒）, "segment_ids"
+        """
+        first = max(bisect_right(self._offsets, start) - 1, 0)
+        last = max(bisect_right(self._offsets, max(end - 1, start)) - 1, first)
+        segments = self._segments[first:last + 1]
+        return {
+            "start": segments[0][1],
+            "end": max(segment_end for _, _, segment_end in segments),
+            "segment_ids": [segment_id for segment_id, _, _ in segments],
+        }
+
+class TimelineIndex:
+    def __init__(self, entries: Iterable[Tuple[float, float, Hashable]]):
+        """
+        時刻の区間の索引を初期化
+
+        区間を開始時刻の順に並べた配列と、終了時刻の累積最大値の配列だけを持つ。
+        時刻を含む区間は、開始時刻がその時刻以前で、累積最大値がその時刻以降の範囲にしかないため、
+        二分探索で範囲を絞ってから終了時刻を比べる（区間木を作らずに済む）。
+
+        Args:
+            entries: (開始時刻, 終了時刻, キー) のリスト（キーは項目を表すハッシュ可能な値）
+        """
+        entries = sorted(entries, key=lambda entry: (entry[0], entry[1]))
+        self.keys: List[Hashable] = [key for _, _, key in entries]
+        self._starts = np.array([start for start, _, _ in entries], dtype=np.float64)
+        self._ends = np.array([end for _, end, _ in entries], dtype=np.float64)
+        self._max_ends = np.maximum.accumulate(self._ends) if len(entries) else self._ends
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+
+    @classmethod
+    def from_minutes(cls, minutes: Dict, sections: Sequence[str] = ITEM_SECTIONS) -> "TimelineIndex":
+        """
+        議事録の時刻付きの項目から索引を作成
+
+        Args:
+            minutes: 議事録データ（generate_minutes_from_segments の出力など）
+            sections: 対象とする項目
+
+        Returns:
+            キーが (項目名, 項目内の番号) の索引（例: ("decisions", 0)）
+        """
+        return cls(
+            (item["start"], item["end"], (section, number))
+            for section in sections
+            for number, item in enumerate(minutes.get(section) or [])
+            if item.get("start") is not None and item.get("end") is not None
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def at(self, time: float) -> List[Hashable]:
+        """時刻を含む区間のキー（開始時刻順）"""
+        return self.overlapping(time, time)
+
+    def overlapping(self, start: float, end: float) -> List[Hashable]:
+        """
+        時刻の範囲と重なる区間のキー
+
+        Args:
+            start: 開始時刻（秒）
+            end: 終了時刻（秒）
+
+        Returns:
+            キーのリスト（開始時刻順）
+        """
+        stop = int(np.searchsorted(self._starts, end, side="right"))
+        first = int(np.searchsorted(self._max_ends[:stop], start, side="left"))
+        hits = first + np.flatnonzero(self._ends[first:stop] >= start)
+        return [self.keys[i] for i in hits]
+
+    def span(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """キーの区間（開始時刻, 終了時刻）、索引にないキーはNone"""
+        position = self._positions.get(key)
+        if position is None:
+            return None
+        return float(self._starts[position]), float(self._ends[position])
@@ -3,26 +3,45 @@
 専門術語の高速検索のためのFaiss実装
 """
 
+import math
 import numpy as np
 import faiss
 import pickle
 import json
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from sentence_transformers import SentenceTransformer
 import logging
 
+from .term_normalizer import canonical_key, group_terms, normalize_term
+
 logger = logging.getLogger(__name__)
 
 class VectorDB:
-    def __init__(self, model_name: str = "auto"):
+    def __init__(self, model_name: str = "auto", model: SentenceTransformer = None):
         """
         ベクターデータベースを初期化
         
         Args:
             model_name: SentenceTransformerのモデル名 ("auto"で自動選択)
+            model: 読み込み済みのモデル（指定時は再読み込みせず共有する）
         """
-        self.model = self._load_best_model(model_name)
+        self.model = model if model is not None else self._load_best_model(model_name)
+        self.index = None
+        self.terms = []
+        self.term_metadata = {}
+        self.dimension = None
+        
+        # 代表表記 -> 表記ゆれ（全角/半角・長音・大文字小文字違い）のリスト
+        # インデックスには代表表記ごとに1つのベクトルだけを登録する
+        self.aliases = {}
+        self._term_keys = []
+        self._term_ids = {}
+        
+        # 術語 -> [コーパス頻度, 文書頻度, [[PDFパス, [出現ページ]], ...]]
+        self.term_stats = {}
+        # 術語 -> 出現頻度に基づく優先度（同スコア時の順位付けに使う）
+        self.term_priors = {}
     
     def _load_best_model(self, model_name: str):
         """利用可能な最適なモデルを読み込み"""
@@ -82,23 +101,23 @@ class VectorDB:
         
         # 最後の手段
         raise RuntimeError("No suitable model could be loaded")
-        self.index = None
-        self.terms = []
-        self.term_metadata = {}
-        self.dimension = None
     
     def build_index(self, terms: List[str], metadata: Dict[str, Dict] = None):
         """
         術語リストからFaissインデックスを構築
         
+        表記ゆれは正規化キーでまとめ、代表表記ごとに1つだけベクトル化する。
+        
         Args:
             terms: 術語のリスト
             metadata: 各術語の追加情報
         """
-        logger.info(f"Building index for {len(terms)} terms...")
+        groups = group_terms(terms)
+        canonical_terms = list(groups)
+        logger.info(f"Building index for {len(canonical_terms)} terms ({len(terms)} surface forms)...")
         
         # ベクトル化
-        vectors = self.model.encode(terms, show_progress_bar=True)
+        vectors = self.model.encode(canonical_terms, show_progress_bar=True)
         self.dimension = vectors.shape[1]
         
         # Faissインデックス作成（Inner Product用）
@@ -111,11 +130,206 @@ class VectorDB:
         self.index.add(vectors.astype('float32'))
         
         # 術語とメタデータを保存
-        self.terms = terms
-        self.term_metadata = metadata or {}
+        self.terms = canonical_terms
+        self.aliases = groups
+        self.term_metadata = self._merge_metadata(groups, metadata or {})
+        self.term_stats = {}
+        self._rebuild_lookup()
+        self._update_priors()
         
         logger.info(f"Index built successfully with dimension {self.dimension}")
     
+    def add_terms(self, terms: List[str], metadata: Dict[str, Dict] = None):
+        """
+        既存のインデックスに術語を追加（新しい術語のみベクトル化）
+        
+        既存の術語の表記ゆれは別名として登録し、ベクトルは追加しない。
+        
+        Args:
+            terms: 追加する術語のリスト
+            metadata: 各術語の追加情報
+        """
+        metadata = metadata or {}
+        if self.index is None:
+            new_terms = list(dict.fromkeys(terms))
+            if new_terms:
+                self.term_metadata.update(metadata)
+                self.build_index(new_terms, self.term_metadata)
+            return
+        
+        new_terms = []
+        for term in dict.fromkeys(terms):
+            canonical = self.lookup(term)
+            if canonical is None:
+                new_terms.append(term)
+                continue
+            if term not in self.aliases[canonical]:
+                self.aliases[canonical].append(term)
+            if term in metadata:
+                self.term_metadata.setdefault(canonical, {}).update(metadata[term])
+        
+        if new_terms:
+            groups = group_terms(new_terms)
+            canonical_terms = list(groups)
+            vectors = self.model.encode(canonical_terms).astype('float32')
+            faiss.normalize_L2(vectors)
+            self.index.add(vectors)
+            
+            for canonical in canonical_terms:
+                self._term_ids[canonical_key(canonical)] = len(self.terms)
+                self._term_keys.append(canonical_key(canonical))
+                self.terms.append(canonical)
+            self.aliases.update(groups)
+            self.term_metadata.update(self._merge_metadata(groups, metadata))
+            
+            logger.info(f"Added {len(canonical_terms)} terms (total {len(self.terms)})")
+        
+        self._update_priors()
+    
+    def remove_terms(self, terms: List[str]):
+        """
+        インデックスから術語を削除（残りのベクトルは再計算しない）
+        
+        表記ゆれの一部だけを削除した場合は別名から外し、
+        すべての表記がなくなった術語のベクトルを削除する。
+        
+        Args:
+            terms: 削除する術語のリスト
+        """
+        if self.index is None:
+            return
+        
+        removed = set()
+        for term in dict.fromkeys(terms):
+            canonical = self.lookup(term)
+            if canonical is None:
+                continue
+            aliases = self.aliases.get(canonical, [])
+            if term in aliases:
+                aliases.remove(term)
+            elif term == canonical:
+                aliases.clear()
+            if not aliases:
+                removed.add(canonical)
+        
+        ids = [i for i, term in enumerate(self.terms) if term in removed]
+        if not ids:
+            return
+        
+        # IndexFlatは削除後に残りのIDを詰めるため、術語リストも同じ順序で詰める
+        self.index.remove_ids(np.array(ids, dtype='int64'))
+        self.terms = [term for term in self.terms if term not in removed]
+        for term in removed:
+            self.aliases.pop(term, None)
+            self.term_metadata.pop(term, None)
+            self.term_stats.pop(term, None)
+            self.term_priors.pop(term, None)
+        self._rebuild_lookup()
+        
+        logger.info(f"Removed {len(ids)} terms (total {len(self.terms)})")
+    
+    def lookup(self, term: str) -> Optional[str]:
+        """
+        表記ゆれを含む術語から代表表記を取得
+        
+        Args:
+            term: 術語（「ＲＣ造」「rc造」など）
+            
+        Returns:
+            代表表記（登録されていない場合はNone）
+        """
+        term_id = self._term_ids.get(canonical_key(term))
+        return self.terms[term_id] if term_id is not None else None
+    
+    def _rebuild_lookup(self):
+        """正規化キーから術語位置への対応を作り直す"""
+        self._term_keys = [canonical_key(term) for term in self.terms]
+        self._term_ids = {}
+        for term_id, key in enumerate(self._term_keys):
+            self._term_ids.setdefault(key, term_id)
+    
+    @staticmethod
+    def _merge_metadata(groups: Dict[str, List[str]], metadata: Dict[str, Dict]) -> Dict[str, Dict]:
+        """表記ゆれごとのメタデータを代表表記にまとめる"""
+        merged = {}
+        for canonical, surfaces in groups.items():
+            for surface in [canonical] + surfaces:
+                if surface in metadata:
+                    merged.setdefault(canonical, {}).update(metadata[surface])
+        return merged
+    
+    def update_metadata(self, metadata: Dict[str, Dict]):
+        """
+        登録済みの術語のメタデータを更新（表記ゆれのメタデータは代表表記にまとめる）
+        
+        Args:
+            metadata: 術語 -> 追加情報（未登録の術語は無視）
+        """
+        for term, values in metadata.items():
+            canonical = self.lookup(term)
+            if canonical is not None:
+                self.term_metadata.setdefault(canonical, {}).update(values)
+    
+    def set_term_statistics(self, stats: Dict[str, List]):
+        """
+        術語の出現統計を設定（表記ゆれの統計は代表表記にまとめる）
+        
+        Args:
+            stats: 術語 -> [コーパス頻度, 文書頻度, [[PDFパス, [出現ページ]], ...]]
+        """
+        merged = {}
+        for term, (frequency, _, locations) in stats.items():
+            canonical = self.lookup(term)
+            if canonical is None:
+                continue
+            stat = merged.setdefault(canonical, [0, {}])
+            stat[0] += frequency
+            for path, pages in locations:
+                stat[1].setdefault(path, set()).update(pages)
+        
+        self.term_stats = {
+            term: [frequency, len(pages_by_path),
+                   [[path, sorted(pages_by_path[path])] for path in sorted(pages_by_path)]]
+            for term, (frequency, pages_by_path) in merged.items()
+        }
+        self._update_priors()
+        
+        logger.info(f"Term statistics set for {len(self.term_stats)} terms")
+    
+    def _update_priors(self):
+        """出現頻度（統計がなければメタデータのfrequency）から優先度を計算"""
+        priors = {}
+        for term in self.terms:
+            stat = self.term_stats.get(term)
+            frequency = stat[0] if stat else self.term_metadata.get(term, {}).get("frequency", 0)
+            if frequency:
+                priors[term] = math.log1p(frequency)
+        self.term_priors = priors
+    
+    def get_term_locations(self, term: str) -> List[Tuple[str, List[int]]]:
+        """
+        術語の出現場所を取得
+        
+        Returns:
+            (PDFパス, 出現ページのリスト) のリスト（パス順）
+        """
+        stat = self.term_stats.get(term)
+        return [(path, pages) for path, pages in stat[2]] if stat else []
+    
+    def rank(self, scores: Dict[str, float], k: int) -> List[Tuple[str, float]]:
+        """
+        スコアの高い順に並べる（同スコアは出現頻度の高い術語を優先）
+        
+        Args:
+            scores: 術語 -> スコア
+            k: 返す結果数
+            
+        Returns:
+            (術語, スコア) のタプルのリスト
+        """
+        priors = self.term_priors
+        return sorted(scores.items(), key=lambda x: (x[1], priors.get(x[0], 0.0)), reverse=True)[:k]
+    
     def search(self, query: str, k: int = 5, threshold: float = 0.7) -> List[Tuple[str, float]]:
         """
         クエリに類似する術語を検索
@@ -132,20 +346,44 @@ class VectorDB:
             logger.error("Index not built yet")
             return []
         
-        # クエリをベクトル化
-        query_vector = self.model.encode([query])
+        return self.search_vector(self.encode_query(query), k, threshold)
+    
+    def encode_query(self, query: str) -> np.ndarray:
+        """クエリを正規化済みベクトルに変換"""
+        query_vector = self.model.encode([normalize_term(query)]).astype('float32')
         faiss.normalize_L2(query_vector)
+        return query_vector
+    
+    def search_vector(self, query_vector: np.ndarray, k: int = 5, threshold: float = 0.7) -> List[Tuple[str, float]]:
+        """
+        ベクトル化済みクエリで術語を検索
+        
+        Args:
+            query_vector: encode_queryで得たクエリベクトル
+            k: 返す結果数
+            threshold: 類似度の閾値
+            
+        Returns:
+            (術語, スコア) のタプルのリスト
+        """
+        if self.index is None or self.index.ntotal == 0:
+            return []
         
         # 検索実行
-        scores, indices = self.index.search(query_vector.astype('float32'), k)
+        scores, indices = self.index.search(query_vector, min(k, self.index.ntotal))
         
         # 結果をフィルタリング
         results = []
-        for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
-            if score >= threshold and idx < len(self.terms):
+        for score, idx in zip(scores[0], indices[0]):
+            if score >= threshold and 0 <= idx < len(self.terms):
                 term = self.terms[idx]
                 results.append((term, float(score)))
         
+        # 同スコアは出現頻度の高い術語を優先（Faissの結果はスコア順のため安定ソートで足りる）
+        if self.term_priors:
+            priors = self.term_priors
+            results.sort(key=lambda x: (-x[1], -priors.get(x[0], 0.0)))
+        
         return results
     
     def fuzzy_search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
@@ -162,14 +400,27 @@ class VectorDB:
         # ベクトル検索
         vector_results = self.search(query, k)
         
-        # 文字列の部分一致検索
+        return self.rank(self.merge_fuzzy_scores(query, vector_results), k)
+    
+    def merge_fuzzy_scores(self, query: str, vector_results: List[Tuple[str, float]]) -> Dict[str, float]:
+        """
+        ベクトル検索結果と文字列の部分一致スコアをマージ
+        
+        Args:
+            query: 検索クエリ
+            vector_results: ベクトル検索の (術語, スコア) リスト
+            
+        Returns:
+            術語 -> スコア の辞書（重複は最大スコアに統合）
+        """
+        # 文字列の部分一致検索（表記ゆれを吸収した正規化キーで比較）
         string_results = []
-        query_lower = query.lower()
+        query_key = canonical_key(query)
         
-        for term in self.terms:
-            if query_lower in term.lower() or term.lower() in query_lower:
+        for term, term_key in zip(self.terms, self._term_keys):
+            if query_key in term_key or term_key in query_key:
                 # 文字列一致度を計算（簡易版）
-                match_score = min(len(query), len(term)) / max(len(query), len(term))
+                match_score = min(len(query_key), len(term_key)) / max(len(query_key), len(term_key))
                 string_results.append((term, match_score))
         
         # 結果をマージして重複を除去
@@ -184,10 +435,7 @@ class VectorDB:
             adjusted_score = score * 0.8  # 文字列マッチのスコアを少し下げる
             all_results[term] = max(all_results.get(term, 0), adjusted_score)
         
-        # スコア順にソート
-        sorted_results = sorted(all_results.items(), key=lambda x: x[1], reverse=True)
-        
-        return sorted_results[:k]
+        return all_results
     
     def save_index(self, index_dir: str):
         """インデックスをファイルに保存"""
@@ -205,6 +453,14 @@ class VectorDB:
         with open(index_dir / "metadata.json", 'w', encoding='utf-8') as f:
             json.dump(self.term_metadata, f, ensure_ascii=False, indent=2)
         
+        # 表記ゆれを保存
+        with open(index_dir / "aliases.json", 'w', encoding='utf-8') as f:
+            json.dump(self.aliases, f, ensure_ascii=False, separators=(',', ':'))
+        
+        # 出現統計を保存（術語数xページ数に比例するため整形しない）
+        with open(index_dir / "term_stats.json", 'w', encoding='utf-8') as f:
+            json.dump(self.term_stats, f, ensure_ascii=False, separators=(',', ':'))
+        
         logger.info(f"Index saved to {index_dir}")
     
     def load_index(self, index_dir: str):
@@ -222,12 +478,42 @@ class VectorDB:
         with open(index_dir / "metadata.json", 'r', encoding='utf-8') as f:
             self.term_metadata = json.load(f)
         
+        # 表記ゆれを読み込み（正規化導入前のインデックスでは各術語が自身のみを持つ）
+        aliases_path = index_dir / "aliases.json"
+        if aliases_path.exists():
+            with open(aliases_path, 'r', encoding='utf-8') as f:
+                self.aliases = json.load(f)
+        else:
+            self.aliases = {term: [term] for term in self.terms}
+        self._rebuild_lookup()
+        
+        # 出現統計を読み込み（統計導入前のインデックスにはない）
+        stats_path = index_dir / "term_stats.json"
+        if stats_path.exists():
+            with open(stats_path, 'r', encoding='utf-8') as f:
+                self.term_stats = json.load(f)
+        else:
+            self.term_stats = {}
+        self._update_priors()
+        
         self.dimension = self.index.d
         logger.info(f"Index loaded from {index_dir}")
     
     def get_term_info(self, term: str) -> Dict:
-        """術語の詳細情報を取得"""
-        return self.term_metadata.get(term, {})
+        """術語の詳細情報を取得（表記ゆれも可、別名・出現統計があれば含む）"""
+        canonical = self.lookup(term) or term
+        info = dict(self.term_metadata.get(canonical, {}))
+        aliases = [alias for alias in self.aliases.get(canonical, []) if alias != canonical]
+        if aliases:
+            info["aliases"] = aliases
+        stat = self.term_stats.get(canonical)
+        if stat:
+            info.update({
+                "frequency": stat[0],
+                "doc_freq": stat[1],
+                "locations": self.get_term_locations(canonical)
+            })
+        return info
 
 def main():
     """テスト実行"""
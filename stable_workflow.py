@@ -8,6 +8,8 @@ import json
 import os
 from pathlib import Path
 
+from src.extraction_engine import ExtractionEngine
+
 class StableWorkflowApp:
     def __init__(self):
         """安定版ワークフローアプリを初期化"""
@@ -19,25 +21,30 @@ class StableWorkflowApp:
         self.extracted_terms = []
         self.transcription_ready = False
         self.transcript_text = ""
+        
+        # 建築専門用語の抽出エンジン
+        self.term_engine = ExtractionEngine("building", "pdfplumber")
     
     def extract_terms_simple(self, pdf_files):
-        """簡単な術語抽出（ファイルアップロード不使用）"""
+        """簡単な術語抽出（ファイルアップロード不使用、PDFパスをカンマ区切りで指定）"""
         if pdf_files is None:
             return "PDFファイルが選択されていません。", ""
         
-        # デモ用の術語データ
-        demo_terms = {
-            "構造": ["RC造", "PC造", "SRC造", "鉄筋コンクリート造", "基礎工事", "杭工事"],
-            "工事": ["型枠工事", "配筋工事", "コンクリート工事", "躯体工事", "仕上工事"],
-            "材料": ["コンクリート強度", "鉄筋材料", "セメント", "骨材", "添加剤"],
-            "管理": ["品質管理", "安全管理", "工程管理", "施工管理", "検査方法"],
-            "設計": ["構造設計", "意匠設計", "構造計算", "施工図面", "仕様書"],
-            "法規": ["建築基準法", "確認申請", "完了検査", "検査済証"]
-        }
+        if isinstance(pdf_files, str):
+            pdf_files = pdf_files.split(",")
+        paths = [str(getattr(pdf_file, "name", pdf_file)).strip() for pdf_file in pdf_files]
+        paths = [path for path in paths if path]
+        if not paths:
+            return "PDFファイルのパスを入力してください。", ""
+        missing = [path for path in paths if not os.path.exists(path)]
+        if missing:
+            return f"❌ PDFファイルが見つかりません: {', '.join(missing)}", ""
+        
+        # PDFを1ページずつ照合
+        terms_by_category = self.term_engine.collect(self.term_engine.extract(paths))
 
-        self.extracted_terms = []
-        for category_terms in demo_terms.values():
-            self.extracted_terms.extend(category_terms)
+        self.extracted_terms = sorted({term for category_terms in terms_by_category.values()
+                                       for term in category_terms})
 
         self.term_db_ready = True
 
@@ -45,7 +52,7 @@ class StableWorkflowApp:
         result_text = f"✅ 専門術語抽出完了\n\n"
         result_text += f"📊 抽出された術語数: {len(self.extracted_terms)}\n\n"
 
-        for category, terms in demo_terms.items():
+        for category, terms in terms_by_category.items():
             result_text += f"🏗️ {category}: {', '.join(terms)}\n"
 
         result_text += f"\n✅ ステップ1完了 → ステップ2に進んでください"
@@ -54,7 +61,7 @@ class StableWorkflowApp:
         json_data = {
             "status": "completed",
             "terms_count": len(self.extracted_terms),
-            "terms_by_category": demo_terms
+            "terms_by_category": terms_by_category
         }
 
         return result_text, json.dumps(json_data, ensure_ascii=False, indent=2)
@@ -206,9 +213,8 @@ def create_stable_interface():
             with gr.Column():
                 gr.HTML("<h3>📚 ステップ1: 専門術語抽出</h3>")
                 pdf_input = gr.Textbox(
-                    label="PDFファイル名（デモ用）",
-                    placeholder="任意のファイル名を入力してください",
-                    value="building_terms.pdf"
+                    label="PDFファイルパス（カンマ区切り）",
+                    placeholder="例: 資料/構造設計図.pdf, 資料/仕様書.pdf"
                 )
                 extract_btn = gr.Button("🔍 術語抽出開始", variant="primary")
 
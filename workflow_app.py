@@ -10,6 +10,8 @@ import tempfile
 import shutil
 from pathlib import Path
 
+from src.extraction_engine import ExtractionEngine
+
 class WorkflowApp:
     def __init__(self):
         """ワークフローアプリを初期化"""
@@ -21,6 +23,9 @@ class WorkflowApp:
         self.extracted_terms = []
         self.transcription_ready = False
         self.transcript_text = ""
+        
+        # 建築専門用語の抽出エンジン
+        self.term_engine = ExtractionEngine("building", "pdfplumber")
     
     # === ステップ1: 専門術語抽出 ===
     def extract_terms_from_pdf(self, pdf_files):
@@ -29,34 +34,12 @@ class WorkflowApp:
             return "PDFファイルを選択してください。", ""
         
         try:
+            # アップロードされたPDFを1ページずつ照合
+            paths = [pdf_file.name for pdf_file in pdf_files]
+            terms_by_category = self.term_engine.collect(self.term_engine.extract(paths))
             all_terms = set()
-            
-            # 建築専門用語のパターン
-            building_patterns = [
-                'RC', 'PC', 'SRC', '鉄筋', 'コンクリート', '基礎', '杭', '梁', '柱', 'スラブ',
-                '施工', '設計', '構造', '図面', '仕様', '検査', '試験', '品質管理', '安全管理',
-                '工程管理', '施工管理', '建築基準法', '確認申請', '検査済証', '完了検査',
-                '型枠', '配筋', '打設', '養生', '強度', '圧縮', '引張', '曲げ', '剪断',
-                '基礎工事', '躯体工事', '仕上工事', '設備工事', '外構工事'
-            ]
-            
-            # 簡易的なテキスト抽出（実際にはpdfplumberを使用）
-            for pdf_file in pdf_files:
-                # ファイル名から術語を推測（デモ用）
-                filename = os.path.basename(pdf_file.name).lower()
-                
-                # ファイル名に含まれる建築用語を検出
-                for term in building_patterns:
-                    if term.lower() in filename or term in filename:
-                        all_terms.add(term)
-                
-                # デモ用のサンプル術語を追加
-                sample_terms = [
-                    '鉄筋コンクリート造', 'RC造', '基礎工事', '杭工事', '型枠工事',
-                    '配筋工事', 'コンクリート打設', '品質管理', '施工管理', '安全管理',
-                    '構造計算', '意匠設計', '設備設計', '施工図面', '建築基準法'
-                ]
-                all_terms.update(sample_terms[:10])  # 最初の10個を追加
+            for category_terms in terms_by_category.values():
+                all_terms.update(category_terms)
             
             self.extracted_terms = list(all_terms)
             self.term_db_ready = True
@@ -78,7 +61,8 @@ class WorkflowApp:
             json_data = {
                 "status": "completed",
                 "terms_count": len(self.extracted_terms),
-                "terms": self.extracted_terms
+                "terms": self.extracted_terms,
+                "terms_by_category": terms_by_category
             }
             
             return result_text, json.dumps(json_data, ensure_ascii=False, indent=2)